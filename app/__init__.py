@@ -27,14 +27,41 @@ def create_app(config_name=None):
     app = Flask(__name__, template_folder='../templates', static_folder='../static')
     app.config.from_object(config[config_name])
 
+    # Behind a reverse proxy, take the client IP (rate-limit key, audit logs) from X-Forwarded-For
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     mail.init_app(app)
+    # Registers the shared sqlite:// and resp:// storages before the limiter picks one
+    from app.utils.ratelimit import RESPStorage, SQLiteStorage  # noqa: F401
     limiter.init_app(app)
     csrf.init_app(app)
 
+    # SQLite pragmas (WAL, cache, mmap) and optional write serialization
+    from app.utils.sqlite import init_sqlite_tuning
+    init_sqlite_tuning(app, db)
+
+    # Server-Timing header (db, context processor, template, total)
+    from app.utils.server_timing import init_server_timing, timed
+    init_server_timing(app)
+
+    # Per-request query count/time, N+1 detection and query budgets
+    from app.utils.query_counter import init_query_counter
+    init_query_counter(app, db)
+
+    # Prometheus /metrics (aggregated across Gunicorn workers)
+    from app.utils.metrics import init_metrics
+    init_metrics(app, db, mail)
+
+    # Admin-triggered sampling profiler (signed ?_profile= / X-Profile token)
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+
     # Handle CSRF errors globally
     try:
         @csrf.error_handler
@@ -104,6 +131,10 @@ def create_app(config_name=None):
     from app.api import bp as api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
 
+    # flask CLI commands (seed-synthetic, ...)
+    from app.cli import register_cli
+    register_cli(app)
+
     # Create upload directories
     upload_dir = os.path.join(app.instance_path, app.config['UPLOAD_FOLDER'])
     os.makedirs(upload_dir, exist_ok=True)
@@ -140,6 +171,38 @@ def create_app(config_name=None):
     except Exception as e:
         app.logger.warning(f"DB ensure/seed failed (gallery_category): {e}")
 
+    # Bilingual full-text search index (FTS5 / tsvector), kept in sync on ORM writes
+    from app.utils.search import init_search
+    init_search(app, db)
+
+    # Precomputed product facets for the catalog listing, kept in sync on ORM writes
+    from app.utils.facets import init_facets
+    init_facets(app, db)
+
+    # Structured product attributes parsed from the JSON columns, kept in sync on ORM writes
+    from app.utils.attributes import init_attributes
+    init_attributes(app, db)
+
+    # Denormalized product cards for the listing pages, kept in sync on ORM writes
+    from app.utils.product_cards import init_product_cards
+    init_product_cards(app, db)
+
+    # Per-worker autocomplete prefix index, rebuilt after catalog writes
+    from app.utils.autocomplete import init_autocomplete
+    init_autocomplete(app, db)
+
+    # Per-worker snapshots of categories, certifications, services, gallery categories, company info
+    from app.utils.reference_data import init_reference_data
+    init_reference_data(app, db)
+
+    # Cross-worker cache invalidation: version counters bumped with each write (after the caches register)
+    from app.utils.cache_bus import init_cache_bus
+    init_cache_bus(app, db)
+
+    # Reference snapshot loaded at startup (in the master under Gunicorn's preload), not by the first request
+    from app.utils.reference_data import preload_reference_data
+    preload_reference_data(app, db)
+
 
     # Language selector function
     def get_locale():
@@ -170,6 +233,7 @@ def create_app(config_name=None):
 
     # Context processors
     @app.context_processor
+    @timed('ctx')
     def inject_config():
         from flask import session, g
         from flask_babel import gettext
@@ -186,14 +250,12 @@ def create_app(config_name=None):
         # Set the locale in g for Babel
         g.locale = current_language
 
-        # Build categories for navbar (dynamic)
+        # Build categories for navbar (dynamic, from the per-worker reference snapshot)
         nav_categories = []
         if Category is not None:
             try:
-                nav_categories = (Category.query
-                                  .filter_by(is_active=True)
-                                  .order_by(Category.sort_order, Category.name_en)
-                                  .all()) or []
+                from app.utils.reference_data import get_reference_data
+                nav_categories = get_reference_data().categories()
             except Exception:
                 nav_categories = []
 
@@ -201,7 +263,9 @@ def create_app(config_name=None):
         nav_products = []
         if Product is not None:
             try:
+                from app.utils.projections import load_profile
                 nav_products = (Product.query
+                                  .options(load_profile('nav'))
                                   .filter_by(status='active')
                                   .order_by(Product.sort_order, Product.name_en)
                                   .all()) or []
@@ -531,6 +595,11 @@ def create_app(config_name=None):
         from flask import render_template
         return render_template('errors/404.html'), 404
 
+    @app.errorhandler(429)
+    def rate_limited_error(error):
+        from flask import render_template
+        return render_template('errors/429.html'), 429
+
     @app.errorhandler(500)
     def internal_error(error):
         from flask import render_template
@@ -34,9 +34,16 @@ def _t(text: str) -> str:
     return mapping.get(text, text)
 
 from app.forms import LoginForm, UserForm, CategoryForm, ProductForm, CertificationForm, ServiceForm, NewsForm, GalleryForm, CompanyInfoForm
-from app import db
+from app import db, limiter
+from app.utils.pagination import keyset_paginate
+from app.utils.search import matching_ids
+from app.utils.hs_codes import find_hs_codes
+from app.utils.projections import load_profile
+from app.utils.loading import eager
+from sqlalchemy.orm import joinedload, selectinload
 import os
 import json
+import asyncio
 from datetime import datetime
 import uuid
 
@@ -61,6 +68,7 @@ def editor_required(f):
     return decorated_function
 
 @bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit(lambda: current_app.config['RATELIMIT_LOGIN'], methods=['POST'])
 def login():
     """Admin login."""
     if current_user.is_authenticated:
@@ -130,7 +138,8 @@ def dashboard():
     recent_rfqs = RFQ.query.order_by(RFQ.created_at.desc()).limit(5).all()
 
     # Get recent audit logs
-    recent_logs = AuditLog.query.order_by(AuditLog.created_at.desc()).limit(10).all()
+    recent_logs = (AuditLog.query.options(*eager(joinedload(AuditLog.user)))
+                   .order_by(AuditLog.created_at.desc()).limit(10).all())
 
     return render_template('admin/dashboard.html',
                          stats=stats,
@@ -143,7 +152,9 @@ def dashboard():
 @login_required
 def calendar_admin():
     """Admin Seasonality Calendar management."""
-    products = Product.query.filter_by(status='active').order_by(Product.sort_order, Product.name_en).all()
+    products = (Product.query.options(load_profile('card'), *eager(selectinload(Product.category)))
+                .filter_by(status='active')
+                .order_by(Product.sort_order, Product.name_en).all())
     categories = Category.query.filter_by(is_active=True).order_by(Category.sort_order).all()
     return render_template('admin/calendar.html', products=products, categories=categories)
 
@@ -364,11 +375,6 @@ def category_delete(id):
 @login_required
 def products():
     """Products listing."""
-    try:
-        page = request.args.get('page', 1, type=int)
-    except ValueError:
-        page = 1
-
     try:
         category_id = request.args.get('category', type=int) if request.args.get('category') else None
     except ValueError:
@@ -377,8 +383,8 @@ def products():
     status = request.args.get('status', 'all')
     search = request.args.get('search', '')
 
-    # Base query
-    query = Product.query
+    # Base query: only the columns of the table rows
+    query = Product.query.options(load_profile('admin_row'), *eager(selectinload(Product.category)))
 
     # Apply filters
     if category_id:
@@ -388,14 +394,11 @@ def products():
         query = query.filter_by(status=status)
 
     if search:
-        query = query.filter(Product.name_en.contains(search))
+        # Full-text index over both languages and HS codes (see app/utils/search.py)
+        query = query.filter(Product.id.in_(matching_ids('product', search)))
 
-    # Paginate
-    products = query.order_by(Product.updated_at.desc()).paginate(
-        page=page,
-        per_page=20,
-        error_out=False
-    )
+    # Keyset pagination (constant cost at any depth; see app/utils/pagination.py)
+    products = keyset_paginate(query, Product.updated_at, Product.id, cursor=request.args.get('cursor'))
 
     # Get categories for filter
     categories = Category.query.filter_by(is_active=True).order_by(Category.name_en).all()
@@ -776,11 +779,6 @@ def product_delete(id):
 @login_required
 def rfqs():
     """RFQ listing."""
-    try:
-        page = request.args.get('page', 1, type=int)
-    except ValueError:
-        page = 1
-
     status = request.args.get('status', 'all')
 
     # Base query
@@ -790,12 +788,8 @@ def rfqs():
     if status != 'all':
         query = query.filter_by(status=status)
 
-    # Paginate
-    rfqs = query.order_by(RFQ.created_at.desc()).paginate(
-        page=page,
-        per_page=20,
-        error_out=False
-    )
+    # Keyset pagination (constant cost at any depth; see app/utils/pagination.py)
+    rfqs = keyset_paginate(query, RFQ.created_at, RFQ.id, cursor=request.args.get('cursor'))
 
     return render_template('admin/rfqs.html', rfqs=rfqs, current_status=status)
 
@@ -887,11 +881,6 @@ def set_language(language):
 @login_required
 def news():
     """News management page."""
-    try:
-        page = request.args.get('page', 1, type=int)
-    except ValueError:
-        page = 1
-
     status = request.args.get('status', 'all')
     search = request.args.get('search', '')
 
@@ -901,18 +890,9 @@ def news():
         query = query.filter_by(status=status)
 
     if search:
-        query = query.filter(
-            db.or_(
-                News.title_en.contains(search),
-                News.title_ar.contains(search),
-                News.content_en.contains(search),
-                News.content_ar.contains(search)
-            )
-        )
+        query = query.filter(News.id.in_(matching_ids('news', search)))
 
-    news_items = query.order_by(News.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    news_items = keyset_paginate(query, News.created_at, News.id, cursor=request.args.get('cursor'))
 
     return render_template('admin/news.html',
                          news_items=news_items,
@@ -1105,14 +1085,7 @@ def news_delete(id):
 @login_required
 def gallery():
     """Gallery management page."""
-    try:
-        page = request.args.get('page', 1, type=int)
-    except ValueError:
-        page = 1
-
-    gallery_items = Gallery.query.order_by(Gallery.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    gallery_items = keyset_paginate(Gallery.query, Gallery.created_at, Gallery.id, cursor=request.args.get('cursor'))
 
     return render_template('admin/gallery.html', gallery_items=gallery_items)
 
@@ -1447,17 +1420,42 @@ def certifications():
 @admin_required
 def users():
     """Users management page."""
-    try:
-        page = request.args.get('page', 1, type=int)
-    except ValueError:
-        page = 1
-
-    users_list = User.query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    users_list = keyset_paginate(User.query, User.created_at, User.id, cursor=request.args.get('cursor'))
 
     return render_template('admin/users.html', users_list=users_list)
 
+AUDIT_ACTIONS = ['create', 'update', 'delete', 'login', 'logout']
+AUDIT_ENTITY_TYPES = ['category', 'products', 'rfq']  # as written by the views above
+
+@bp.route('/audit-logs')
+@admin_required
+def audit_logs():
+    """Audit log browser, newest first, filterable by action, entity type and user."""
+    action = request.args.get('action', '')
+    entity_type = request.args.get('entity_type', '')
+    user_id = request.args.get('user_id', type=int)
+
+    # Each filter has a (column, created_at) index, so every page is an index seek
+    query = AuditLog.query.options(*eager(joinedload(AuditLog.user)))
+    if action:
+        query = query.filter_by(action=action)
+    if entity_type:
+        query = query.filter_by(entity_type=entity_type)
+    if user_id:
+        query = query.filter_by(user_id=user_id)
+
+    logs = keyset_paginate(query, AuditLog.created_at, AuditLog.id, cursor=request.args.get('cursor'), per_page=50)
+    users = User.query.order_by(User.name).all()
+
+    return render_template('admin/audit_logs.html',
+                         logs=logs,
+                         users=users,
+                         actions=AUDIT_ACTIONS,
+                         entity_types=AUDIT_ENTITY_TYPES,
+                         current_action=action,
+                         current_entity_type=entity_type,
+                         current_user_id=user_id)
+
 @bp.route('/users/new', methods=['GET', 'POST'])
 @admin_required
 def users_new():
@@ -1519,7 +1517,8 @@ def reports():
 
     # Recent activity
     recent_rfqs = RFQ.query.order_by(RFQ.created_at.desc()).limit(10).all()
-    recent_products = Product.query.order_by(Product.created_at.desc()).limit(5).all()
+    recent_products = (Product.query.options(*eager(selectinload(Product.category)))
+                       .order_by(Product.created_at.desc()).limit(5).all())
 
     stats = {
         'total_products': total_products,
@@ -1732,6 +1731,21 @@ def reports_rfqs():
     return jsonify({'items': data, 'count': len(data)})
 
 
+# HS code picker (JSON)
+@bp.route('/hs-codes')
+@login_required
+def hs_codes_lookup():
+    """Known HS codes for the product form.
+    Query params: q (code prefix or description words), limit (default 20)
+    """
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+    except Exception:
+        limit = 20
+    items = [entry.to_dict() for entry in find_hs_codes(request.args.get('q', ''), limit)]
+    return jsonify({'items': items, 'count': len(items)})
+
+
 # Reports export (CSV)
 @bp.route('/reports/export')
 @login_required
@@ -1775,6 +1789,39 @@ def reports_export():
     return jsonify({'error': 'unsupported export type'}), 400
 
 
+# Profiling
+@bp.route('/profiles')
+@admin_required
+def profiles():
+    """List saved sampling profiles and issue a per-request profiling token."""
+    from app.utils.profiler import list_profiles, issue_profile_token
+    return render_template('admin/profiles.html',
+                           profiles=list_profiles(),
+                           profile_token=issue_profile_token(current_user.id),
+                           token_max_age=current_app.config.get('PROFILER_TOKEN_MAX_AGE', 3600))
+
+@bp.route('/profiles/window', methods=['POST'])
+@admin_required
+def profiles_window():
+    """Profile this worker for a time window."""
+    from app.utils.profiler import start_window
+    seconds = request.form.get('seconds', 30, type=int) or 30
+    seconds = max(1, min(seconds, current_app.config.get('PROFILER_MAX_WINDOW', 120)))
+    start_window(current_app._get_current_object(), seconds)
+    flash(f'Profiling worker {os.getpid()} for {seconds} seconds. Refresh this page afterwards to download it.', 'success')
+    return redirect(url_for('admin.profiles'))
+
+@bp.route('/profiles/<path:filename>')
+@admin_required
+def profiles_download(filename):
+    """Download a collapsed-stack profile (open it in https://www.speedscope.app)."""
+    from app.utils.profiler import profiles_dir, PROFILE_SUFFIX
+    filename = secure_filename(filename)
+    if not filename.endswith(PROFILE_SUFFIX):
+        abort(404)
+    return send_from_directory(profiles_dir(), filename, as_attachment=True)
+
+
 # Settings
 @bp.route('/settings', methods=['GET', 'POST'])
 @admin_required
@@ -1792,7 +1839,7 @@ def settings():
 
 @bp.route('/upload-editor-image', methods=['POST'])
 @login_required
-def upload_editor_image():
+async def upload_editor_image():
     """Upload image for Summernote editor."""
     try:
         if 'file' not in request.files:
@@ -1819,7 +1866,7 @@ def upload_editor_image():
                                  current_app.config['UPLOAD_FOLDER'],
                                  'editor', filename)
         os.makedirs(os.path.dirname(upload_path), exist_ok=True)
-        file.save(upload_path)
+        await asyncio.to_thread(file.save, upload_path)
 
         # Return URL
         file_url = url_for('main.uploaded_file', filename=f'editor/{filename}')
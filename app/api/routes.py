@@ -1,11 +1,21 @@
-from flask import jsonify, request
+import math
+
+from flask import jsonify, request, url_for
 from app.api import bp
-from app.models import Category, Product
+from app.models import Product
+from app.utils.search import search_site
+from app.utils.autocomplete import suggest
+from app.utils.hs_codes import annotate_products
+from app.utils.attributes import products_matching, products_with_attribute
+from app.utils.projections import load_profile
+from app.utils.loading import eager
+from app.utils.reference_data import get_reference_data
+from sqlalchemy.orm import selectinload
 
 @bp.route('/categories')
 def api_categories():
     """Get all active categories."""
-    categories = Category.query.filter_by(is_active=True).order_by(Category.sort_order).all()
+    categories = get_reference_data().categories()
     return jsonify([{
         'id': cat.id,
         'key': cat.key,
@@ -14,26 +24,60 @@ def api_categories():
         'slug': cat.slug
     } for cat in categories])
 
+def _number(text):
+    """``text`` as a finite float, or None when it is not a plain number."""
+    try:
+        number = float(text)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
 @bp.route('/products')
 def api_products():
-    """Get products with optional category filter."""
+    """Get products with optional category and attribute filters.
+    Query params: category, packaging ("10kg carton"), attr (e.g. brix) with min / max / value.
+    A numeric value (attr=brix&value=11) must fall inside the stored range (11-14 matches);
+    any other value (attr=shelf_life&value=3 weeks) must equal the whole option text.
+    """
     category_key = request.args.get('category')
     
-    query = Product.query.filter_by(status='active')
+    query = (Product.query.options(load_profile('api_summary'), *eager(selectinload(Product.category)))
+             .filter_by(status='active'))
     
     if category_key:
-        category = Category.query.filter_by(key=category_key, is_active=True).first()
+        category = get_reference_data().category(category_key)
         if category:
             query = query.filter_by(category_id=category.id)
+
+    packaging = request.args.get('packaging', '').strip()[:100]
+    if packaging:
+        query = query.filter(Product.id.in_(products_matching(packaging, 'packaging')))
+
+    attr = request.args.get('attr', '').strip()[:50]
+    if attr:
+        value = request.args.get('value', '').strip()[:200] or None
+        number = _number(value)
+        query = query.filter(Product.id.in_(products_with_attribute(
+            key=attr,
+            at_least=request.args.get('min', type=float),
+            at_most=request.args.get('max', type=float),
+            value=number,
+            text=value if number is None else None,
+        )))
     
     products = query.order_by(Product.sort_order, Product.name_en).all()
+    language = 'ar' if request.args.get('lang') == 'ar' else 'en'
+    hs_codes = annotate_products(products, language)
     
     return jsonify([{
         'id': product.id,
         'name_en': product.name_en,
         'name_ar': product.name_ar,
         'slug': product.slug,
-        'category_key': product.category.key if product.category else None
+        'category_key': product.category.key if product.category else None,
+        'hs_code': product.hs_code,
+        'hs_code_info': hs_codes.get(product.id)
     } for product in products])
 
 @bp.route('/products/<slug>')
@@ -60,3 +104,51 @@ def api_product_detail(slug):
         'seasonality': product.get_seasonality(),
         'packaging_options': product.get_packaging_options()
     })
+
+@bp.route('/search')
+def api_search():
+    """Ranked full-text search over active products and published news."""
+    query_text = request.args.get('q', '').strip()[:200]
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+
+    if not query_text:
+        return jsonify({'query': query_text, 'products': [], 'news': []})
+
+    products, news_items = search_site(query_text, limit=limit)
+
+    return jsonify({
+        'query': query_text,
+        'products': [{
+            'id': product.id,
+            'name_en': product.name_en,
+            'name_ar': product.name_ar,
+            'slug': product.slug,
+            'hs_code': product.hs_code,
+            'url': url_for('main.product_detail', slug=product.slug)
+        } for product in products],
+        'news': [{
+            'id': article.id,
+            'title_en': article.title_en,
+            'title_ar': article.title_ar,
+            'slug': article.slug,
+            'url': url_for('main.news_detail', slug=article.slug)
+        } for article in news_items]
+    })
+
+@bp.route('/suggest')
+def api_suggest():
+    """Search-as-you-type suggestions from the in-memory prefix index (no database query)."""
+    query_text = request.args.get('q', '')[:100]
+    language = 'ar' if request.args.get('lang') == 'ar' else 'en'
+    limit = min(max(request.args.get('limit', 8, type=int), 1), 20)
+
+    response = jsonify([{
+        'type': suggestion.kind,
+        'label': suggestion.label(language),
+        'url': url_for(suggestion.endpoint, **suggestion.values)
+    } for suggestion in suggest(query_text, limit)])
+
+    # Everything that varies the body is in the URL, so shared caches can keep it
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    response.add_etag()
+    return response.make_conditional(request)
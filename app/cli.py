@@ -0,0 +1,150 @@
+"""
+Custom ``flask`` CLI commands.
+
+    flask seed-synthetic --rfqs 100000 --audit-logs 1000000 --seed 7
+    flask rebuild-derived [search|facets|attributes|cards|all ...]
+"""
+
+import time
+from datetime import datetime
+
+import click
+from sqlalchemy import insert, select
+
+
+def bulk_insert(table, rows, batch_size):
+    """Insert ``rows`` with one executemany per batch, committing each batch; return the row count."""
+    from app import db
+    from app.utils.synthetic import batched
+
+    total = 0
+    for batch in batched(rows, batch_size):
+        db.session.execute(insert(table), batch)
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def derived_tables():
+    """``{name: (label, ensure, rebuild)}`` of the tables derived from products, in rebuild order.
+
+    The ORM hooks keep them in sync; writes that bypass the ORM (bulk inserts,
+    restored dumps) need a rebuild.
+    """
+    from app.utils.attributes import ensure_product_attributes, rebuild_product_attributes
+    from app.utils.facets import ensure_product_facets, rebuild_product_facets
+    from app.utils.product_cards import ensure_product_cards, rebuild_product_cards
+    from app.utils.search import ensure_search_index, rebuild_search_index
+
+    return {
+        'search': ('search index', ensure_search_index, rebuild_search_index),
+        'facets': ('product facets', ensure_product_facets, rebuild_product_facets),
+        'attributes': ('attributes', ensure_product_attributes, rebuild_product_attributes),
+        'cards': ('product cards', ensure_product_cards, rebuild_product_cards),
+    }
+
+
+def report(label, count, started):
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    click.echo(f'✅ {label:<15}{count:>10,} rows in {elapsed:7.2f}s ({rate:,.0f} rows/s)')
+
+
+def rebuild_derived(names=None):
+    """Create (if missing) and rebuild the derived tables ``names`` (default: all), reporting each."""
+    from app import db
+
+    tables = derived_tables()
+    for name in names or tables:
+        label, ensure, rebuild = tables[name]
+        started = time.perf_counter()
+        if not ensure(db):
+            raise click.ClickException('Product tables are missing; run init_db_render.py first.')
+        report(label, rebuild(db), started)
+
+
+def register_cli(app):
+    """Attach the CLI commands to ``app``."""
+
+    @app.cli.command('seed-synthetic')
+    @click.option('--seed', default=42, show_default=True, help='Random seed; same seed gives the same rows.')
+    @click.option('--categories', default=20, show_default=True)
+    @click.option('--products', default=5000, show_default=True)
+    @click.option('--images-per-product', default=3, show_default=True)
+    @click.option('--news', default=2000, show_default=True)
+    @click.option('--gallery', default=500, show_default=True)
+    @click.option('--rfqs', default=100000, show_default=True)
+    @click.option('--audit-logs', default=1000000, show_default=True)
+    @click.option('--batch-size', default=10000, show_default=True, help='Rows per INSERT batch / transaction.')
+    @click.option('--days', default=365, show_default=True, help='Spread timestamps over this many days.')
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Newest timestamp (default: today). Fix it for identical output across days.')
+    def seed_synthetic(seed, categories, products, images_per_product, news, gallery, rfqs, audit_logs,
+                       batch_size, days, end_date):
+        """Bulk-insert deterministic synthetic data for scale testing."""
+        from app import db
+        from app.models import AuditLog, Category, Gallery, News, Product, ProductImage, RFQ, User
+        from app.utils.synthetic import SyntheticData
+
+        data = SyntheticData(seed=seed, end=end_date, days=days)
+        if Category.query.filter(Category.key.like(f'{data.prefix}-%')).first() or \
+                Product.query.filter(Product.slug.like(f'{data.prefix}-%')).first():
+            raise click.ClickException(f'Synthetic rows for seed {seed} already exist; use another --seed.')
+
+        user_ids = [row[0] for row in db.session.execute(select(User.id))]
+        if audit_logs and not user_ids:
+            raise click.ClickException('Audit log rows need at least one user; run init_db_render.py first.')
+
+        started = time.perf_counter()
+
+        t = time.perf_counter()
+        report('categories', bulk_insert(Category.__table__, data.categories(categories), batch_size), t)
+        category_rows = db.session.execute(
+            select(Category.id, Category.key).where(Category.key.like(f'{data.prefix}-%'))
+        ).all()
+        category_ids = [row.id for row in category_rows] or [row[0] for row in db.session.execute(select(Category.id))]
+        category_keys = [row.key for row in category_rows] or ['citrus']
+
+        t = time.perf_counter()
+        report('products', bulk_insert(Product.__table__, data.products(products, category_ids), batch_size), t)
+        product_rows = db.session.execute(
+            select(Product.id, Product.name_en).where(Product.slug.like(f'{data.prefix}-%')).order_by(Product.id)
+        ).all()
+
+        t = time.perf_counter()
+        count = bulk_insert(ProductImage.__table__,
+                            data.product_images([row.id for row in product_rows], images_per_product), batch_size)
+        report('product images', count, t)
+
+        t = time.perf_counter()
+        report('news', bulk_insert(News.__table__, data.news(news), batch_size), t)
+
+        t = time.perf_counter()
+        report('gallery', bulk_insert(Gallery.__table__, data.gallery(gallery), batch_size), t)
+
+        product_names = [row.name_en for row in product_rows[:500]] or ['Fresh Oranges']
+        t = time.perf_counter()
+        report('rfqs', bulk_insert(RFQ.__table__, data.rfqs(rfqs, category_keys, product_names), batch_size), t)
+
+        t = time.perf_counter()
+        report('audit logs', bulk_insert(AuditLog.__table__, data.audit_logs(audit_logs, user_ids), batch_size), t)
+
+        # Running workers learn of the bulk rows from the cache version counters
+        from app.utils.cache_bus import bump
+        bump(db.session, ('category', 'product', 'news', 'gallery', 'rfq', 'audit_log'))
+        db.session.commit()
+
+        # Bulk inserts bypass the ORM hooks that keep the derived tables in sync
+        rebuild_derived()
+
+        if db.engine.dialect.name == 'sqlite':
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql('ANALYZE')
+        click.echo(f'🎉 Synthetic data (seed {seed}) generated in {time.perf_counter() - started:.1f}s '
+                   f'at {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC')
+
+    @app.cli.command('rebuild-derived')
+    @click.argument('tables', nargs=-1, type=click.Choice(['search', 'facets', 'attributes', 'cards', 'all']))
+    def rebuild_derived_command(tables):
+        """Rebuild the search index, facets, attributes and/or cards (default: all)."""
+        rebuild_derived(None if not tables or 'all' in tables else list(dict.fromkeys(tables)))
@@ -2,79 +2,77 @@ from flask import render_template, request, redirect, url_for, flash, current_ap
 from flask_mail import Message
 from werkzeug.utils import secure_filename
 from app.main import bp
-from app.models import Category, Product, Certification, Service, News, Gallery, RFQ, CompanyInfo, GalleryCategory
+from app.models import Product, ProductCard, News, Gallery, RFQ
 from app.forms import RFQForm
-from app import db, mail
+from app import db, mail, limiter
+from app.utils.search import search_site
+from app.utils.facets import FacetSelection, facet_counts
+from app.utils.hs_codes import HS_CHAPTERS
+from app.utils.projections import load_profile
+from app.utils.reference_data import get_reference_data
 import os
+import uuid
+import asyncio
 from datetime import datetime
 
+def _featured_cards(limit=9):
+    """Product cards for the homepage and calendar picks.
+
+    One product from each of the top 8 homepage categories (by sort_order), then the
+    first other homepage product, then any active products up to ``limit``.
+    """
+    categories_for_products = get_reference_data().categories(homepage=True, limit=8)
+    ordered = (ProductCard.sort_order, ProductCard.name_en)
+
+    picked = []
+    picked_ids = set()
+
+    # One product per category
+    for cat in categories_for_products:
+        card = ProductCard.query.filter_by(
+            status='active',
+            show_on_homepage=True,
+            category_id=cat.id
+        ).order_by(*ordered).first()
+        if not card:
+            # Fallback to any active product in this category
+            card = ProductCard.query.filter_by(
+                status='active',
+                category_id=cat.id
+            ).order_by(*ordered).first()
+        if card and card.id not in picked_ids:
+            picked.append(card)
+            picked_ids.add(card.id)
+
+    # Extra product (automatic choice): first homepage product not already picked
+    if len(picked) < limit:
+        card = ProductCard.query.filter_by(status='active', show_on_homepage=True)\
+            .filter(ProductCard.id.notin_(picked_ids)).order_by(*ordered).first()
+        if card:
+            picked.append(card)
+            picked_ids.add(card.id)
+
+    # If still short, fill with any active products
+    if len(picked) < limit:
+        picked.extend(ProductCard.query.filter_by(status='active')
+                      .filter(ProductCard.id.notin_(picked_ids)).order_by(*ordered)
+                      .limit(limit - len(picked)).all())
+
+    return picked[:limit]
+
+
 @bp.route('/')
 def index():
     """Homepage."""
     try:
         # Get featured categories (now using show_on_homepage instead of parent_id=None)
-        featured_categories = Category.query.filter_by(
-            is_active=True,
-            show_on_homepage=True
-        ).order_by(Category.sort_order).limit(6).all() or []
+        featured_categories = get_reference_data().categories(homepage=True, limit=6)
     except Exception as e:
         print(f"Warning: Could not load categories: {e}")
         featured_categories = []
 
     try:
-        # Build featured products as 9 items:
-        # - One product from each of the top 8 homepage categories (by sort_order)
-        # - Plus a 9th extra product chosen automatically from featured list, then any active as fallback
-        categories_for_products = Category.query.filter_by(
-            is_active=True,
-            show_on_homepage=True
-        ).order_by(Category.sort_order).limit(8).all() or []
-
-        picked = []
-        picked_ids = set()
-
-        # One product per category
-        for cat in categories_for_products:
-            p = Product.query.filter_by(
-                status='active',
-                show_on_homepage=True,
-                category_id=cat.id
-            ).order_by(Product.sort_order, Product.name_en).first()
-            if not p:
-                # Fallback to any active product in this category
-                p = Product.query.filter_by(
-                    status='active',
-                    category_id=cat.id
-                ).order_by(Product.sort_order, Product.name_en).first()
-            if p and p.id not in picked_ids:
-                picked.append(p)
-                picked_ids.add(p.id)
-
-        # Add 9th extra product (our automatic choice): first featured not already picked
-        if len(picked) < 9:
-            extra_featured = Product.query.filter_by(
-                status='active',
-                show_on_homepage=True
-            ).order_by(Product.sort_order, Product.name_en).all() or []
-            for ep in extra_featured:
-                if ep.id not in picked_ids:
-                    picked.append(ep)
-                    picked_ids.add(ep.id)
-                    break
-
-        # If still fewer than 9, fill with any active products
-        if len(picked) < 9:
-            extra_any = Product.query.filter_by(status='active')\
-                .order_by(Product.sort_order, Product.name_en).all() or []
-            for ep in extra_any:
-                if ep.id not in picked_ids:
-                    picked.append(ep)
-                    picked_ids.add(ep.id)
-                    if len(picked) >= 9:
-                        break
-
-        # Ensure exactly up to 9
-        featured_products = picked[:9]
+        featured_products = _featured_cards()
     except Exception as e:
         print(f"Warning: Could not load products: {e}")
         featured_products = []
@@ -104,8 +102,9 @@ def index():
             latest_news = []
 
     # Get company info sections for homepage
-    about_intro = CompanyInfo.query.filter_by(key='about_intro', is_active=True).first()
-    why_choose_us = CompanyInfo.query.filter_by(key='why_choose_us', is_active=True).first()
+    reference = get_reference_data()
+    about_intro = reference.company_info('about_intro')
+    why_choose_us = reference.company_info('why_choose_us')
 
     return render_template('main/index.html',
                          featured_categories=featured_categories,
@@ -123,121 +122,44 @@ def about():
 @bp.route('/calendar')
 def calendar():
     """Public Seasonality Calendar page."""
-    from app.models import Product, Category
-    from flask import request
     language = request.args.get('lang') or ('ar' if session.get('language') == 'ar' else 'en')
     category_key = request.args.get('category')
-    q = (Product.query
+    q = (ProductCard.query
          .filter_by(status='active')
-         .order_by(Product.sort_order, Product.name_en))
-    categories = Category.query.filter_by(is_active=True, parent_id=None).order_by(Category.sort_order).all() or []
+         .order_by(ProductCard.sort_order, ProductCard.name_en))
+    reference = get_reference_data()
+    categories = reference.categories(top_level=True)
     if category_key:
-        from app.models import Category as Cat
-        cat = Cat.query.filter_by(key=category_key, is_active=True).first()
+        cat = reference.category(category_key)
         if cat:
             q = q.filter_by(category_id=cat.id)
-    products = q.all()
-    # Build a simple normalized seasonality map per product for the template
-    def normalize(prod):
-        raw = prod.get_seasonality() or {}
-        data_lang = prod.get_seasonality_lang(language) or {}
-        # Unwrap 'fresh' if present in language-scoped data
-        base = data_lang.get('fresh') if isinstance(data_lang, dict) and 'fresh' in data_lang else data_lang
-        # Normalize five states from base
-        peak = sorted(set((base.get('peak') or []))) if isinstance(base, dict) else []
-        available = sorted(set((base.get('available') or []))) if isinstance(base, dict) else []
-        limited = sorted(set((base.get('limited') or []))) if isinstance(base, dict) else []
-        off = sorted(set((base.get('off') or []))) if isinstance(base, dict) else []
-        # IQF months can live under base['iqf'] (list) or raw['iqf'] (list or dict)
-        iqf_months = []
-        if isinstance(base, dict) and isinstance(base.get('iqf'), list):
-            iqf_months = base.get('iqf')
-        else:
-            iqf = raw.get('iqf') if isinstance(raw, dict) else None
-            if isinstance(iqf, list):
-                iqf_months = iqf
-            elif isinstance(iqf, dict):
-                if iqf.get('year_round'):
-                    iqf_months = [1,2,3,4,5,6,7,8,9,10,11,12]
-                elif isinstance(iqf.get('months'), list):
-                    iqf_months = iqf.get('months')
+    cards = q.all()
+    # One list of months per state for the template, from the card's season strip
+    def normalize(card):
+        by_state = {'peak': [], 'available': [], 'limited': [], 'off': [], 'iqf': []}
+        for m, state in enumerate(card.get_months_state(language), 1):
+            by_state[state].append(m)
         return {
-            'id': prod.id,
-            'name': prod.get_name(language),
-            'slug': prod.slug,
-            'category_key': prod.category.key if prod.category else None,
-            'hs_code': prod.hs_code,
-            'peak': peak,
-            'available': available,
-            'limited': limited,
-            'off': off,
-            'iqf': sorted(set(iqf_months))
+            'id': card.id,
+            'name': card.get_name(language),
+            'slug': card.slug,
+            'category_key': card.category_key,
+            'hs_code': card.hs_code,
+            **by_state
         }
-    items = [normalize(p) for p in products]
+    items = [normalize(c) for c in cards]
     months = [1,2,3,4,5,6,7,8,9,10,11,12]
-    # Inject iqf sub-structure if exists
-    for it, p in zip(items, products):
-        data = p.get_seasonality() or {}
-        it['iqf'] = data.get('iqf', {})
     # Counts for header filter info
     try:
-        total_count = Product.query.filter_by(status='active').count()
+        total_count = ProductCard.query.filter_by(status='active').count()
     except Exception:
         total_count = len(items)
-    filtered_count = len(products)
-    # Featured products for calendar footer section — mirror homepage logic (9 items)
+    filtered_count = len(cards)
+    # Featured products for calendar footer section — same picks as the homepage (9 items)
     try:
-        categories_for_products = Category.query.filter_by(
-            is_active=True,
-            show_on_homepage=True
-        ).order_by(Category.sort_order).limit(8).all() or []
-
-        picked = []
-        picked_ids = set()
-
-        # One product per category
-        for cat in categories_for_products:
-            psel = Product.query.filter_by(
-                status='active',
-                show_on_homepage=True,
-                category_id=cat.id
-            ).order_by(Product.sort_order, Product.name_en).first()
-            if not psel:
-                # Fallback to any active product in this category
-                psel = Product.query.filter_by(
-                    status='active',
-                    category_id=cat.id
-                ).order_by(Product.sort_order, Product.name_en).first()
-            if psel and psel.id not in picked_ids:
-                picked.append(psel)
-                picked_ids.add(psel.id)
-
-        # Add 9th extra product (automatic choice): first featured not already picked
-        if len(picked) < 9:
-            extra_featured = Product.query.filter_by(
-                status='active',
-                show_on_homepage=True
-            ).order_by(Product.sort_order, Product.name_en).all() or []
-            for ep in extra_featured:
-                if ep.id not in picked_ids:
-                    picked.append(ep)
-                    picked_ids.add(ep.id)
-                    break
-
-        # If still fewer than 9, fill with any active products
-        if len(picked) < 9:
-            extra_any = Product.query.filter_by(status='active')\
-                .order_by(Product.sort_order, Product.name_en).all() or []
-            for ep in extra_any:
-                if ep.id not in picked_ids:
-                    picked.append(ep)
-                    picked_ids.add(ep.id)
-                    if len(picked) >= 9:
-                        break
-
-        featured_products = picked[:9]
+        featured_products = _featured_cards()
     except Exception:
-        featured_products = products[:9]
+        featured_products = cards[:9]
 
     return render_template('main/calendar.html', items=items, months=months, categories=categories, current_category=category_key, total_count=total_count, filtered_count=filtered_count, featured_products=featured_products)
 
@@ -247,38 +169,7 @@ def _build_seasonality_view(prod, language):
     Output keys: months_state (list index 0..11), current_state (str)
     """
     from datetime import datetime
-    raw = prod.get_seasonality() or {}
-    data_lang = prod.get_seasonality_lang(language) or {}
-    base = data_lang.get('fresh') if isinstance(data_lang, dict) and 'fresh' in data_lang else data_lang
-    # Extract lists
-    peak = set((base.get('peak') or [])) if isinstance(base, dict) else set()
-    available = set((base.get('available') or [])) if isinstance(base, dict) else set()
-    limited = set((base.get('limited') or [])) if isinstance(base, dict) else set()
-    # IQF months detection (list on base or raw; dict with year_round)
-    iqf_months = set()
-    if isinstance(base, dict) and isinstance(base.get('iqf'), list):
-        iqf_months = set(base.get('iqf'))
-    else:
-        iqf = raw.get('iqf') if isinstance(raw, dict) else None
-        if isinstance(iqf, list):
-            iqf_months = set(iqf)
-        elif isinstance(iqf, dict):
-            if iqf.get('year_round'):
-                iqf_months = set(range(1,13))
-            elif isinstance(iqf.get('months'), list):
-                iqf_months = set(iqf.get('months'))
-    months_state = []
-    for m in range(1,13):
-        if m in peak:
-            months_state.append('peak')
-        elif m in available:
-            months_state.append('available')
-        elif m in limited:
-            months_state.append('limited')
-        elif m in iqf_months:
-            months_state.append('iqf')
-        else:
-            months_state.append('off')
+    months_state = prod.get_months_state(language)
     cur_month = datetime.utcnow().month
     current_state = months_state[cur_month-1]
     return {'months_state': months_state, 'current_state': current_state}
@@ -286,32 +177,40 @@ def _build_seasonality_view(prod, language):
 @bp.route('/products')
 def products():
     """Products listing page."""
-    # Get category filter
-    category_key = request.args.get('cat')
     try:
         page = request.args.get('page', 1, type=int)
     except ValueError:
         page = 1
 
-    # Base query
-    query = Product.query.filter_by(status='active')
+    # Facet filters: category (cat), HS chapter (hs), certification (cert), month in season, featured
+    reference = get_reference_data()
+    active_categories = reference.categories()
+    selection = FacetSelection.from_args(request.args, active_categories)
+    selected_category = next((c for c in active_categories if str(c.id) == selection.get('category')), None)
 
-    # Filter by category if specified
-    selected_category = None
-    if category_key:
-        selected_category = Category.query.filter_by(key=category_key, is_active=True).first()
-        if selected_category:
-            query = query.filter_by(category_id=selected_category.id)
+    # Base query: one narrow product_card row per card
+    query = selection.apply(ProductCard.query.filter_by(status='active'), ProductCard)
 
     # Paginate results
-    products = query.order_by(Product.sort_order, Product.name_en).paginate(
+    products = query.order_by(ProductCard.sort_order, ProductCard.name_en).paginate(
         page=page,
         per_page=current_app.config['PRODUCTS_PER_PAGE'],
         error_out=False
     )
 
-    # Get all categories for filter menu
-    categories = Category.query.filter_by(is_active=True, parent_id=None).order_by(Category.sort_order).all() or []
+    # Get top-level categories for filter menu
+    categories = [c for c in active_categories if c.parent_id is None]
+
+    # Counts per facet value come from the per-worker facet index, not a GROUP BY
+    counts = facet_counts(selection)
+    certifications = reference.certifications()
+    facets = {
+        'counts': counts,
+        'hs_chapters': sorted(counts.get('hs_chapter', {})),
+        'chapter_names': HS_CHAPTERS,
+        'certifications': [c for c in certifications if counts.get('certification', {}).get(str(c.id))
+                           or selection.get('certification') == str(c.id)],
+    }
 
     # Build mini seasonality map for cards
     language = 'ar' if session.get('language') == 'ar' else 'en'
@@ -321,6 +220,8 @@ def products():
                          products=products,
                          categories=categories,
                          selected_category=selected_category,
+                         selection=selection,
+                         facets=facets,
                          seasons_map=seasons_map)
 
 @bp.route('/product/<slug>')
@@ -333,7 +234,7 @@ def product_detail(slug):
     season_view = _build_seasonality_view(product, language)
 
     # Get related products from same category
-    related_products = Product.query.filter_by(
+    related_products = Product.query.options(load_profile('card')).filter_by(
         category_id=product.category_id,
         status='active'
     ).filter(Product.id != product.id).order_by(Product.sort_order).limit(4).all()
@@ -346,13 +247,13 @@ def product_detail(slug):
 @bp.route('/certifications')
 def certifications():
     """Certifications page."""
-    certifications = Certification.query.filter_by(is_active=True).order_by(Certification.sort_order).all()
+    certifications = get_reference_data().certifications()
     return render_template('main/certifications.html', certifications=certifications)
 
 @bp.route('/services')
 def services():
     """Services page."""
-    services = Service.query.filter_by(is_active=True).order_by(Service.sort_order).all()
+    services = get_reference_data().services()
     return render_template('main/services.html', services=services)
 
 @bp.route('/gallery')
@@ -374,28 +275,16 @@ def gallery():
     categories = [cat[0] for cat in categories if cat[0]]
 
     # Ensure default categories appear if they exist in GalleryCategory (seeded) even لو لم توجد صور بعد
-    try:
-        defaults = ['farms','packing','storage','exports']
-        default_rows = GalleryCategory.query.filter(GalleryCategory.key.in_(defaults), GalleryCategory.is_active == True).all()
-        for row in default_rows:
-            if row.key not in categories:
-                categories.append(row.key)
-    except Exception:
-        pass
+    reference = get_reference_data()
+    defaults = ['farms','packing','storage','exports']
+    for key in defaults:
+        if reference.gallery_category(key, active=True) and key not in categories:
+            categories.append(key)
 
-    # Map icons
-    try:
-        icon_rows = GalleryCategory.query.filter(GalleryCategory.key.in_(categories)).all()
-        category_icons = {row.key: row.icon_class for row in icon_rows}
-    except Exception:
-        category_icons = {}
-
-    # Map localized names (en, ar) for categories if available
-    try:
-        name_rows = GalleryCategory.query.filter(GalleryCategory.key.in_(categories)).all()
-        category_names = {row.key: (row.name_en, row.name_ar) for row in name_rows}
-    except Exception:
-        category_names = {}
+    # Map icons and localized names (en, ar) for categories if available
+    gallery_categories = [row for row in map(reference.gallery_category, categories) if row]
+    category_icons = {row.key: row.icon_class for row in gallery_categories}
+    category_names = {row.key: (row.name_en, row.name_ar) for row in gallery_categories}
 
     return render_template('main/gallery.html',
                          gallery_items=gallery_items,
@@ -465,10 +354,24 @@ def news_detail(slug):
                          article=article,
                          related_articles=related_articles)
 
+@bp.route('/search')
+def search():
+    """Site search over products and news (both languages, ranked)."""
+    query_text = request.args.get('q', '').strip()[:200]
+    products, news_items = search_site(query_text) if query_text else ([], [])
+
+    return render_template('main/search.html',
+                         query=query_text,
+                         products=products,
+                         news_items=news_items)
+
 
 @bp.route('/contact', methods=['GET', 'POST'])
-def contact():
-    """Contact page with RFQ form."""
+@limiter.limit(lambda: current_app.config['RATELIMIT_CONTACT'], methods=['POST'])
+async def contact():
+    """Contact page with RFQ form.
+    Async so the attachment write and the two notification emails overlap instead of running back to back.
+    """
     form = RFQForm()
 
     if form.validate_on_submit():
@@ -497,14 +400,15 @@ def contact():
         # Handle file upload
         if form.attachment.data:
             filename = secure_filename(form.attachment.data.filename)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
+            # Random suffix: two uploads in the same second must not overwrite each other
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:8] + '_'
             filename = timestamp + filename
 
             upload_path = os.path.join(current_app.instance_path,
                                      current_app.config['UPLOAD_FOLDER'],
                                      'rfq', filename)
             os.makedirs(os.path.dirname(upload_path), exist_ok=True)
-            form.attachment.data.save(upload_path)
+            await asyncio.to_thread(form.attachment.data.save, upload_path)
             rfq.attachment_path = filename
 
         # Save to database
@@ -534,7 +438,6 @@ Message:
 RFQ ID: {rfq.id}
                 """
             )
-            mail.send(admin_msg)
 
             # Auto-reply to customer
             customer_msg = Message(
@@ -558,7 +461,13 @@ Emdad Global Team
 {current_app.config['COMPANY_PHONE']}
                 """
             )
-            mail.send(customer_msg)
+
+            # Send both at once; one failing does not stop the other
+            results = await asyncio.gather(*(asyncio.to_thread(mail.send, msg) for msg in (admin_msg, customer_msg)),
+                                           return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    current_app.logger.error(f'Failed to send RFQ email: {result}')
 
         except Exception as e:
             current_app.logger.error(f'Failed to send RFQ emails: {e}')
@@ -659,11 +568,17 @@ def uploaded_file(filename):
                 # Copy to instance if not exists or if source is newer
                 if not os.path.isfile(dst) or (os.path.isfile(src) and os.path.getmtime(src) > os.path.getmtime(dst)):
                     try:
-                        with open(src, 'rb') as s, open(dst, 'wb') as d:
+                        # Copy to a private temp name and rename into place, so a concurrent
+                        # request (another thread or worker) never serves a half-written file
+                        tmp = f'{dst}.{uuid.uuid4().hex}.tmp'
+                        with open(src, 'rb') as s, open(tmp, 'wb') as d:
                             d.write(s.read())
+                        os.replace(tmp, dst)
                         current_app.logger.info(f"Auto-copied {real_name} from static to instance")
                     except Exception as e:
                         current_app.logger.warning(f"Failed to copy {real_name}: {e}")
+                        if os.path.exists(tmp):
+                            os.remove(tmp)
 
                 # Try to serve from instance first
                 if os.path.isfile(dst):
@@ -721,7 +636,7 @@ def set_language(language):
 @bp.route('/api/products/<category_key>')
 def api_products_by_category(category_key):
     """API endpoint to get products by category (for dynamic form updates)."""
-    category = Category.query.filter_by(key=category_key, is_active=True).first()
+    category = get_reference_data().category(category_key)
     if not category:
         return jsonify([])
 
@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from app.utils.hs_codes import format_hs_code_display, get_hs_code_description
 import json
 
 # Association table for many-to-many relationship between products and certifications
@@ -13,6 +14,11 @@ product_certifications = db.Table('product_certifications',
 
 class User(UserMixin, db.Model):
     """User model for admin authentication."""
+    __table_args__ = (
+        # Admin listing ordered by creation date
+        db.Index('ix_user_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -48,6 +54,12 @@ class User(UserMixin, db.Model):
 
 class Category(db.Model):
     """Product categories model."""
+    __table_args__ = (
+        # Navbar and homepage category lists
+        db.Index('ix_category_active_sort', 'is_active', 'sort_order', 'name_en'),
+        db.Index('ix_category_active_homepage_sort', 'is_active', 'show_on_homepage', 'sort_order'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     key = db.Column(db.String(50), unique=True, nullable=False, index=True)  # citrus, fresh-fruits, etc.
     name_en = db.Column(db.String(100), nullable=False)
@@ -82,6 +94,17 @@ class Category(db.Model):
 
 class Product(db.Model):
     """Products model."""
+    __table_args__ = (
+        # Listing shapes: status [+ category | homepage] ordered by sort_order, name_en
+        db.Index('ix_product_status_sort', 'status', 'sort_order', 'name_en'),
+        db.Index('ix_product_category_status_sort', 'category_id', 'status', 'sort_order', 'name_en'),
+        db.Index('ix_product_status_homepage_sort', 'status', 'show_on_homepage', 'sort_order', 'name_en'),
+        # Admin listing ordered by last update, optionally by status or category
+        db.Index('ix_product_updated_at', 'updated_at'),
+        db.Index('ix_product_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_product_category_updated_at', 'category_id', 'updated_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name_en = db.Column(db.String(200), nullable=False)
     name_ar = db.Column(db.String(200))
@@ -202,6 +225,47 @@ class Product(db.Model):
             return val if isinstance(val, dict) else {}
         return data if isinstance(data, dict) else {}
 
+    def get_months_state(self, language='en'):
+        """Return the availability of each month (index 0..11):
+        'peak', 'available', 'limited', 'iqf' or 'off'.
+        """
+        raw = self.get_seasonality() or {}
+        # Already-normalized shape: {'months_state': [12 states]}
+        if isinstance(raw, dict) and isinstance(raw.get('months_state'), list) and len(raw['months_state']) == 12:
+            return list(raw['months_state'])
+        data_lang = self.get_seasonality_lang(language) or {}
+        base = data_lang.get('fresh') if isinstance(data_lang, dict) and 'fresh' in data_lang else data_lang
+        # Extract lists
+        peak = set((base.get('peak') or [])) if isinstance(base, dict) else set()
+        available = set((base.get('available') or [])) if isinstance(base, dict) else set()
+        limited = set((base.get('limited') or [])) if isinstance(base, dict) else set()
+        # IQF months detection (list on base or raw; dict with year_round)
+        iqf_months = set()
+        if isinstance(base, dict) and isinstance(base.get('iqf'), list):
+            iqf_months = set(base.get('iqf'))
+        else:
+            iqf = raw.get('iqf') if isinstance(raw, dict) else None
+            if isinstance(iqf, list):
+                iqf_months = set(iqf)
+            elif isinstance(iqf, dict):
+                if iqf.get('year_round'):
+                    iqf_months = set(range(1,13))
+                elif isinstance(iqf.get('months'), list):
+                    iqf_months = set(iqf.get('months'))
+        months_state = []
+        for m in range(1,13):
+            if m in peak:
+                months_state.append('peak')
+            elif m in available:
+                months_state.append('available')
+            elif m in limited:
+                months_state.append('limited')
+            elif m in iqf_months:
+                months_state.append('iqf')
+            else:
+                months_state.append('off')
+        return months_state
+
     def get_packaging_options(self):
         """Get raw packaging options JSON as dictionary (may contain language keys)."""
         if self.packaging_options:
@@ -326,28 +390,25 @@ class Product(db.Model):
         if not self.hs_code:
             return None
 
-        try:
-            from app.utils.hs_codes import get_hs_code_description
-            return get_hs_code_description(self.hs_code, language)
-        except ImportError:
-            return None
+        return get_hs_code_description(self.hs_code, language)
 
     def get_hs_code_display(self, language='en'):
         """Get HS code with description for display."""
         if not self.hs_code:
             return None
 
-        try:
-            from app.utils.hs_codes import format_hs_code_display
-            return format_hs_code_display(self.hs_code, language)
-        except ImportError:
-            return self.hs_code
+        return format_hs_code_display(self.hs_code, language)
 
     def __repr__(self):
         return f'<Product {self.slug}>'
 
 class ProductImage(db.Model):
     """Product images model."""
+    __table_args__ = (
+        # get_main_image(): images of one product, main first
+        db.Index('ix_product_image_product_main', 'product_id', 'is_main'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
@@ -364,6 +425,122 @@ class ProductImage(db.Model):
     def __repr__(self):
         return f'<ProductImage {self.filename}>'
 
+class ProductFacet(db.Model):
+    """Facet values of active products, maintained by app/utils/facets.py."""
+    __tablename__ = 'product_facet'
+    __table_args__ = (
+        # Rewriting the facets of one product
+        db.Index('ix_product_facet_product', 'product_id'),
+    )
+
+    facet = db.Column(db.String(20), primary_key=True)  # category, hs_chapter, certification, month, featured
+    value = db.Column(db.String(50), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), primary_key=True)
+
+    def __repr__(self):
+        return f'<ProductFacet {self.facet}={self.value} {self.product_id}>'
+
+class ProductAttribute(db.Model):
+    """One option of a product's specifications, packaging, quality, applications or
+    commercial terms, parsed from the JSON text columns by app/utils/attributes.py."""
+    __tablename__ = 'product_attribute'
+    __table_args__ = (
+        # Rewriting the attributes of one product
+        db.Index('ix_product_attribute_product', 'product_id'),
+        # "Brix of at least 12": key, then the parsed range
+        db.Index('ix_product_attribute_key_number', 'key', 'number_min', 'number_max'),
+        # "10 kg cartons": section, head word, unit, then the parsed range
+        db.Index('ix_product_attribute_term', 'section', 'term', 'unit', 'number_min'),
+        # Exact values ("Grade" is "extra class")
+        db.Index('ix_product_attribute_key_value', 'key', 'value_norm'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    section = db.Column(db.String(20), nullable=False)  # specifications, packaging, quality, applications, commercial
+    language = db.Column(db.String(2), nullable=False)
+    key = db.Column(db.String(50), nullable=False)      # canonical English key, e.g. brix, shelf_life
+    label = db.Column(db.String(100))                   # label as written, e.g. "Brix Level", "مستوى البريكس"
+    value = db.Column(db.String(500))                   # the option as written, e.g. "15kg export cartons"
+    value_norm = db.Column(db.String(200))              # normalized words of value
+    term = db.Column(db.String(50))                     # head word, singular: carton, bag
+    number_min = db.Column(db.Float)
+    number_max = db.Column(db.Float)
+    unit = db.Column(db.String(10))                     # kg, g, mm, %, °c, ...
+
+    def __repr__(self):
+        return f'<ProductAttribute {self.product_id} {self.key}={self.value}>'
+
+class ProductCard(db.Model):
+    """What a listing card shows of one product, maintained by app/utils/product_cards.py.
+
+    Mirrors the Product methods the card templates call, so a page of cards is one
+    narrow row each instead of a Product plus its category, images and JSON columns.
+    """
+    __tablename__ = 'product_card'
+    __table_args__ = (
+        # Same listing shapes as Product
+        db.Index('ix_product_card_status_sort', 'status', 'sort_order', 'name_en'),
+        db.Index('ix_product_card_category_status_sort', 'category_id', 'status', 'sort_order', 'name_en'),
+        db.Index('ix_product_card_status_homepage_sort', 'status', 'show_on_homepage', 'sort_order', 'name_en'),
+    )
+
+    MONTH_CODES = {'peak': 'P', 'available': 'A', 'limited': 'L', 'iqf': 'I', 'off': '-'}
+    MONTH_STATES = {code: state for state, code in MONTH_CODES.items()}
+
+    # The product id; no foreign key, the card goes after the product's DELETE in the same flush
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    slug = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20))
+    featured = db.Column(db.Boolean, default=False)
+    show_on_homepage = db.Column(db.Boolean, default=False)
+    sort_order = db.Column(db.Integer, default=0)
+    name_en = db.Column(db.String(200), nullable=False)
+    name_ar = db.Column(db.String(200))
+    short_description_en = db.Column(db.String(500))
+    short_description_ar = db.Column(db.String(500))
+    category_id = db.Column(db.Integer)
+    category_key = db.Column(db.String(50))
+    category_name_en = db.Column(db.String(100))
+    category_name_ar = db.Column(db.String(100))
+    main_image = db.Column(db.String(255))   # ProductImage filename
+    image_path = db.Column(db.String(255))   # legacy Product.image_path
+    hs_code = db.Column(db.String(20))
+    months_en = db.Column(db.String(12))     # one MONTH_CODES letter per month
+    months_ar = db.Column(db.String(12))
+    badges = db.Column(db.String(500))       # JSON {language: {'brix', 'sizes'}} for languages with specifications
+
+    def get_name(self, language='en'):
+        return getattr(self, f'name_{language}', self.name_en)
+
+    def get_short_description(self, language='en'):
+        return getattr(self, f'short_description_{language}', self.short_description_en)
+
+    def get_category_name(self, language='en'):
+        """Category name, like ``product.category.get_name()``; None without a category."""
+        if not self.category_key:
+            return None
+        return getattr(self, f'category_name_{language}', self.category_name_en)
+
+    def get_hs_code_formatted(self):
+        return f"HS:{self.hs_code}" if self.hs_code else None
+
+    def get_months_state(self, language='en'):
+        """Same list as ``Product.get_months_state()``."""
+        codes = getattr(self, f'months_{language}', None) or self.months_en or ''
+        return [self.MONTH_STATES.get(code, 'off') for code in codes.ljust(12, '-')[:12]]
+
+    def get_spec_badges(self, language='en'):
+        """``{'brix', 'sizes'}`` from the specifications in ``language``; None if it has none."""
+        try:
+            badges = json.loads(self.badges) if self.badges else {}
+        except json.JSONDecodeError:
+            return None
+        return badges.get(language, badges.get('en'))
+
+    def __repr__(self):
+        return f'<ProductCard {self.slug}>'
+
 class Certification(db.Model):
     """Certifications model."""
     id = db.Column(db.Integer, primary_key=True)
@@ -414,6 +591,16 @@ class Service(db.Model):
 
 class News(db.Model):
     """Enhanced News/Blog model with advanced SEO features."""
+    __table_args__ = (
+        # Published listings ordered by publish_at, optionally featured / homepage only
+        db.Index('ix_news_status_publish_at', 'status', 'publish_at'),
+        db.Index('ix_news_status_featured_publish_at', 'status', 'featured', 'publish_at'),
+        db.Index('ix_news_status_homepage_publish_at', 'status', 'show_on_homepage', 'publish_at'),
+        # Admin listing ordered by creation date, optionally by status
+        db.Index('ix_news_created_at', 'created_at'),
+        db.Index('ix_news_status_created_at', 'status', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title_en = db.Column(db.String(200), nullable=False)
     title_ar = db.Column(db.String(200))
@@ -517,6 +704,11 @@ class News(db.Model):
 
 class Gallery(db.Model):
     """Gallery model for images."""
+    __table_args__ = (
+        db.Index('ix_gallery_active_category_sort', 'is_active', 'category', 'sort_order'),
+        db.Index('ix_gallery_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title_en = db.Column(db.String(200), nullable=False)
     title_ar = db.Column(db.String(200))
@@ -554,6 +746,12 @@ class GalleryCategory(db.Model):
 
 class RFQ(db.Model):
     """Request for Quote model."""
+    __table_args__ = (
+        # Admin listing / reports: newest first, optionally by status
+        db.Index('ix_rfq_created_at', 'created_at'),
+        db.Index('ix_rfq_status_created_at', 'status', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     # Contact information
@@ -612,6 +810,14 @@ class RFQ(db.Model):
 
 class AuditLog(db.Model):
     """Audit log for tracking admin actions."""
+    __table_args__ = (
+        db.Index('ix_audit_log_created_at', 'created_at'),
+        # Audit log browser filters, newest first
+        db.Index('ix_audit_log_action_created_at', 'action', 'created_at'),
+        db.Index('ix_audit_log_entity_type_created_at', 'entity_type', 'created_at'),
+        db.Index('ix_audit_log_user_created_at', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     action = db.Column(db.String(50), nullable=False)  # create, update, delete, login, logout
@@ -0,0 +1,201 @@
+"""
+ASGI adapter for the Flask app, used by the top-level ``asgi.py`` under uvicorn.
+
+asgiref's ``WsgiToAsgi`` runs every request on one shared thread per process.
+Here the Flask app runs on a bounded thread pool (``ASGI_THREADS``) and the
+event loop does the socket I/O, so a process can hold many more connections
+than it has threads:
+
+* request bodies are received on the loop and spooled to a temporary file
+  before a thread is taken, so a slow RFQ or editor upload does not pin one
+* response bodies, including ``send_file`` / ``send_from_directory`` output
+  from ``main.uploaded_file``, are read one chunk at a time in the pool and
+  written from the loop, so a slow client does not pin a thread either
+
+Views declared ``async def`` run through Flask's async support inside their
+request thread, which lets them overlap their own mail and disk I/O.
+"""
+
+import sys
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+SPOOL_MAX_MEMORY = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class _RequestTooLarge(Exception):
+    pass
+
+
+class _ClientGone(Exception):
+    pass
+
+
+class FileWrapper:
+    """``wsgi.file_wrapper`` with larger blocks than werkzeug's 8 KB default (fewer thread hops)."""
+
+    def __init__(self, filelike, block_size=CHUNK_SIZE):
+        self.filelike = filelike
+        self.block_size = block_size
+
+    def __iter__(self):
+        while True:
+            chunk = self.filelike.read(self.block_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        if hasattr(self.filelike, 'close'):
+            self.filelike.close()
+
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI ``http`` scope; ``body`` is a file positioned at 0."""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] if server[1] is not None else 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'wsgi.file_wrapper': FileWrapper,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        if key in environ:
+            environ[key] += ('; ' if key == 'HTTP_COOKIE' else ',') + value
+        else:
+            environ[key] = value
+    return environ
+
+
+class ASGIAdapter:
+    """Serve a WSGI app over ASGI with a dedicated thread pool."""
+
+    def __init__(self, wsgi_app, threads=16, max_body_size=None):
+        self.wsgi_app = wsgi_app
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        try:
+            body = await self._receive_body(receive)
+        except _RequestTooLarge:
+            await send({'type': 'http.response.start', 'status': 413,
+                        'headers': [(b'content-type', b'text/plain'), (b'connection', b'close')]})
+            await send({'type': 'http.response.body', 'body': b'Request Entity Too Large'})
+            return
+        except _ClientGone:
+            return
+        try:
+            await self._respond(scope, body, send)
+        finally:
+            body.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _receive_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                raise _ClientGone()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if self.max_body_size and size > self.max_body_size:
+                body.close()
+                raise _RequestTooLarge()
+            body.write(chunk)
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+        return body
+
+    async def _respond(self, scope, body, send):
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, body)
+        started = {'sent': False}
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None:
+                try:
+                    if started['sent']:
+                        # PEP 3333: too late to change the status, so abort the response
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            elif 'status' in started:
+                raise AssertionError('start_response called a second time without exc_info')
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+            return write
+
+        def write(data):
+            """Legacy WSGI ``write()``: buffered until the headers go out, then sent in order."""
+            if not data:
+                return
+            if not started['sent']:
+                written.append(bytes(data))
+                return
+            message = {'type': 'http.response.body', 'body': bytes(data), 'more_body': True}
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def call_app():
+            # The first chunk is pulled here too: a WSGI app may call start_response lazily
+            iterable = self.wsgi_app(environ, start_response)
+            chunks = iter(iterable)
+            return iterable, chunks, next(chunks, None)
+
+        iterable, chunks, chunk = await loop.run_in_executor(self.executor, call_app)
+        try:
+            started['sent'] = True
+            await send({'type': 'http.response.start', 'status': started['status'],
+                        'headers': started['headers']})
+            for data in written:
+                await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+            written.clear()
+            while chunk is not None:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(self.executor, iterable.close)
@@ -0,0 +1,290 @@
+"""
+Structured product attributes parsed from the JSON text columns.
+
+``Product.specifications``, ``packaging_options``, ``quality_targets``,
+``applications`` and ``commercial_docs`` hold ``{'en': {...}, 'ar': {...}}``
+(sometimes with each language JSON-encoded again) mapping a label to a text
+value such as ``"15kg export cartons • 10x1kg net bags"``. Each option of
+each value becomes one ``product_attribute`` row:
+
+* ``key``: the English label as a slug (``Brix Level`` -> ``brix``). Arabic
+  labels take the key of the English label in the same position.
+* ``number_min`` / ``number_max`` / ``unit``: the first quantity or range
+  (``11-14%``, ``60-88mm``, ``15kg``)
+* ``term``: the head word, singular (``carton``, ``bag``)
+* ``value_norm``: the normalized words, for exact matches
+
+So "products with 10 kg carton packaging" or "Brix of at least 12" are
+indexed lookups (``products_matching()``, ``products_with_attribute()``)
+instead of a JSON scan in Python. Rows are rewritten in the same transaction
+as the ORM flush that changes a Product; bulk inserts need
+``rebuild_product_attributes()``.
+"""
+
+import re
+import json
+from functools import lru_cache
+
+from flask import current_app
+from sqlalchemy import event, inspect, select
+
+from app.utils.search import normalize, terms
+
+# section -> Product column
+SECTIONS = {
+    'specifications': 'specifications',
+    'packaging': 'packaging_options',
+    'quality': 'quality_targets',
+    'applications': 'applications',
+    'commercial': 'commercial_docs',
+}
+KEY_ALIASES = {
+    'brix_level': 'brix',
+    'bulk_packaging': 'bulk',
+    'storage_life': 'shelf_life',
+    'size_grade': 'size_grading',
+}
+UNITS = {
+    'kg': 'kg', 'g': 'g', 'mt': 't', 't': 't', 'lb': 'lb', 'mm': 'mm', 'cm': 'cm', 'm': 'm',
+    'ml': 'ml', 'l': 'l', 'ppm': 'ppm', 'ppb': 'ppb', '%': '%', '°c': '°c', '°': '°',
+    'كجم': 'kg', 'كغ': 'kg', 'جم': 'g', 'غ': 'g', 'طن': 't', 'مم': 'mm', 'سم': 'cm',
+}
+
+# Words that never head an option
+_STOPWORDS = {'to', 'at', 'by', 'of', 'and', 'or', 'in', 'for', 'per', 'with', 'from', 'up'}
+
+_OPTION_SEPARATORS = re.compile(r'\s*[•·;]\s*')
+_PARENTHESES = re.compile(r'\([^)]*\)')
+_WORDS = re.compile(r'[^\W_]+')
+_DIGITS = str.maketrans({**{chr(0x0660 + d): str(d) for d in range(10)},
+                         **{chr(0x06f0 + d): str(d) for d in range(10)},
+                         '٫': '.', '٬': ','})
+_UNIT_PATTERN = '|'.join(re.escape(unit) for unit in sorted(UNITS, key=len, reverse=True))
+# Optional "10x" pack count, a number or range, then an optional unit not followed by a letter
+_QUANTITY = re.compile(
+    r'(?:\d+\s*[x×]\s*)?(\d+(?:[.,]\d+)?)(?:\s*(?:[-–—]|to)\s*(\d+(?:[.,]\d+)?))?'
+    rf'(?:\s*({_UNIT_PATTERN})(?![^\W\d_]))?'
+)
+
+
+def _number(text):
+    return float(text.replace(',', '.'))
+
+
+def _singular(word):
+    if not word.isascii() or len(word) <= 3 or word.endswith('ss'):
+        return word
+    if word.endswith('xes'):
+        return word[:-2]
+    return word[:-1] if word.endswith('s') else word
+
+
+def _head(words):
+    """Head word of an option: the last English word ("export cartons"), the first Arabic one ("كراتين تصدير")."""
+    if not words:
+        return None
+    return _singular(words[-1] if words[-1].isascii() else words[0])[:50]
+
+
+def _key(label):
+    key = re.sub(r'[\W_]+', '_', label.casefold()).strip('_')[:50]
+    return KEY_ALIASES.get(key, key)
+
+
+@lru_cache(maxsize=8192)
+def parse_option(text):
+    """``{'number_min', 'number_max', 'unit', 'term', 'value_norm'}`` of one option (do not mutate).
+
+    Cached: the same options (commercial terms, packaging) repeat across many products.
+    """
+    text = str(text).translate(_DIGITS)
+    quantity = _QUANTITY.search(text.casefold())
+    number_min = number_max = unit = None
+    if quantity:
+        number_min = _number(quantity.group(1))
+        number_max = _number(quantity.group(2)) if quantity.group(2) else number_min
+        unit = UNITS.get(quantity.group(3)) if quantity.group(3) else None
+    # Article stripping would eat into words like "فالنسيا", so head words keep them
+    words = [word for word in _WORDS.findall(normalize(_PARENTHESES.sub(' ', text)))
+             if len(word) > 1 and not any(ch.isdigit() for ch in word)
+             and word not in UNITS and word not in _STOPWORDS]
+    return {
+        'number_min': number_min,
+        'number_max': number_max,
+        'unit': unit,
+        'term': _head(words),
+        'value_norm': ' '.join(terms(text))[:200] or None,
+    }
+
+
+def _options(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item not in (None, '')]
+    if isinstance(value, dict):
+        return [f'{k}: {v}' for k, v in value.items()]
+    return [option for option in _OPTION_SEPARATORS.split(str(value)) if option.strip()]
+
+
+def _languages(raw):
+    """``{language: {label: value}}`` from a JSON column, unwrapping per-language JSON strings."""
+    try:
+        data = json.loads(raw) if raw else None
+    except (TypeError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if 'en' not in data and 'ar' not in data:
+        return {'en': data}
+    languages = {}
+    for language in ('en', 'ar'):
+        value = data.get(language)
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = {'notes': value}
+        if isinstance(value, dict) and value:
+            languages[language] = value
+    return languages
+
+
+def product_attributes(product):
+    """The ``product_attribute`` rows of ``product`` as dicts."""
+    rows = []
+    for section, column in SECTIONS.items():
+        languages = _languages(getattr(product, column))
+        english_keys = [_key(label) for label in languages.get('en', {})]
+        for language, values in languages.items():
+            # Arabic labels line up with the English ones when both languages list the same fields
+            paired = language != 'en' and len(values) == len(english_keys)
+            for position, (label, value) in enumerate(values.items()):
+                if value in (None, '', [], {}):
+                    continue
+                key = english_keys[position] if paired else _key(label)
+                for option in _options(value):
+                    rows.append({'product_id': product.id, 'section': section, 'language': language,
+                                 'key': key, 'label': str(label)[:100], 'value': option[:500],
+                                 **parse_option(option[:500])})
+    return rows
+
+
+# -- Queries ------------------------------------------------------------------
+
+def products_with_attribute(key=None, section=None, term=None, unit=None, value=None,
+                            at_least=None, at_most=None, text=None):
+    """Select of the ids of products with an attribute row matching every given condition.
+
+    ``value`` must fall inside the parsed range, ``at_least`` / ``at_most`` compare
+    against its upper / lower end, ``text`` matches the whole normalized option.
+    Use as ``Product.id.in_(products_with_attribute(key='brix', at_least=12))``.
+    """
+    from app.models import ProductAttribute as A
+
+    conditions = []
+    if key:
+        conditions.append(A.key == _key(key))
+    if section:
+        conditions.append(A.section == section)
+    if term:
+        conditions.append(A.term == parse_option(term)['term'])
+    if unit:
+        conditions.append(A.unit == UNITS.get(unit.casefold(), unit.casefold()))
+    if value is not None:
+        conditions.extend([A.number_min <= value, A.number_max >= value])
+    if at_least is not None:
+        conditions.append(A.number_max >= at_least)
+    if at_most is not None:
+        conditions.append(A.number_min <= at_most)
+    if text:
+        conditions.append(A.value_norm == ' '.join(terms(text)))
+    return select(A.product_id).where(*conditions)
+
+
+def products_matching(query_text, section='packaging'):
+    """Select of product ids whose ``section`` has an option like ``query_text`` ("10 kg carton")."""
+    parsed = parse_option(query_text)
+    if not (parsed['term'] or parsed['unit'] or parsed['number_min'] is not None):
+        return products_with_attribute(section=section, text=query_text)
+    return products_with_attribute(section=section, term=parsed['term'], unit=parsed['unit'],
+                                   value=parsed['number_min'])
+
+
+# -- Sync ---------------------------------------------------------------------
+
+def _write(connection, product, delete_only=False):
+    from app.models import ProductAttribute
+
+    table = ProductAttribute.__table__
+    connection.execute(table.delete().where(table.c.product_id == product.id))
+    rows = [] if delete_only else product_attributes(product)
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def _sync_product_attributes(session, flush_context):
+    """after_flush: rewrite the attribute rows of the products this flush touched."""
+    from app.models import Product
+
+    try:
+        if not current_app.extensions.get('product_attributes'):
+            return
+    except RuntimeError:
+        # Outside an app context (bare scripts): nothing to sync against
+        return
+    changed = [(obj, False) for obj in list(session.new) + list(session.dirty) if isinstance(obj, Product)]
+    changed += [(obj, True) for obj in session.deleted if isinstance(obj, Product)]
+    if not changed:
+        return
+    connection = session.connection()
+    for product, deleted in changed:
+        if product.id is not None:
+            _write(connection, product, delete_only=deleted)
+
+
+def rebuild_product_attributes(db):
+    """Rewrite every attribute row from the product table; return the row count."""
+    from app.models import Product, ProductAttribute
+
+    table = ProductAttribute.__table__
+    columns = [Product.id] + [getattr(Product, column) for column in SECTIONS.values()]
+    count = 0
+    db.session.execute(table.delete())
+    batch = []
+    for product in db.session.execute(select(*columns).order_by(Product.id)).yield_per(1000):
+        batch.extend(product_attributes(product))
+        if len(batch) >= 5000:
+            db.session.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+
+def ensure_product_attributes(db, rebuild=False):
+    """Create ``product_attribute`` if missing (backfilling it when new, or when ``rebuild``); return True if usable."""
+    from app.models import ProductAttribute
+
+    inspector = inspect(db.engine)
+    if not inspector.has_table('product'):
+        return False
+    created = not inspector.has_table('product_attribute')
+    if created:
+        ProductAttribute.__table__.create(db.engine)
+    if created or rebuild:
+        rebuild_product_attributes(db)
+    return True
+
+
+def init_attributes(app, db):
+    """Create and backfill the attribute table if needed and keep it in sync with ORM writes."""
+    if not event.contains(db.session, 'after_flush', _sync_product_attributes):
+        event.listen(db.session, 'after_flush', _sync_product_attributes)
+    try:
+        with app.app_context():
+            app.extensions['product_attributes'] = ensure_product_attributes(db)
+    except Exception as e:
+        app.extensions['product_attributes'] = False
+        app.logger.warning(f'Product attributes unavailable: {e}')
@@ -0,0 +1,145 @@
+"""
+In-memory prefix index for search-as-you-type suggestions.
+
+Each worker holds every suggestion target (active categories and products,
+and the HS codes in app/utils/hs_codes.py) as one sorted array of normalized
+keys. A prefix is a contiguous slice of that array found with two bisects,
+so a lookup never touches the database. Keys are normalized with the
+full-text search rules (app/utils/search.py), so ``برتق``, ``البرتقال`` and
+``orang`` all reach Fresh Oranges. Each label is also keyed from every word
+onwards ("oranges" finds "Fresh Oranges").
+
+Results are memoized per index, so a broad prefix (a single letter can
+cover thousands of keys) only scans its slice once.
+
+The index is rebuilt after a product or category write in any worker, as
+signalled by the version counters in app/utils/cache_bus.py.
+"""
+
+import heapq
+import bisect
+
+from sqlalchemy import select
+
+from app.utils.cache_bus import get_cached, register_cache, reset_cache
+from app.utils.search import terms
+
+MEMO_MAX = 4096
+
+KIND_ORDER = {'category': 0, 'product': 1, 'hs_code': 2}
+
+
+class Suggestion:
+    __slots__ = ('kind', 'label_en', 'label_ar', 'endpoint', 'values', 'keys', 'rank')
+
+    def __init__(self, kind, label_en, label_ar, endpoint, values, sort_order=0, keys=()):
+        self.kind = kind
+        self.label_en = label_en
+        self.label_ar = label_ar or label_en
+        self.endpoint = endpoint
+        self.values = values
+        self.keys = keys  # extra matchable text (slug, HS code)
+        self.rank = (KIND_ORDER[kind], sort_order or 0, len(label_en))
+
+    def label(self, language='en'):
+        return self.label_ar if language == 'ar' else self.label_en
+
+
+class PrefixIndex:
+    """Sorted normalized keys with a parallel array of ``(key_rank, suggestion)`` references."""
+
+    def __init__(self, suggestions):
+        pairs = {}
+        for suggestion in suggestions:
+            for key, key_rank in _keys(suggestion):
+                current = pairs.get((key, id(suggestion)))
+                if current is None or key_rank < current[0]:
+                    pairs[(key, id(suggestion))] = (key_rank, suggestion)
+        ordered = sorted(pairs.items(), key=lambda item: item[0][0])
+        self.keys = [key for (key, _), _ in ordered]
+        self.refs = [ref for _, ref in ordered]
+        self.size = len(suggestions)
+        self._memo = {}
+
+    def lookup(self, text, limit=8):
+        """Best ``limit`` suggestions whose keys start with normalized ``text``."""
+        prefix = ' '.join(terms(text))
+        if not prefix:
+            return []
+        memo_key = (prefix, limit)
+        hit = self._memo.get(memo_key)
+        if hit is not None:
+            return hit
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + '\uffff', lo)
+        best = {}
+        for key_rank, suggestion in self.refs[lo:hi]:
+            score = (key_rank, suggestion.rank)
+            if id(suggestion) not in best or score < best[id(suggestion)][0]:
+                best[id(suggestion)] = (score, suggestion)
+        result = [s for _, s in heapq.nsmallest(limit, best.values(), key=lambda item: item[0])]
+
+        if len(self._memo) >= MEMO_MAX:
+            self._memo.clear()
+        self._memo[memo_key] = result
+        return result
+
+
+def _keys(suggestion):
+    """``(key, key_rank)`` pairs: whole label 0, later words 1, for both languages."""
+    for label in {suggestion.label_en, suggestion.label_ar}:
+        words = terms(label)
+        for start in range(len(words)):
+            yield ' '.join(words[start:]), 0 if start == 0 else 1
+    for value in suggestion.keys:
+        words = terms(value)
+        if words:
+            yield ' '.join(words), 1
+
+
+# -- Building -----------------------------------------------------------------
+
+def build_suggestions():
+    from app import db
+    from app.models import Category, Product
+    from app.utils.hs_codes import HS_CODES
+
+    suggestions = []
+    for category in db.session.execute(
+            select(Category.key, Category.name_en, Category.name_ar, Category.sort_order)
+            .where(Category.is_active.is_(True))):
+        suggestions.append(Suggestion('category', category.name_en, category.name_ar, 'main.products',
+                                      {'cat': category.key}, category.sort_order, keys=(category.key,)))
+
+    for product in db.session.execute(
+            select(Product.slug, Product.name_en, Product.name_ar, Product.hs_code, Product.sort_order)
+            .where(Product.status == 'active')):
+        suggestions.append(Suggestion('product', product.name_en, product.name_ar, 'main.product_detail',
+                                      {'slug': product.slug}, product.sort_order,
+                                      keys=(product.slug, product.hs_code)))
+
+    for entry in HS_CODES.values():
+        suggestions.append(Suggestion('hs_code', entry.display('en'), entry.display('ar'),
+                                      'main.search', {'q': entry.code}, keys=(entry.code,)))
+    return suggestions
+
+
+# -- Per-worker state ---------------------------------------------------------
+
+CATALOG_KINDS = ('product', 'category')
+
+
+def get_index():
+    """The current app's index, rebuilt once a catalog write has been signalled."""
+    return get_cached('autocomplete', lambda previous, stale: PrefixIndex(build_suggestions()))
+
+
+def suggest(text, limit=8):
+    return get_index().lookup(text, limit)
+
+
+def init_autocomplete(app, db):
+    """Rebuild ``app``'s index whenever any worker writes a product or category."""
+    register_cache('autocomplete', CATALOG_KINDS)
+    reset_cache(app, 'autocomplete')
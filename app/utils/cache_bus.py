@@ -0,0 +1,284 @@
+"""
+Cross-worker invalidation for the in-process caches.
+
+Each Gunicorn worker (and each instance) holds its own copies of the
+autocomplete index, the facet sets, the reference-data snapshot and the
+admin count cache, but a write lands in one worker only. Every cached table
+(an entity kind) has a counter in ``app_meta`` under ``version:<table>``.
+An ORM flush that writes a tracked table bumps its counter in the same
+transaction, so the bump commits or rolls back with the write itself.
+
+Workers read all counters in one indexed range query at most every
+``CHECK_INTERVAL`` seconds, from the caches' getters. Each cache registers
+the kinds it is built from and a ``drop(kinds)`` callback. When counters
+move, only those callbacks run, and only with the kinds that moved. The
+worker that commits a write drops its own caches right away.
+
+Writes that bypass the ORM (bulk loads, rebuilds) call
+``bump(db.session, kinds)`` before committing.
+
+All of this state belongs to the app: the counters last read and each
+cache's contents live in ``app.extensions``, so two apps in one process
+(tests, scripts) never serve each other's rows.
+"""
+
+import time
+import threading
+
+from flask import current_app, has_app_context
+from sqlalchemy import Integer, String, cast, event, inspect, select
+
+from app.utils.metrics import record_cache
+from app.utils.query_counter import not_counted
+
+CHECK_INTERVAL = 1.0
+PREFIX = 'version:'
+PREFIX_END = 'version;'  # ';' sorts right after ':', so this bounds the prefix range
+
+
+class CacheRegistration:
+    __slots__ = ('name', 'kinds', 'drop')
+
+    def __init__(self, name, kinds, drop):
+        self.name = name
+        self.kinds = frozenset(kinds)
+        self.drop = drop
+
+
+class CacheState:
+    """One app's copy of a cache: its value, the kinds that moved since it was built, and the rebuild lock."""
+
+    def __init__(self):
+        self.value = None
+        self.stale = set()
+        self.lock = threading.Lock()
+
+
+class BusState:
+    """One app's view of the counters: the values last read and when."""
+
+    def __init__(self):
+        self.versions = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+_caches = {}
+
+
+def register_cache(name, kinds, drop=None):
+    """Call ``drop(moved_kinds)`` whenever a table in ``kinds`` is written, by any worker.
+
+    Without ``drop`` the moved kinds are added to ``cache_state(name).stale``.
+    """
+    _caches[name] = CacheRegistration(name, kinds, drop)
+
+
+def tracked_kinds():
+    return frozenset().union(*(cache.kinds for cache in _caches.values()))
+
+
+def cache_state(name, app=None):
+    """The CacheState of cache ``name`` in ``app`` (default: the current app)."""
+    caches = (app or current_app).extensions.setdefault('caches', {})
+    state = caches.get(name)
+    if state is None:
+        state = caches.setdefault(name, CacheState())
+    return state
+
+
+def reset_cache(app, name):
+    """Start ``app`` with an empty cache ``name``."""
+    app.extensions.setdefault('caches', {})[name] = CacheState()
+
+
+def get_cached(name, build):
+    """The value of cache ``name`` in the current app, rebuilt as ``build(previous, stale_kinds)`` when needed.
+
+    Only one thread rebuilds; the others keep answering from the previous
+    value meanwhile instead of queueing behind it. The first build is left
+    out of the request's query budget: it is the worker's cost, not the
+    route's.
+    """
+    poll_versions()
+    state = cache_state(name)
+    value = state.value
+    if value is not None and not state.stale:
+        record_cache(name, True)
+        return value
+    if not state.lock.acquire(blocking=value is None):
+        record_cache(name, True)
+        return value
+    try:
+        if state.value is None:
+            state.stale.clear()
+            with not_counted():
+                state.value = build(None, set())
+            record_cache(name, False)
+        elif state.stale:
+            stale = set(state.stale)
+            state.stale.difference_update(stale)
+            state.value = build(state.value, stale)
+            record_cache(name, False)
+        else:
+            record_cache(name, True)
+        return state.value
+    finally:
+        state.lock.release()
+
+
+def _drop(kinds):
+    if not has_app_context():
+        # Bare scripts have no app caches to drop
+        return
+    for cache in list(_caches.values()):
+        moved = cache.kinds & kinds
+        if not moved:
+            continue
+        if cache.drop is None:
+            cache_state(cache.name).stale.update(moved)
+        else:
+            cache.drop(moved)
+
+
+def _bus():
+    """The current app's BusState, or None when the bus is off or there is no app context."""
+    try:
+        return current_app.extensions.get('cache_bus') or None
+    except RuntimeError:
+        # Outside an app context (bare scripts): no counters to bump or read
+        return None
+
+
+# -- Writing ------------------------------------------------------------------
+
+def _app_meta():
+    from app.models import AppMeta
+    return AppMeta.__table__
+
+
+def bump(session, kinds):
+    """Bump the counters of ``kinds`` in the session's transaction (once per kind per transaction)."""
+    bumped = session.info.setdefault('cache_versions', {})
+    kinds = set(kinds) - bumped.keys()
+    if not kinds:
+        return
+    if _bus() is None:
+        # No counter table: this worker's caches are still dropped at commit
+        bumped.update(dict.fromkeys(kinds))
+        return
+    table = _app_meta()
+    connection = session.connection()
+    keys = {PREFIX + kind: kind for kind in kinds}
+    for key in sorted(keys):
+        result = connection.execute(table.update().where(table.c.key == key)
+                                    .values(value=cast(cast(table.c.value, Integer) + 1, String)))
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(key=key, value='1'))
+    rows = connection.execute(select(table.c.key, table.c.value).where(table.c.key.in_(list(keys))))
+    bumped.update((keys[key], value) for key, value in rows)
+
+
+def _bump_written_kinds(session, flush_context):
+    """after_flush: bump the counters of the tracked tables this flush wrote."""
+    if not _caches:
+        return
+    written = {getattr(obj, '__tablename__', None) for obj in (*session.new, *session.dirty, *session.deleted)}
+    kinds = written & tracked_kinds()
+    if kinds:
+        bump(session, kinds)
+
+
+def _apply_after_commit(session):
+    """Drop this worker's caches for the kinds it just committed, and remember the new counters."""
+    committed = session.info.pop('cache_versions', None)
+    if not committed:
+        return
+    bus = _bus()
+    if bus is not None and bus.versions is not None:
+        bus.versions.update((kind, value) for kind, value in committed.items() if value is not None)
+    _drop(frozenset(committed))
+
+
+def _forget_after_rollback(session, previous_transaction):
+    session.info.pop('cache_versions', None)
+
+
+# -- Reading ------------------------------------------------------------------
+
+def read_versions():
+    """``{kind: counter}`` of every kind with a counter row."""
+    from app import db
+
+    table = _app_meta()
+    rows = db.session.execute(select(table.c.key, table.c.value)
+                              .where(table.c.key >= PREFIX, table.c.key < PREFIX_END))
+    return {key[len(PREFIX):]: value for key, value in rows}
+
+
+def poll_versions():
+    """Drop the caches whose counters moved, reading the counters at most every ``CHECK_INTERVAL`` seconds.
+
+    Only one thread reads; the others carry on with the caches as they are.
+    ``init_cache_bus`` takes the first read; without it the first poll drops
+    everything, since nothing built before it can be matched to a counter.
+    """
+    bus = _bus()
+    if bus is None or time.monotonic() - bus.checked_at < CHECK_INTERVAL:
+        return
+    if not bus.lock.acquire(blocking=False):
+        return
+    try:
+        if time.monotonic() - bus.checked_at < CHECK_INTERVAL:
+            return
+        versions = read_versions()
+        previous = bus.versions
+        bus.versions = versions
+        bus.checked_at = time.monotonic()
+        if previous is None:
+            moved = tracked_kinds()
+        else:
+            moved = frozenset(kind for kind in versions.keys() | previous.keys()
+                              if versions.get(kind) != previous.get(kind))
+        if moved:
+            _drop(moved)
+    finally:
+        bus.lock.release()
+
+
+# -- Setup --------------------------------------------------------------------
+
+def ensure_cache_versions(db):
+    """Create the counter rows of every tracked kind that lacks one; return True if usable."""
+    from app.models import AppMeta
+
+    if not inspect(db.engine).has_table(AppMeta.__tablename__):
+        return False
+    table = AppMeta.__table__
+    existing = set(db.session.execute(select(table.c.key)
+                                      .where(table.c.key >= PREFIX, table.c.key < PREFIX_END)).scalars())
+    rows = [{'key': key, 'value': '0'} for key in sorted(PREFIX + kind for kind in tracked_kinds())
+            if key not in existing]
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+    return True
+
+
+def init_cache_bus(app, db):
+    """Bump counters on ORM writes, create the counter rows and read them; call after the caches have registered."""
+    if not event.contains(db.session, 'after_flush', _bump_written_kinds):
+        event.listen(db.session, 'after_flush', _bump_written_kinds)
+        event.listen(db.session, 'after_commit', _apply_after_commit)
+        event.listen(db.session, 'after_soft_rollback', _forget_after_rollback)
+    try:
+        with app.app_context():
+            bus = BusState() if ensure_cache_versions(db) else False
+            if bus:
+                # Caches built from here on are matched to these counters
+                bus.versions = read_versions()
+                bus.checked_at = time.monotonic()
+            app.extensions['cache_bus'] = bus
+    except Exception as e:
+        app.extensions['cache_bus'] = False
+        app.logger.warning(f'Cache invalidation bus unavailable: {e}')
@@ -0,0 +1,292 @@
+"""
+Precomputed product facets for the catalog listing.
+
+Every active product has one ``product_facet`` row per facet value it carries:
+
+* ``category``: category id
+* ``hs_chapter``: first two digits of the HS code (``08``)
+* ``certification``: certification id
+* ``month``: ``1``..``12`` for each month the product is in season (peak,
+  available or limited fresh supply)
+* ``featured``: ``1`` for featured products
+
+Rows are rewritten in the same transaction as the ORM flush that changes a
+Product (or deletes a Certification), like the search index. Bulk inserts that bypass the ORM need
+``rebuild_product_facets()``.
+
+Listing filters are ``product_facet`` lookups in SQL. Counts never run a
+``GROUP BY`` per request: each worker loads the table once into one set of
+product ids per facet value, and the count of a value is the size of its set
+intersected with the products matching the other selected facets (selecting a
+month still shows how many products each other month has). The sets are
+reloaded after a product write or a facet rebuild in any worker, as
+signalled by the version counters in app/utils/cache_bus.py.
+"""
+
+
+from flask import current_app
+from sqlalchemy import String, cast, event, func, inspect, select
+
+from app.utils.cache_bus import bump, get_cached, register_cache, reset_cache
+from app.utils.hs_codes import normalize_hs_code
+
+MEMO_MAX = 1024
+
+# facet -> query string parameter of main.products
+FACET_PARAMS = {
+    'category': 'cat',
+    'hs_chapter': 'hs',
+    'certification': 'cert',
+    'month': 'month',
+    'featured': 'featured',
+}
+IN_SEASON = ('peak', 'available', 'limited')
+
+
+def product_facets(product):
+    """``{(facet, value)}`` of ``product``; empty unless it is active."""
+    if product.status != 'active':
+        return set()
+    facets = {('category', str(product.category_id))}
+    chapter = normalize_hs_code(product.hs_code)[:2]
+    if len(chapter) == 2:
+        facets.add(('hs_chapter', chapter))
+    facets.update(('certification', str(certification.id)) for certification in product.certifications)
+    facets.update(('month', str(month)) for month, state in enumerate(product.get_months_state('en'), 1)
+                  if state in IN_SEASON)
+    if product.featured:
+        facets.add(('featured', '1'))
+    return facets
+
+
+# -- Selection ----------------------------------------------------------------
+
+class FacetSelection:
+    """Facet values picked on the listing page (one value per facet)."""
+
+    def __init__(self, values=None, category_keys=None):
+        self.values = dict(values or {})
+        self.category_keys = category_keys or {}
+
+    @classmethod
+    def from_args(cls, args, categories):
+        """Parse ``main.products`` query arguments; unknown values are dropped."""
+        keys = {str(category.id): category.key for category in categories}
+        ids = {key: category_id for category_id, key in keys.items()}
+        values = {}
+        for facet, param in FACET_PARAMS.items():
+            value = (args.get(param) or '').strip()
+            if facet == 'category':
+                value = ids.get(value, '')
+            elif facet == 'month':
+                value = str(int(value)) if value.isdigit() and 1 <= int(value) <= 12 else ''
+            elif facet == 'featured':
+                value = '1' if value == '1' else ''
+            elif not value.isdigit():
+                value = ''
+            if value:
+                values[facet] = value
+        return cls(values, keys)
+
+    def get(self, facet):
+        return self.values.get(facet)
+
+    def key(self):
+        return tuple(sorted(self.values.items()))
+
+    def args(self, **changes):
+        """Query arguments for this selection with ``facet=value`` changes (None clears)."""
+        values = dict(self.values)
+        for facet, value in changes.items():
+            if value is None:
+                values.pop(facet, None)
+            else:
+                values[facet] = str(value)
+        args = {}
+        for facet, value in values.items():
+            if facet == 'category':
+                value = self.category_keys.get(value)
+            if value:
+                args[FACET_PARAMS[facet]] = value
+        return args
+
+    def toggle(self, facet, value):
+        """Query arguments selecting ``value`` for ``facet``, or clearing it if already selected."""
+        value = str(value)
+        return self.args(**{facet: None if self.values.get(facet) == value else value})
+
+    def apply(self, query, model=None):
+        """Restrict a query of ``model`` (Product, or ProductCard which shares its ids) to the selection."""
+        from app.models import Product, ProductFacet
+
+        model = model or Product
+        for facet, value in self.values.items():
+            if facet == 'category':
+                # Keeps the listing on the (category_id, status, sort_order) index
+                query = query.filter(model.category_id == int(value))
+            else:
+                query = query.filter(model.id.in_(
+                    select(ProductFacet.product_id).where(ProductFacet.facet == facet, ProductFacet.value == value)))
+        return query
+
+
+# -- Per-worker counts --------------------------------------------------------
+
+class FacetIndex:
+    """One frozenset of product ids per ``(facet, value)``."""
+
+    def __init__(self, groups):
+        self.members = {(facet, value): frozenset(map(int, ids.split(','))) for facet, value, ids in groups if ids}
+        self.facets = {}
+        for facet, value in self.members:
+            self.facets.setdefault(facet, []).append(value)
+        self._memo = {}
+
+    def matching(self, selection, exclude=None):
+        """Ids matching every selected facet except ``exclude``; None means no restriction."""
+        ids = None
+        for facet, value in selection.values.items():
+            if facet == exclude:
+                continue
+            members = self.members.get((facet, value), frozenset())
+            ids = members if ids is None else ids & members
+        return ids
+
+    def counts(self, selection):
+        """``{facet: {value: count}}`` for every value, given the other facets of ``selection``."""
+        memo_key = selection.key()
+        hit = self._memo.get(memo_key)
+        if hit is not None:
+            return hit
+
+        result = {}
+        for facet, values in self.facets.items():
+            base = self.matching(selection, exclude=facet)
+            result[facet] = {value: len(self.members[(facet, value)] if base is None
+                                        else self.members[(facet, value)] & base)
+                             for value in values}
+
+        if len(self._memo) >= MEMO_MAX:
+            self._memo.clear()
+        self._memo[memo_key] = result
+        return result
+
+
+def load_facet_groups():
+    """``(facet, value, 'id,id,...')`` rows: one per value, aggregated by the database on reload only."""
+    from app import db
+    from app.models import ProductFacet
+
+    if db.engine.dialect.name == 'postgresql':
+        ids = func.string_agg(cast(ProductFacet.product_id, String), ',')
+    else:
+        # Far faster than fetching one row per (value, product) through the driver
+        ids = func.group_concat(ProductFacet.product_id)
+    statement = select(ProductFacet.facet, ProductFacet.value, ids).group_by(ProductFacet.facet, ProductFacet.value)
+    return db.session.execute(statement).all()
+
+
+FACET_KINDS = ('product', 'product_facet')
+
+
+def get_facet_index():
+    """The current app's index, reloaded once a product write or facet rebuild has been signalled."""
+    return get_cached('facets', lambda previous, stale: FacetIndex(load_facet_groups()))
+
+
+def facet_counts(selection):
+    return get_facet_index().counts(selection)
+
+
+# -- Sync ---------------------------------------------------------------------
+
+def _write(connection, product, delete_only=False):
+    from app.models import ProductFacet
+
+    table = ProductFacet.__table__
+    connection.execute(table.delete().where(table.c.product_id == product.id))
+    rows = [] if delete_only else [{'facet': facet, 'value': value, 'product_id': product.id}
+                                   for facet, value in sorted(product_facets(product))]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def _sync_product_facets(session, flush_context):
+    """after_flush: rewrite the facet rows of the products this flush touched."""
+    from app.models import Certification, Product, ProductFacet
+
+    try:
+        if not current_app.extensions.get('product_facets'):
+            return
+    except RuntimeError:
+        # Outside an app context (bare scripts): nothing to sync against
+        return
+    changed = [(obj, False) for obj in list(session.new) + list(session.dirty) if isinstance(obj, Product)]
+    changed += [(obj, True) for obj in session.deleted if isinstance(obj, Product)]
+    # Deleting a certification drops its association rows without touching the products
+    certifications = [str(obj.id) for obj in session.deleted if isinstance(obj, Certification)]
+    if not (changed or certifications):
+        return
+    connection = session.connection()
+    for product, deleted in changed:
+        if product.id is not None:
+            _write(connection, product, delete_only=deleted)
+    if certifications:
+        table = ProductFacet.__table__
+        connection.execute(table.delete().where(table.c.facet == 'certification', table.c.value.in_(certifications)))
+        bump(session, ('product_facet',))
+
+
+def rebuild_product_facets(db):
+    """Rewrite every facet row from the product table; return the row count."""
+    from sqlalchemy.orm import selectinload
+    from app.models import Product, ProductFacet
+
+    table = ProductFacet.__table__
+    count = 0
+    db.session.execute(table.delete())
+    batch = []
+    products = (Product.query.filter_by(status='active')
+                .options(selectinload(Product.certifications)).order_by(Product.id).yield_per(500))
+    for product in products:
+        batch.extend({'facet': facet, 'value': value, 'product_id': product.id}
+                     for facet, value in sorted(product_facets(product)))
+        if len(batch) >= 5000:
+            db.session.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        count += len(batch)
+    bump(db.session, ('product_facet',))
+    db.session.commit()
+    return count
+
+
+def ensure_product_facets(db, rebuild=False):
+    """Create ``product_facet`` if missing (filling it when new, or when ``rebuild``); return True if usable."""
+    from app.models import ProductFacet
+
+    inspector = inspect(db.engine)
+    if not inspector.has_table('product'):
+        return False
+    created = not inspector.has_table('product_facet')
+    if created:
+        ProductFacet.__table__.create(db.engine)
+    if created or rebuild:
+        rebuild_product_facets(db)
+    return True
+
+
+def init_facets(app, db):
+    """Create the facet table if needed and keep it in sync with ORM writes."""
+    register_cache('facets', FACET_KINDS)
+    reset_cache(app, 'facets')
+    if not event.contains(db.session, 'after_flush', _sync_product_facets):
+        event.listen(db.session, 'after_flush', _sync_product_facets)
+    try:
+        with app.app_context():
+            app.extensions['product_facets'] = ensure_product_facets(db)
+    except Exception as e:
+        app.extensions['product_facets'] = False
+        app.logger.warning(f'Product facets unavailable: {e}')
@@ -2,114 +2,215 @@
 """
 HS Code descriptions and utilities
 Harmonized System codes with accurate descriptions for each product category
+
+The tables below are turned into a read-only index once, at import: code ->
+``HSCode`` (descriptions in both languages, chapter, heading), codes grouped
+by chapter and heading, and a sorted code list for prefix lookups. Nothing
+here rebuilds a dictionary per call, so templates can describe codes freely.
 """
 
+import re
+import bisect
+from types import MappingProxyType
+from typing import NamedTuple
+
+# Based on official Harmonized System classification.
+_DESCRIPTIONS = {
+    # Fresh Citrus Fruits (Chapter 08.05)
+    '080510': {
+        'en': 'Fresh oranges',
+        'ar': 'برتقال طازج'
+    },
+    '080520': {
+        'en': 'Fresh mandarins (including tangerines and satsumas)',
+        'ar': 'مندرين طازج (يشمل اليوسفي والساتسوما)'
+    },
+    
+    # Fresh Fruits (Chapter 08)
+    '080450': {
+        'en': 'Fresh mangoes',
+        'ar': 'مانجو طازج'
+    },
+    '080610': {
+        'en': 'Fresh grapes',
+        'ar': 'عنب طازج'
+    },
+    '081010': {
+        'en': 'Fresh strawberries',
+        'ar': 'فراولة طازجة'
+    },
+    '081090': {
+        'en': 'Other fresh fruits',
+        'ar': 'فواكه طازجة أخرى'
+    },
+    '080410': {
+        'en': 'Fresh or dried dates',
+        'ar': 'تمر طازج أو مجفف'
+    },
+    
+    # Vegetables (Chapter 07)
+    '070190': {
+        'en': 'Other fresh potatoes',
+        'ar': 'بطاطس طازجة أخرى'
+    },
+    '070310': {
+        'en': 'Fresh onions and shallots',
+        'ar': 'بصل وكراث طازج'
+    },
+    '070320': {
+        'en': 'Fresh garlic',
+        'ar': 'ثوم طازج'
+    },
+    '070390': {
+        'en': 'Other fresh leeks and alliaceous vegetables',
+        'ar': 'كراث وخضروات ثومية طازجة أخرى'
+    },
+    '071420': {
+        'en': 'Fresh sweet potatoes',
+        'ar': 'بطاطا حلوة طازجة'
+    },
+    
+    # Spices (Chapter 09.09)
+    '090920': {
+        'en': 'Coriander seeds',
+        'ar': 'بذور كزبرة'
+    },
+    '090930': {
+        'en': 'Cumin seeds',
+        'ar': 'بذور كمون'
+    },
+    '090940': {
+        'en': 'Caraway seeds',
+        'ar': 'بذور كراوية'
+    },
+    '090950': {
+        'en': 'Anise, badian, fennel, coriander seeds',
+        'ar': 'يانسون، بادیان، شمر، بذور كزبرة'
+    },
+    '090960': {
+        'en': 'Juniper berries and other spices',
+        'ar': 'توت العرعر وتوابل أخرى'
+    },
+    
+    # Oil Seeds (Chapter 12)
+    '120400': {
+        'en': 'Flax seeds (linseed)',
+        'ar': 'بذور الكتان'
+    },
+    '120740': {
+        'en': 'Sesame seeds',
+        'ar': 'بذور سمسم'
+    },
+    '121190': {
+        'en': 'Plants, seeds and fruits used in perfumery, pharmacy or for insecticidal purposes',
+        'ar': 'نباتات وبذور وثمار تستعمل في العطارة أو الصيدلة أو لأغراض مبيدة للحشرات'
+    },
+    
+    # Frozen Fruits (Chapter 08.11)
+    '081110': {
+        'en': 'Frozen strawberries',
+        'ar': 'فراولة مجمدة'
+    },
+    '081140': {
+        'en': 'Frozen mangoes',
+        'ar': 'مانجو مجمدة'
+    }
+}
+
+# Chapter (first 2 digits) names
+_CHAPTERS = {
+    '07': {
+        'en': 'Vegetables and certain roots and tubers',
+        'ar': 'خضروات وجذور ودرنات معينة'
+    },
+    '08': {
+        'en': 'Fruits and nuts',
+        'ar': 'فواكه ومكسرات'
+    },
+    '09': {
+        'en': 'Coffee, tea, spices',
+        'ar': 'قهوة وشاي وتوابل'
+    },
+    '12': {
+        'en': 'Oil seeds and oleaginous fruits',
+        'ar': 'بذور زيتية وثمار زيتية'
+    }
+}
+
+_OTHER_CHAPTER = MappingProxyType({
+    'en': 'Other agricultural products',
+    'ar': 'منتجات زراعية أخرى'
+})
+
+
+class HSCode(NamedTuple):
+    """One known HS code with its descriptions and classification."""
+    code: str
+    en: str
+    ar: str
+    chapter: str
+    heading: str
+
+    def description(self, language='en'):
+        return self.ar if language == 'ar' else self.en
+
+    def display(self, language='en'):
+        return f"{self.code} — {self.description(language)}"
+
+    def to_dict(self):
+        chapter = get_hs_code_category(self.code)
+        return {
+            'code': self.code,
+            'en': self.en,
+            'ar': self.ar,
+            'chapter': self.chapter,
+            'heading': self.heading,
+            'chapter_en': chapter['en'],
+            'chapter_ar': chapter['ar'],
+        }
+
+
+def _group(codes, width):
+    groups = {}
+    for code in codes:
+        groups.setdefault(code[:width], []).append(code)
+    return MappingProxyType({key: tuple(value) for key, value in groups.items()})
+
+
+HS_CODES = MappingProxyType({
+    code: HSCode(code, names['en'], names.get('ar') or names['en'], code[:2], code[:4])
+    for code, names in _DESCRIPTIONS.items()
+})
+HS_CHAPTERS = MappingProxyType({chapter: MappingProxyType(names) for chapter, names in _CHAPTERS.items()})
+CODES_BY_CHAPTER = _group(sorted(HS_CODES), 2)
+CODES_BY_HEADING = _group(sorted(HS_CODES), 4)
+_SORTED_CODES = tuple(sorted(HS_CODES))
+_DESCRIPTION_VIEW = MappingProxyType({
+    code: MappingProxyType({'en': entry.en, 'ar': entry.ar}) for code, entry in HS_CODES.items()
+})
+_SEARCH_TEXT = tuple((code, f"{entry.en} {entry.ar}".casefold()) for code, entry in sorted(HS_CODES.items()))
+del _DESCRIPTIONS, _CHAPTERS
+
+
+def normalize_hs_code(hs_code):
+    """Digits only: '0805.10' and 'HS:080510' both become '080510'."""
+    return re.sub(r'\D', '', hs_code or '')
+
+
+def get_hs_code(hs_code):
+    """Return the ``HSCode`` for a code (dots and prefixes ignored), or None if unknown."""
+    return HS_CODES.get(normalize_hs_code(hs_code))
+
+
 def get_hs_code_descriptions():
     """
     Returns accurate descriptions for HS codes used in our products.
     Based on official Harmonized System classification.
+
+    Returns:
+        Mapping: Read-only ``{code: {'en': ..., 'ar': ...}}``, shared by every caller
     """
-    return {
-        # Fresh Citrus Fruits (Chapter 08.05)
-        '080510': {
-            'en': 'Fresh oranges',
-            'ar': 'برتقال طازج'
-        },
-        '080520': {
-            'en': 'Fresh mandarins (including tangerines and satsumas)',
-            'ar': 'مندرين طازج (يشمل اليوسفي والساتسوما)'
-        },
-        
-        # Fresh Fruits (Chapter 08)
-        '080450': {
-            'en': 'Fresh mangoes',
-            'ar': 'مانجو طازج'
-        },
-        '080610': {
-            'en': 'Fresh grapes',
-            'ar': 'عنب طازج'
-        },
-        '081010': {
-            'en': 'Fresh strawberries',
-            'ar': 'فراولة طازجة'
-        },
-        '081090': {
-            'en': 'Other fresh fruits',
-            'ar': 'فواكه طازجة أخرى'
-        },
-        '080410': {
-            'en': 'Fresh or dried dates',
-            'ar': 'تمر طازج أو مجفف'
-        },
-        
-        # Vegetables (Chapter 07)
-        '070190': {
-            'en': 'Other fresh potatoes',
-            'ar': 'بطاطس طازجة أخرى'
-        },
-        '070310': {
-            'en': 'Fresh onions and shallots',
-            'ar': 'بصل وكراث طازج'
-        },
-        '070320': {
-            'en': 'Fresh garlic',
-            'ar': 'ثوم طازج'
-        },
-        '070390': {
-            'en': 'Other fresh leeks and alliaceous vegetables',
-            'ar': 'كراث وخضروات ثومية طازجة أخرى'
-        },
-        '071420': {
-            'en': 'Fresh sweet potatoes',
-            'ar': 'بطاطا حلوة طازجة'
-        },
-        
-        # Spices (Chapter 09.09)
-        '090920': {
-            'en': 'Coriander seeds',
-            'ar': 'بذور كزبرة'
-        },
-        '090930': {
-            'en': 'Cumin seeds',
-            'ar': 'بذور كمون'
-        },
-        '090940': {
-            'en': 'Caraway seeds',
-            'ar': 'بذور كراوية'
-        },
-        '090950': {
-            'en': 'Anise, badian, fennel, coriander seeds',
-            'ar': 'يانسون، بادیان، شمر، بذور كزبرة'
-        },
-        '090960': {
-            'en': 'Juniper berries and other spices',
-            'ar': 'توت العرعر وتوابل أخرى'
-        },
-        
-        # Oil Seeds (Chapter 12)
-        '120400': {
-            'en': 'Flax seeds (linseed)',
-            'ar': 'بذور الكتان'
-        },
-        '120740': {
-            'en': 'Sesame seeds',
-            'ar': 'بذور سمسم'
-        },
-        '121190': {
-            'en': 'Plants, seeds and fruits used in perfumery, pharmacy or for insecticidal purposes',
-            'ar': 'نباتات وبذور وثمار تستعمل في العطارة أو الصيدلة أو لأغراض مبيدة للحشرات'
-        },
-        
-        # Frozen Fruits (Chapter 08.11)
-        '081110': {
-            'en': 'Frozen strawberries',
-            'ar': 'فراولة مجمدة'
-        },
-        '081140': {
-            'en': 'Frozen mangoes',
-            'ar': 'مانجو مجمدة'
-        }
-    }
+    return _DESCRIPTION_VIEW
 
 def get_hs_code_description(hs_code, language='en'):
     """
@@ -122,13 +223,8 @@ def get_hs_code_description(hs_code, language='en'):
     Returns:
         str: Description of the HS code or None if not found
     """
-    descriptions = get_hs_code_descriptions()
-    code_info = descriptions.get(hs_code)
-    
-    if code_info:
-        return code_info.get(language, code_info.get('en'))
-    
-    return None
+    entry = get_hs_code(hs_code)
+    return entry.description(language) if entry else None
 
 def get_hs_code_category(hs_code):
     """
@@ -142,33 +238,9 @@ def get_hs_code_category(hs_code):
     """
     if not hs_code:
         return None
-    
-    # Extract first 2 digits for chapter classification
-    chapter = hs_code[:2]
-    
-    categories = {
-        '07': {
-            'en': 'Vegetables and certain roots and tubers',
-            'ar': 'خضروات وجذور ودرنات معينة'
-        },
-        '08': {
-            'en': 'Fruits and nuts',
-            'ar': 'فواكه ومكسرات'
-        },
-        '09': {
-            'en': 'Coffee, tea, spices',
-            'ar': 'قهوة وشاي وتوابل'
-        },
-        '12': {
-            'en': 'Oil seeds and oleaginous fruits',
-            'ar': 'بذور زيتية وثمار زيتية'
-        }
-    }
-    
-    return categories.get(chapter, {
-        'en': 'Other agricultural products',
-        'ar': 'منتجات زراعية أخرى'
-    })
+
+    # First 2 digits are the chapter
+    return HS_CHAPTERS.get(normalize_hs_code(hs_code)[:2], _OTHER_CHAPTER)
 
 def format_hs_code_display(hs_code, language='en'):
     """
@@ -183,15 +255,70 @@ def format_hs_code_display(hs_code, language='en'):
     """
     if not hs_code:
         return None
-    
-    description = get_hs_code_description(hs_code, language)
-    
-    if description:
-        return f"{hs_code} — {description}"
-    else:
-        # Fallback for unknown codes
-        category = get_hs_code_category(hs_code)
-        if category:
-            return f"{hs_code} — {category[language]}"
-        else:
-            return hs_code
+
+    entry = get_hs_code(hs_code)
+    if entry:
+        return f"{hs_code} — {entry.description(language)}"
+    # Fallback for unknown codes
+    return f"{hs_code} — {get_hs_code_category(hs_code)[language]}"
+
+def lookup_hs_codes(prefix, limit=None):
+    """
+    Known HS codes starting with ``prefix`` ('08' chapter, '0805' heading, ...), in code order.
+
+    Args:
+        prefix (str): Leading digits; dots and spaces are ignored
+        limit (int): Maximum number of codes to return
+
+    Returns:
+        list: ``HSCode`` entries
+    """
+    prefix = normalize_hs_code(prefix)
+    lo = bisect.bisect_left(_SORTED_CODES, prefix)
+    hi = bisect.bisect_left(_SORTED_CODES, prefix + ':', lo)  # ':' sorts right after '9'
+    codes = _SORTED_CODES[lo:hi] if limit is None else _SORTED_CODES[lo:min(hi, lo + limit)]
+    return [HS_CODES[code] for code in codes]
+
+def find_hs_codes(query, limit=20):
+    """
+    HS codes for a picker: a code prefix when ``query`` has digits, else a description match.
+
+    Args:
+        query (str): '0805', '0805.1', 'orange', 'برتقال', ...
+        limit (int): Maximum number of codes to return
+
+    Returns:
+        list: ``HSCode`` entries in code order
+    """
+    query = (query or '').strip()
+    if not query:
+        return [HS_CODES[code] for code in _SORTED_CODES[:limit]]
+    if normalize_hs_code(query):
+        return lookup_hs_codes(query, limit)
+    needle = query.casefold()
+    return [HS_CODES[code] for code, text in _SEARCH_TEXT if needle in text][:limit]
+
+def annotate_products(products, language='en'):
+    """
+    Resolve the HS codes of many products in one pass.
+
+    Args:
+        products (iterable): Objects with an ``id`` and ``hs_code``
+        language (str): Language code ('en' or 'ar') for ``display``
+
+    Returns:
+        dict: ``{product.id: {'code', 'description', 'display', 'chapter'}}`` for products with a code
+    """
+    annotations = {}
+    for product in products:
+        if not product.hs_code:
+            continue
+        entry = get_hs_code(product.hs_code)
+        chapter = get_hs_code_category(product.hs_code)
+        annotations[product.id] = {
+            'code': product.hs_code,
+            'description': entry.description(language) if entry else None,
+            'display': format_hs_code_display(product.hs_code, language),
+            'chapter': chapter[language],
+        }
+    return annotations
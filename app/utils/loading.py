@@ -0,0 +1,30 @@
+"""
+Relationship loading for list queries.
+
+A lazy relationship read inside a template loop costs one query per row
+(``log.user`` in the audit log table, ``product.category`` in the admin
+product table). List routes name the relationships their templates read:
+
+    AuditLog.query.options(*eager(joinedload(AuditLog.user)))
+
+With ``STRICT_LOADING`` on (the default under TestingConfig), ``eager()`` adds
+``raiseload('*')`` and ``load_profile()`` raises on deferred columns, so a
+template that starts reading something its route does not load fails in tests
+instead of quietly adding a query per row. Lookups the identity map can answer
+still pass, and ``lazy='dynamic'`` relationships (``product.images``) are
+queries of their own and are not affected.
+"""
+
+from flask import current_app, has_app_context
+from sqlalchemy.orm import raiseload
+
+
+def strict_loading():
+    return has_app_context() and bool(current_app.config.get('STRICT_LOADING'))
+
+
+def eager(*options):
+    """``options``, plus ``raiseload('*')`` for every other relationship under ``STRICT_LOADING``."""
+    if strict_loading():
+        return (*options, raiseload('*', sql_only=True))
+    return options
@@ -0,0 +1,154 @@
+"""
+Prometheus metrics aggregated across Gunicorn workers.
+
+Uses prometheus_client's multiprocess mode: when ``PROMETHEUS_MULTIPROC_DIR`` is
+set (gunicorn.conf.py does this) every worker writes its samples to mmap'd files
+in that directory and ``/metrics`` merges them, so a scrape sees the whole
+server rather than whichever worker answered. Without the variable (``flask
+run``, tests) the in-process registry is used.
+
+Exported series:
+
+  emdad_http_requests_total{endpoint,method,status}
+  emdad_http_request_duration_seconds{endpoint}           histogram
+  emdad_db_pool_checkouts_total
+  emdad_db_pool_checkout_wait_seconds                     histogram
+  emdad_cache_requests_total{cache,result}                result = hit | miss
+  emdad_mail_send_duration_seconds{outcome}               histogram
+  emdad_upload_bytes_total{endpoint}
+
+Hit ratio: ``sum by (cache) (rate(emdad_cache_requests_total{result="hit"}[5m]))
+/ sum by (cache) (rate(emdad_cache_requests_total[5m]))``.
+"""
+
+import os
+import time
+from functools import wraps
+
+from flask import Response, abort, g, request
+from sqlalchemy import event
+
+try:
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                                   generate_latest, multiprocess)
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = None
+
+_START_KEY = '_metrics_start'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+if Counter is not None:
+    HTTP_REQUESTS = Counter('emdad_http_requests_total', 'HTTP requests handled',
+                            ['endpoint', 'method', 'status'])
+    HTTP_LATENCY = Histogram('emdad_http_request_duration_seconds', 'Request handling time',
+                             ['endpoint'], buckets=LATENCY_BUCKETS)
+    DB_POOL_CHECKOUTS = Counter('emdad_db_pool_checkouts_total', 'Connections checked out of the pool')
+    DB_POOL_WAIT = Histogram('emdad_db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection',
+                             buckets=POOL_WAIT_BUCKETS)
+    CACHE_REQUESTS = Counter('emdad_cache_requests_total', 'Cache lookups', ['cache', 'result'])
+    MAIL_LATENCY = Histogram('emdad_mail_send_duration_seconds', 'Outbound mail send time',
+                             ['outcome'], buckets=LATENCY_BUCKETS)
+    UPLOAD_BYTES = Counter('emdad_upload_bytes_total', 'Bytes received in multipart uploads', ['endpoint'])
+
+
+def record_cache(cache, hit):
+    """Count one lookup in cache ``cache``; call from any in-process cache."""
+    if Counter is not None:
+        CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def _instrument_pool(engine):
+    """Time ``pool.connect`` (the checkout) on the engine's current pool."""
+    pool = engine.pool
+    if getattr(pool, '_metrics_instrumented', False):
+        return
+    checkout = pool.connect
+
+    @wraps(checkout)
+    def timed_checkout():
+        started = time.perf_counter()
+        try:
+            return checkout()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+            DB_POOL_CHECKOUTS.inc()
+
+    pool.connect = timed_checkout
+    pool._metrics_instrumented = True
+
+
+def _instrument_mail(mail):
+    send = mail.send
+    if getattr(send, '_metrics_instrumented', False):
+        return
+
+    @wraps(send)
+    def timed_send(message):
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = send(message)
+            outcome = 'ok'
+            return result
+        finally:
+            MAIL_LATENCY.labels(outcome=outcome).observe(time.perf_counter() - started)
+
+    timed_send._metrics_instrumented = True
+    mail.send = timed_send
+
+
+def render_metrics():
+    """Return (body, content_type) for the current process or the whole worker pool."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def init_metrics(app, db, mail):
+    """Install request, pool and mail instrumentation and the ``/metrics`` endpoint."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    if Counter is None:
+        app.logger.warning('prometheus_client is not installed; /metrics disabled')
+        return
+
+    with app.app_context():
+        engine = db.engine
+    _instrument_pool(engine)
+    # dispose() (e.g. after fork) swaps in a fresh pool; instrument that one too
+    event.listen(engine, 'engine_disposed', lambda conn: _instrument_pool(engine))
+    _instrument_mail(mail)
+
+    @app.before_request
+    def _start_metrics_timer():
+        g.setdefault(_START_KEY, time.perf_counter())
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get(_START_KEY)
+        endpoint = request.endpoint or 'unmatched'
+        if started is None or endpoint == 'metrics':
+            return response
+        HTTP_LATENCY.labels(endpoint=endpoint).observe(time.perf_counter() - started)
+        HTTP_REQUESTS.labels(endpoint=endpoint, method=request.method, status=str(response.status_code)).inc()
+        if request.mimetype == 'multipart/form-data' and request.content_length:
+            UPLOAD_BYTES.labels(endpoint=endpoint).inc(request.content_length)
+        return response
+
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token:
+            if request.headers.get('Authorization') != f'Bearer {token}':
+                abort(401)
+        elif app.config.get('METRICS_REQUIRE_TOKEN'):
+            # No token configured: do not expose the endpoint at all
+            abort(404)
+        body, content_type = render_metrics()
+        return Response(body, content_type=content_type)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,174 @@
+"""
+Keyset (cursor) pagination for admin listings.
+
+``.paginate()`` runs ``COUNT(*)`` and ``OFFSET (page - 1) * per_page`` on every
+page, so page 5000 of the RFQ list reads and discards 100k rows. Here each page
+continues from the boundary row of the previous one,
+``WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC``,
+which is one index seek whatever the depth.
+
+Links carry an opaque ``cursor`` (boundary sort key, page number, direction)
+instead of a page number; render them with the macro in
+templates/admin/_keyset_pagination.html. Totals come from ``cached_count``:
+the COUNT runs at most once per ``COUNT_CACHE_TTL`` seconds for each distinct
+filtered query in a worker. A write to a table the query reads, in any worker,
+drops its cached totals (app/utils/cache_bus.py).
+"""
+
+import json
+import math
+import time
+import base64
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.sql.util import find_tables
+
+from app.utils.cache_bus import cache_state, poll_versions, register_cache
+from app.utils.metrics import record_cache
+
+COUNT_CACHE_TTL = 60
+COUNT_CACHE_MAX = 512
+# Tables of the keyset-paginated admin listings
+COUNT_KINDS = ('product', 'rfq', 'news', 'gallery', 'user', 'audit_log')
+
+
+def _counts():
+    """This app's count cache: ``{key: (total, expires, tables)}`` and the lock guarding it."""
+    state = cache_state('admin_counts')
+    if state.value is None:
+        state.value = {}
+    return state.value, state.lock
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(sort_value, row_id, page, direction):
+    payload = json.dumps([_encode_value(sort_value), row_id, page, direction], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(sort_value, id, page, direction)``, or None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id, page, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ('next', 'prev') or not isinstance(page, int) or page < 1:
+            return None
+        return _decode_value(sort_value), int(row_id), page, direction
+    except (ValueError, TypeError):
+        return None
+
+
+def cached_count(query, ttl=COUNT_CACHE_TTL):
+    """``query.count()``, reused for ``ttl`` seconds per distinct SQL + parameters."""
+    poll_versions()
+    statement = query.order_by(None).statement
+    compiled = statement.compile()
+    key = (compiled.string, repr(sorted(compiled.params.items())))
+    now = time.monotonic()
+    counts, lock = _counts()
+    with lock:
+        hit = counts.get(key)
+    if hit and hit[1] > now:
+        record_cache('admin_counts', True)
+        return hit[0]
+
+    record_cache('admin_counts', False)
+    total = query.order_by(None).count()
+    tables = frozenset(table.name for table in find_tables(statement))
+    with lock:
+        if len(counts) >= COUNT_CACHE_MAX:
+            counts.clear()
+        counts[key] = (total, now + ttl, tables)
+    return total
+
+
+def invalidate_counts(tables=None):
+    """Forget cached totals, all of them or those of queries reading ``tables``."""
+    counts, lock = _counts()
+    with lock:
+        if tables is None:
+            counts.clear()
+            return
+        for key in [key for key, hit in counts.items() if hit[2] & tables]:
+            del counts[key]
+
+
+register_cache('admin_counts', COUNT_KINDS, invalidate_counts)
+
+
+class KeysetPage:
+    """One page of rows plus the cursors for its neighbours."""
+
+    def __init__(self, items, page, per_page, total, has_prev, has_next, prev_cursor, next_cursor):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = max(1, math.ceil(total / per_page)) if total is not None else None
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+    @property
+    def first_index(self):
+        """1-based position of the first row on this page (for "21-40 of ~1,000")."""
+        return (self.page - 1) * self.per_page + 1 if self.items else 0
+
+    @property
+    def last_index(self):
+        return self.first_index + len(self.items) - 1 if self.items else 0
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, per_page=20, with_total=True):
+    """Page ``query`` newest-first on ``(sort_column, id_column)`` starting at ``cursor``."""
+    query = query.order_by(None)
+    position = decode_cursor(cursor)
+    descending = (sort_column.desc(), id_column.desc())
+    ascending = (sort_column.asc(), id_column.asc())
+
+    if position is None:
+        page, direction = 1, 'next'
+        rows = query.order_by(*descending).limit(per_page + 1).all()
+    else:
+        sort_value, row_id, page, direction = position
+        boundary = tuple_(sort_column, id_column)
+        if direction == 'next':
+            rows = query.filter(boundary < (sort_value, row_id)).order_by(*descending).limit(per_page + 1).all()
+        else:
+            rows = query.filter(boundary > (sort_value, row_id)).order_by(*ascending).limit(per_page + 1).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'next':
+        has_prev, has_next = page > 1, more
+    else:
+        rows.reverse()
+        has_prev, has_next = more, True
+        if not more:
+            page = 1
+
+    def key(row):
+        return getattr(row, sort_column.key), getattr(row, id_column.key)
+
+    prev_cursor = encode_cursor(*key(rows[0]), page - 1, 'prev') if rows and has_prev else None
+    next_cursor = encode_cursor(*key(rows[-1]), page + 1, 'next') if rows and has_next else None
+    total = cached_count(query) if with_total else None
+    return KeysetPage(rows, page, per_page, total, has_prev, has_next, prev_cursor, next_cursor)
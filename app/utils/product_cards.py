@@ -0,0 +1,170 @@
+"""
+Denormalized product cards for the listing pages.
+
+A product card (products page, homepage and calendar picks, the calendar
+grid) shows the names, short description, category, main image, HS code,
+twelve-month season strip and a couple of specification badges. Rendering
+that from Product means the wide product row, its category, one or two image
+queries and several JSON parses per card. ``product_card`` keeps exactly what
+a card shows, one narrow row per product, so a page of cards is one indexed
+query.
+
+Rows are rewritten in the same transaction as the ORM flush that changes a
+Product, and patched when a ProductImage or Category changes. Bulk inserts
+that bypass the ORM need ``rebuild_product_cards()`` / ``flask rebuild-derived cards``.
+"""
+
+import json
+
+from flask import current_app
+from sqlalchemy import event, inspect, select
+
+from app.utils.projections import load_profile
+
+
+def _main_image(product_id):
+    """Select of the filename ``Product.get_main_image()`` returns: the main image, else the first."""
+    from app.models import ProductImage
+
+    return (select(ProductImage.filename).where(ProductImage.product_id == product_id)
+            .order_by(ProductImage.is_main.desc(), ProductImage.id).limit(1))
+
+
+def _badges(product):
+    badges = {}
+    for language in ('en', 'ar'):
+        specs = product.get_specifications_lang(language)
+        if specs:
+            badges[language] = {'brix': specs.get('brix'), 'sizes': bool(specs.get('sizes'))}
+    return json.dumps(badges, ensure_ascii=False, default=str)[:500] if badges else None
+
+
+def card_row(product, category, main_image):
+    """The ``product_card`` row of ``product`` as a dict."""
+    from app.models import ProductCard
+
+    codes = ProductCard.MONTH_CODES
+    return {
+        'id': product.id,
+        'slug': product.slug,
+        'status': product.status,
+        'featured': bool(product.featured),
+        'show_on_homepage': bool(product.show_on_homepage),
+        'sort_order': product.sort_order or 0,
+        'name_en': product.name_en,
+        'name_ar': product.name_ar,
+        'short_description_en': product.short_description_en,
+        'short_description_ar': product.short_description_ar,
+        'category_id': product.category_id,
+        'category_key': category.key if category else None,
+        'category_name_en': category.name_en if category else None,
+        'category_name_ar': category.name_ar if category else None,
+        'main_image': main_image,
+        'image_path': product.image_path,
+        'hs_code': product.hs_code,
+        'months_en': ''.join(codes.get(state, '-') for state in product.get_months_state('en')),
+        'months_ar': ''.join(codes.get(state, '-') for state in product.get_months_state('ar')),
+        'badges': _badges(product),
+    }
+
+
+# -- Sync ---------------------------------------------------------------------
+
+def _category_values(category):
+    return {'category_key': category.key, 'category_name_en': category.name_en,
+            'category_name_ar': category.name_ar}
+
+
+def _sync_product_cards(session, flush_context):
+    """after_flush: rewrite the cards of changed products; patch images and category names."""
+    from app.models import Category, Product, ProductCard, ProductImage
+
+    try:
+        if not current_app.extensions.get('product_cards'):
+            return
+    except RuntimeError:
+        # Outside an app context (bare scripts): nothing to sync against
+        return
+    written = list(session.new) + list(session.dirty)
+    products = [obj for obj in written if isinstance(obj, Product) and obj.id is not None]
+    deleted = {obj.id for obj in session.deleted if isinstance(obj, Product) and obj.id is not None}
+    image_products = {obj.product_id for obj in (*written, *session.deleted)
+                      if isinstance(obj, ProductImage) and obj.product_id is not None}
+    categories = [obj for obj in written if isinstance(obj, Category) and obj.id is not None]
+    categories_deleted = [obj.id for obj in session.deleted if isinstance(obj, Category) and obj.id is not None]
+    if not (products or deleted or image_products or categories or categories_deleted):
+        return
+
+    table = ProductCard.__table__
+    connection = session.connection()
+    rewritten = {product.id for product in products} | deleted
+    if rewritten:
+        connection.execute(table.delete().where(table.c.id.in_(rewritten)))
+    rows = []
+    for product in products:
+        # category_id may have changed without the relationship being reloaded
+        category = session.get(Category, product.category_id) if product.category_id else None
+        main_image = connection.execute(_main_image(product.id)).scalar()
+        rows.append(card_row(product, category, main_image))
+    if rows:
+        connection.execute(table.insert(), rows)
+    for product_id in image_products - rewritten:
+        connection.execute(table.update().where(table.c.id == product_id)
+                           .values(main_image=_main_image(product_id).scalar_subquery()))
+    for category in categories:
+        connection.execute(table.update().where(table.c.category_id == category.id)
+                           .values(**_category_values(category)))
+    if categories_deleted:
+        connection.execute(table.update().where(table.c.category_id.in_(categories_deleted))
+                           .values(category_key=None, category_name_en=None, category_name_ar=None))
+
+
+def rebuild_product_cards(db):
+    """Rewrite every card from the product, category and image tables; return the card count."""
+    from app.models import Category, Product, ProductCard
+
+    table = ProductCard.__table__
+    count = 0
+    db.session.execute(table.delete())
+    categories = {category.id: category for category in Category.query}
+    statement = (select(Product, _main_image(Product.id).scalar_subquery())
+                 .options(load_profile('card')).order_by(Product.id).execution_options(yield_per=500))
+    batch = []
+    for product, main_image in db.session.execute(statement):
+        batch.append(card_row(product, categories.get(product.category_id), main_image))
+        if len(batch) >= 1000:
+            db.session.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+
+def ensure_product_cards(db, rebuild=False):
+    """Create ``product_card`` if missing (filling it when new, or when ``rebuild``); return True if usable."""
+    from app.models import ProductCard
+
+    inspector = inspect(db.engine)
+    if not inspector.has_table('product'):
+        return False
+    created = not inspector.has_table('product_card')
+    if created:
+        ProductCard.__table__.create(db.engine)
+    if created or rebuild:
+        rebuild_product_cards(db)
+    return True
+
+
+def init_product_cards(app, db):
+    """Create and fill the card table if needed and keep it in sync with ORM writes."""
+    if not event.contains(db.session, 'after_flush', _sync_product_cards):
+        event.listen(db.session, 'after_flush', _sync_product_cards)
+    try:
+        with app.app_context():
+            app.extensions['product_cards'] = ensure_product_cards(db)
+    except Exception as e:
+        app.extensions['product_cards'] = False
+        app.logger.warning(f'Product cards unavailable: {e}')
@@ -0,0 +1,205 @@
+"""
+Low-overhead sampling profiler for production requests.
+
+A background thread snapshots ``sys._current_frames()`` every
+``PROFILER_INTERVAL_MS`` and counts identical stacks. The output is the
+collapsed-stack format (``outer;inner;leaf count`` per line), which
+speedscope.app, inferno and flamegraph.pl open directly.
+
+Two triggers, both admin-only:
+
+* a single request: add ``?_profile=<token>`` or an ``X-Profile: <token>``
+  header, where the token is signed with SECRET_KEY and issued on the admin
+  Profiles page; the response carries ``X-Profile-File`` with the result name
+* a time window: started from the Profiles page, samples every thread of the
+  worker that served the form for N seconds
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app, g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+PROFILE_SUFFIX = '.collapsed.txt'
+_ACTIVE_KEY = '_active_profiler'
+_TOKEN_SALT = 'request-profiler'
+
+
+class SamplingProfiler:
+    """Sample the stacks of ``thread_ids`` (or every other thread) until stopped."""
+
+    def __init__(self, interval=0.005, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in sys.path:
+                if prefix and filename.startswith(prefix):
+                    filename = filename[len(prefix):].lstrip(os.sep)
+                    break
+            label = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def profiles_dir(app=None):
+    app = app or current_app
+    path = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def save_profile(profiler, label, app=None):
+    """Write ``profiler`` as a collapsed-stack file and prune old ones; return the file name."""
+    app = app or current_app
+    directory = profiles_dir(app)
+    safe_label = ''.join(c if c.isalnum() or c in '-.' else '-' for c in label)[:60]
+    name = f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')}_{safe_label}_{os.getpid()}{PROFILE_SUFFIX}"
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+        f.write(profiler.collapsed())
+
+    keep = app.config.get('PROFILER_MAX_FILES', 50)
+    for old in list_profiles(app)[keep:]:
+        try:
+            os.remove(os.path.join(directory, old['name']))
+        except OSError:
+            pass
+    return name
+
+
+def list_profiles(app=None):
+    """Saved profiles, newest first."""
+    directory = profiles_dir(app)
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        entries.append({'name': name, 'bytes': stat.st_size, 'modified': datetime.utcfromtimestamp(stat.st_mtime)})
+    entries.sort(key=lambda e: e['modified'], reverse=True)
+    return entries
+
+
+def _serializer(app):
+    return URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=_TOKEN_SALT)
+
+
+def issue_profile_token(user_id, app=None):
+    """Signed token that enables per-request profiling for PROFILER_TOKEN_MAX_AGE seconds."""
+    return _serializer(app or current_app).dumps({'uid': user_id})
+
+
+def _token_user_id(app, token):
+    """The ``uid`` a valid, unexpired token was issued to, else None."""
+    try:
+        payload = _serializer(app).loads(token, max_age=app.config.get('PROFILER_TOKEN_MAX_AGE', 3600))
+    except BadSignature:
+        return None
+    return payload.get('uid') if isinstance(payload, dict) else None
+
+
+def _token_valid(app, token):
+    """True if ``token`` is valid and was issued to the signed-in admin making this request.
+
+    A token leaked through a URL, an access log or a Referer header is useless
+    without that admin's session.
+    """
+    uid = _token_user_id(app, token)
+    if uid is None:
+        return False
+    from flask_login import current_user
+    return (current_user.is_authenticated and current_user.has_permission('manage_users')
+            and current_user.id == uid)
+
+
+def start_window(app, seconds, label='window'):
+    """Profile every thread of this worker for ``seconds`` in the background."""
+    interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000.0
+    profiler = SamplingProfiler(interval=interval).start()
+
+    def finish():
+        time.sleep(seconds)
+        profiler.stop()
+        with app.app_context():
+            save_profile(profiler, f'{label}-{seconds}s', app)
+
+    threading.Thread(target=finish, name='profiler-window', daemon=True).start()
+    return profiler
+
+
+def init_profiler(app):
+    """Enable per-request profiling via a signed ``_profile`` param or ``X-Profile`` header."""
+    if not app.config.get('PROFILER_ENABLED', True):
+        return
+
+    @app.before_request
+    def _maybe_start_profiler():
+        token = request.args.get('_profile') or request.headers.get('X-Profile')
+        if not token or not _token_valid(app, token):
+            return
+        interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000.0
+        setattr(g, _ACTIVE_KEY, SamplingProfiler(interval=interval, thread_ids=[threading.get_ident()]).start())
+
+    @app.after_request
+    def _finish_profiler(response):
+        profiler = g.pop(_ACTIVE_KEY, None)
+        if profiler is not None:
+            profiler.stop()
+            name = save_profile(profiler, request.endpoint or 'unmatched', app)
+            response.headers['X-Profile-File'] = name
+            app.logger.info(f'Profiled {request.path}: {profiler.samples} samples -> {name}')
+        return response
+
+    @app.teardown_request
+    def _abandon_profiler(exc):
+        profiler = g.pop(_ACTIVE_KEY, None)
+        if profiler is not None:
+            profiler.stop()
@@ -0,0 +1,38 @@
+"""
+Column projections for Product list queries.
+
+A Product row carries two descriptions, four SEO fields and six JSON text
+columns, but a list view reads a handful of short columns. A profile names
+the columns one kind of view reads; ``Product.query.options(load_profile('nav'))``
+loads just those (and the primary key) and defers the rest.
+
+Accessing a deferred column still works, but costs one query per row (and
+raises under ``STRICT_LOADING``), so a profile must cover everything its
+templates touch:
+
+* ``card``: product cards (related products, the card rebuild, the admin calendar)
+* ``nav``: navbar and sidebar product links
+* ``admin_row``: the admin product table
+* ``api_summary``: ``/api/products`` items
+"""
+
+from sqlalchemy.orm import load_only
+
+from app.utils.loading import strict_loading
+
+PROFILES = {
+    'card': ('slug', 'status', 'category_id', 'name_en', 'name_ar', 'short_description_en',
+             'short_description_ar', 'hs_code', 'specifications', 'seasonality', 'featured',
+             'show_on_homepage', 'sort_order', 'image_path'),
+    'nav': ('slug', 'name_en', 'name_ar'),
+    'admin_row': ('name_en', 'name_ar', 'status', 'featured', 'category_id', 'image_path',
+                  'created_at', 'updated_at'),
+    'api_summary': ('slug', 'name_en', 'name_ar', 'category_id', 'hs_code'),
+}
+
+
+def load_profile(name):
+    """``load_only`` option loading the Product columns of profile ``name``."""
+    from app.models import Product
+
+    return load_only(*(getattr(Product, column) for column in PROFILES[name]), raiseload=strict_loading())
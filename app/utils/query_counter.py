@@ -0,0 +1,169 @@
+"""
+Per-request SQL query counter, timer and N+1 detector.
+
+Engine cursor events count and time every statement executed while a request
+is active, including statements that fail. Statements are grouped by shape (parameter placeholders and IN
+lists collapsed), and any shape repeated ``QUERY_N_PLUS_ONE_THRESHOLD`` times
+in one request is reported as an N+1 candidate - typically a lazy relationship
+or helper like ``get_main_image`` being called inside a template loop.
+
+After each request the summary is logged, sent to signed-in back-office users
+as an ``X-Query-Count`` header, and checked against the route's query budget
+(``QUERY_BUDGETS`` by endpoint, else ``QUERY_BUDGET_DEFAULT``). Over-budget
+requests log a warning, or raise ``QueryBudgetExceeded`` when
+``QUERY_BUDGET_MODE`` is ``'raise'`` (the default under TestingConfig).
+Queries run inside ``not_counted()`` (the first build of a per-worker cache)
+are left out of the count and the budget.
+"""
+
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+_STATS_KEY = '_query_stats'
+_START_KEY = '_query_counter_start'
+_PAUSED_KEY = '_query_counter_paused'
+
+_IN_LIST = re.compile(r'IN \((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)*\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised (in 'raise' mode) when a request runs more queries than its budget."""
+
+
+def statement_shape(statement):
+    """Normalise a SQL statement so repeated executions with different parameters match."""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    return _IN_LIST.sub('IN (...)', shape)
+
+
+class QueryStats:
+    """Queries executed during a single request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+        self.shape_time = defaultdict(float)
+
+    def record(self, statement, duration):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.total_time += duration
+        self.shapes[shape] += 1
+        self.shape_time[shape] += duration
+
+    def repeated(self, threshold):
+        """Statement shapes executed at least ``threshold`` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def header_value(self, n_plus_one):
+        return f'count={self.count}; time={self.total_time * 1000:.1f}ms; n+1={len(n_plus_one)}'
+
+
+def current_query_stats():
+    """The QueryStats of the active request, or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get(_STATS_KEY)
+
+
+@contextmanager
+def not_counted():
+    """Leave the queries run inside out of the active request's count and budget."""
+    pause = has_request_context() and not g.get(_PAUSED_KEY, False)
+    if pause:
+        setattr(g, _PAUSED_KEY, True)
+    try:
+        yield
+    finally:
+        if pause:
+            g.pop(_PAUSED_KEY, None)
+
+
+def show_query_details(app):
+    """Whether the current request may see query counts and SQL time (back-office users, or debug)."""
+    if app.debug:
+        return True
+    try:
+        from flask_login import current_user
+        # Every account is a back-office user (admin, editor or viewer)
+        return current_user.is_authenticated
+    except Exception:
+        return False
+
+
+def init_query_counter(app, db):
+    """Attach the counter to the app's engine and request lifecycle."""
+    if not app.config.get('QUERY_COUNTER_ENABLED', True):
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and _STATS_KEY in g and not g.get(_PAUSED_KEY, False):
+            conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        stats = current_query_stats()
+        if stats is not None:
+            stats.record(statement, duration)
+
+    @event.listens_for(engine, 'handle_error')
+    def _handle_error(context):
+        # A failed statement never reaches after_cursor_execute: pop its start here, or the
+        # next statement that is not timed would pop it and be recorded with the gap
+        connection = context.connection
+        starts = connection.info.get(_START_KEY) if connection is not None else None
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        stats = current_query_stats()
+        if stats is not None:
+            stats.record(context.statement or '', duration)
+
+    @app.before_request
+    def _start_query_stats():
+        g.setdefault(_STATS_KEY, QueryStats())
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = current_query_stats()
+        if stats is None or request.endpoint == 'static':
+            return response
+
+        config = app.config
+        endpoint = request.endpoint or request.path
+        budget = (config.get('QUERY_BUDGETS') or {}).get(endpoint, config.get('QUERY_BUDGET_DEFAULT'))
+        n_plus_one = stats.repeated(config.get('QUERY_N_PLUS_ONE_THRESHOLD', 5))
+        summary = (f'{request.method} {request.path} [{endpoint}] '
+                   f'{stats.count} queries in {stats.total_time * 1000:.1f}ms')
+
+        if n_plus_one:
+            worst_shape, worst_count = n_plus_one[0]
+            app.logger.warning(f'{summary}; {len(n_plus_one)} repeated statement(s) (N+1?), '
+                               f'worst x{worst_count}: {worst_shape[:200]}')
+        else:
+            app.logger.debug(summary)
+
+        if budget is not None and stats.count > budget:
+            message = f'Query budget exceeded: {summary} (budget {budget})'
+            if config.get('QUERY_BUDGET_MODE', 'warn') == 'raise':
+                raise QueryBudgetExceeded(message)
+            app.logger.warning(message)
+
+        if show_query_details(app):
+            response.headers['X-Query-Count'] = stats.header_value(n_plus_one)
+        return response
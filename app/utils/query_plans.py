@@ -0,0 +1,307 @@
+"""
+Registry of hot queries and an EXPLAIN-based full-scan regression check.
+
+Each registered builder returns the SQLAlchemy query a route issues on every
+request (same filters and ordering). ``check_hot_query_plans`` runs SQLite's
+``EXPLAIN QUERY PLAN`` on each one and reports any that scan a whole table
+instead of using an index, so dropping or mis-declaring an index in
+app/models.py shows up as a failure rather than as slow pages in production.
+"""
+
+from datetime import datetime
+
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    """Register a zero-argument builder returning the query used by ``name``."""
+    def decorator(builder):
+        HOT_QUERIES[name] = builder
+        return builder
+    return decorator
+
+
+class QueryPlanRegression(AssertionError):
+    """Raised when a registered hot query degrades to a full table scan."""
+
+
+def explain(query):
+    """Return the EXPLAIN QUERY PLAN detail lines for a Query or Select (SQLite only)."""
+    from app import db
+
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[key] for key in (compiled.positiontup or []))
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled.string}', params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    """Plan lines that read a whole table rather than an index range or lookup."""
+    scans = []
+    for detail in plan:
+        # "SCAN product" (3.36+) / "SCAN TABLE product" (older); index scans say "USING ... INDEX"
+        if detail.startswith('SCAN ') and 'INDEX' not in detail and 'CONSTANT ROW' not in detail:
+            scans.append(detail)
+    return scans
+
+
+def check_hot_query_plans(names=None):
+    """Explain every registered hot query; return ``{name: {'plan': [...], 'full_scans': [...]}}``."""
+    from app import db
+
+    if db.engine.dialect.name != 'sqlite':
+        raise RuntimeError('Query plan checks only support SQLite EXPLAIN QUERY PLAN output')
+
+    report = {}
+    for name, builder in sorted(HOT_QUERIES.items()):
+        if names and name not in names:
+            continue
+        plan = explain(builder())
+        report[name] = {'plan': plan, 'full_scans': full_scans(plan)}
+    return report
+
+
+def assert_no_full_scans(names=None):
+    """Raise QueryPlanRegression listing every hot query that does a full scan."""
+    report = check_hot_query_plans(names)
+    failures = {name: r['full_scans'] for name, r in report.items() if r['full_scans']}
+    if failures:
+        lines = [f'{name}: {"; ".join(scans)}' for name, scans in sorted(failures.items())]
+        raise QueryPlanRegression('Hot queries degraded to full scans:\n' + '\n'.join(lines))
+    return report
+
+
+# -- Registered hot queries ---------------------------------------------------
+# Keep these in step with the routes named in each key.
+
+@hot_query('inject_config.nav_products')
+def _nav_products():
+    from app.models import Product
+    return Product.query.filter_by(status='active').order_by(Product.sort_order, Product.name_en)
+
+
+@hot_query('inject_config.latest_news')
+def _footer_news():
+    from app.models import News
+    return (News.query.filter_by(status='published')
+            .filter(News.publish_at <= datetime.utcnow())
+            .order_by(News.publish_at.desc()).limit(2))
+
+
+@hot_query('main.index.category_product')
+def _homepage_category_product():
+    from app.models import ProductCard
+    return (ProductCard.query.filter_by(status='active', show_on_homepage=True, category_id=1)
+            .order_by(ProductCard.sort_order, ProductCard.name_en).limit(1))
+
+
+@hot_query('main.index.homepage_products')
+def _homepage_products():
+    from app.models import ProductCard
+    return (ProductCard.query.filter_by(status='active', show_on_homepage=True)
+            .order_by(ProductCard.sort_order, ProductCard.name_en).limit(1))
+
+
+@hot_query('main.index.latest_news')
+def _homepage_news():
+    from app.models import News
+    return (News.query.filter_by(status='published', show_on_homepage=True, featured=True)
+            .filter(News.publish_at <= datetime.utcnow())
+            .order_by(News.publish_at.desc()).limit(3))
+
+
+@hot_query('main.products.by_category')
+def _products_by_category():
+    from app.models import ProductCard
+    return (ProductCard.query.filter_by(status='active', category_id=1)
+            .order_by(ProductCard.sort_order, ProductCard.name_en).limit(16))
+
+
+@hot_query('main.products.by_facets')
+def _products_by_facets():
+    from app.models import ProductCard
+    from app.utils.facets import FacetSelection
+    return (FacetSelection({'month': '3', 'hs_chapter': '08'})
+            .apply(ProductCard.query.filter_by(status='active'), ProductCard)
+            .order_by(ProductCard.sort_order, ProductCard.name_en).limit(16))
+
+
+@hot_query('main.calendar.cards')
+def _calendar_cards():
+    from app.models import ProductCard
+    return (ProductCard.query.filter_by(status='active')
+            .order_by(ProductCard.sort_order, ProductCard.name_en))
+
+
+@hot_query('api.products.by_packaging')
+def _products_by_packaging():
+    from app.models import Product
+    from app.utils.attributes import products_matching
+    return (Product.query.filter_by(status='active').filter(Product.id.in_(products_matching('10 kg carton')))
+            .order_by(Product.sort_order, Product.name_en))
+
+
+@hot_query('api.products.by_attribute')
+def _products_by_attribute():
+    from app.models import Product
+    from app.utils.attributes import products_with_attribute
+    return (Product.query.filter_by(status='active')
+            .filter(Product.id.in_(products_with_attribute(key='brix', at_least=12)))
+            .order_by(Product.sort_order, Product.name_en))
+
+
+@hot_query('main.product_detail.related')
+def _related_products():
+    from app.models import Product
+    return (Product.query.filter_by(category_id=1, status='active')
+            .filter(Product.id != 1).order_by(Product.sort_order).limit(4))
+
+
+@hot_query('main.product_detail.main_image')
+def _main_image():
+    from app.models import ProductImage
+    return ProductImage.query.filter_by(product_id=1, is_main=True).limit(1)
+
+
+@hot_query('main.gallery')
+def _gallery_items():
+    from app.models import Gallery
+    return Gallery.query.filter_by(is_active=True, category='farms').order_by(Gallery.sort_order)
+
+
+@hot_query('main.news')
+def _news_listing():
+    from app.models import News
+    return (News.query.filter_by(status='published')
+            .filter(News.publish_at <= datetime.utcnow())
+            .order_by(News.publish_at.desc()).limit(12))
+
+
+@hot_query('main.news.featured')
+def _featured_news():
+    from app.models import News
+    return (News.query.filter_by(status='published', featured=True)
+            .filter(News.publish_at <= datetime.utcnow())
+            .order_by(News.publish_at.desc()).limit(3))
+
+
+@hot_query('main.search.products')
+def _search_products():
+    from app.models import Product
+    from app.utils.search import search
+    return search(Product, 'orange').filter(Product.status == 'active').limit(10)
+
+
+@hot_query('main.search.news')
+def _search_news():
+    from app.models import News
+    from app.utils.search import search
+    return (search(News, 'export').filter(News.status == 'published', News.publish_at <= datetime.utcnow())
+            .limit(10))
+
+
+def _keyset_page(query, sort_column, id_column, per_page=20):
+    """The query keyset_paginate() issues for a page past the first one."""
+    from sqlalchemy import tuple_
+    return (query.filter(tuple_(sort_column, id_column) < (datetime.utcnow(), 2 ** 31))
+            .order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1))
+
+
+@hot_query('admin.products')
+def _admin_products():
+    from app.models import Product
+    return _keyset_page(Product.query, Product.updated_at, Product.id)
+
+
+@hot_query('admin.products.by_status')
+def _admin_products_by_status():
+    from app.models import Product
+    return _keyset_page(Product.query.filter_by(status='active'), Product.updated_at, Product.id)
+
+
+@hot_query('admin.products.by_category')
+def _admin_products_by_category():
+    from app.models import Product
+    return _keyset_page(Product.query.filter_by(category_id=1), Product.updated_at, Product.id)
+
+
+@hot_query('admin.news')
+def _admin_news():
+    from app.models import News
+    return _keyset_page(News.query, News.created_at, News.id)
+
+
+@hot_query('admin.news.by_status')
+def _admin_news_by_status():
+    from app.models import News
+    return _keyset_page(News.query.filter_by(status='published'), News.created_at, News.id)
+
+
+@hot_query('admin.gallery')
+def _admin_gallery():
+    from app.models import Gallery
+    return _keyset_page(Gallery.query, Gallery.created_at, Gallery.id)
+
+
+@hot_query('admin.rfqs')
+def _admin_rfqs():
+    from app.models import RFQ
+    return _keyset_page(RFQ.query, RFQ.created_at, RFQ.id)
+
+
+@hot_query('admin.rfqs.by_status')
+def _admin_rfqs_by_status():
+    from app.models import RFQ
+    return _keyset_page(RFQ.query.filter_by(status='new'), RFQ.created_at, RFQ.id)
+
+
+@hot_query('admin.users')
+def _admin_users():
+    from app.models import User
+    return _keyset_page(User.query, User.created_at, User.id)
+
+
+@hot_query('admin.audit_logs')
+def _admin_audit_logs():
+    from app.models import AuditLog
+    return _keyset_page(AuditLog.query, AuditLog.created_at, AuditLog.id, per_page=50)
+
+
+@hot_query('admin.audit_logs.by_action')
+def _admin_audit_logs_by_action():
+    from app.models import AuditLog
+    return _keyset_page(AuditLog.query.filter_by(action='update'), AuditLog.created_at, AuditLog.id, per_page=50)
+
+
+@hot_query('admin.audit_logs.by_entity_type')
+def _admin_audit_logs_by_entity_type():
+    from app.models import AuditLog
+    return _keyset_page(AuditLog.query.filter_by(entity_type='products'), AuditLog.created_at, AuditLog.id,
+                        per_page=50)
+
+
+@hot_query('admin.audit_logs.by_user')
+def _admin_audit_logs_by_user():
+    from app.models import AuditLog
+    return _keyset_page(AuditLog.query.filter_by(user_id=1), AuditLog.created_at, AuditLog.id, per_page=50)
+
+
+@hot_query('admin.dashboard.recent_logs')
+def _recent_logs():
+    from app.models import AuditLog
+    return AuditLog.query.order_by(AuditLog.created_at.desc()).limit(10)
+
+
+@hot_query('admin.reports_rfqs')
+def _reports_rfqs():
+    from app.models import RFQ
+    start = datetime(2024, 1, 1)
+    return (RFQ.query.filter(RFQ.created_at >= start, RFQ.created_at <= datetime.utcnow())
+            .order_by(RFQ.created_at.desc()).limit(200))
+
+
+@hot_query('api.api_products')
+def _api_products():
+    from app.models import Product
+    return Product.query.filter_by(status='active').order_by(Product.sort_order, Product.name_en)
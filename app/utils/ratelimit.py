@@ -0,0 +1,259 @@
+"""
+Shared Flask-Limiter storage backends.
+
+``memory://`` keeps counters inside each Gunicorn worker, so a "5 per minute"
+limit really allows 5 x workers and resets whenever ``max_requests`` recycles
+a worker. Importing this module registers two storages with ``limits`` that
+every worker (and, for RESP, every node) shares:
+
+``sqlite:///path/to/ratelimit.db``
+    One row per counter in a local WAL-mode SQLite file; each hit is a single
+    atomic UPSERT. No extra infrastructure, shared by all workers on a host.
+
+``resp://host:port/db`` / ``resps://host:port/db``
+    Any Redis-protocol server (Redis, Valkey, KeyDB, or the stand-in in
+    scripts/resp_standin.py) over a plain or TLS socket, without redis-py.
+    Shared by every node pointing at the same server. ``resps://`` verifies
+    the server certificate unless the URI has ``?ssl_cert_reqs=none``.
+
+Both support the fixed-window strategy (Flask-Limiter's default).
+"""
+
+import os
+import ssl
+import time
+import socket
+import sqlite3
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from limits.storage import Storage
+
+CLEANUP_EVERY = 1000
+
+
+class _PerProcessLocal(threading.local):
+    """Thread-local holder that also forgets its value in a forked child."""
+
+    pid = None
+    value = None
+
+    def get(self, factory):
+        if self.pid != os.getpid() or self.value is None:
+            self.value = factory()
+            self.pid = os.getpid()
+        return self.value
+
+    def drop(self):
+        self.value = None
+
+
+class SQLiteStorage(Storage):
+    """Fixed-window counters in a SQLite file shared by every worker process."""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri, wrap_exceptions=False, timeout=5.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # sqlite:////abs/path.db -> /abs/path.db, sqlite:///rel.db -> rel.db
+        self.path = uri.split('://', 1)[1][1:] or ':memory:'
+        self.timeout = float(timeout)
+        self._local = _PerProcessLocal()
+        self._hits = 0
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit '
+            '(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self):
+        return self._local.get(self._connect)
+
+    def incr(self, key, expiry, amount=1, **_):
+        now = time.time()
+        row = self._connection().execute(
+            'INSERT INTO rate_limit (key, count, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            '  count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, '
+            '  expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END '
+            'RETURNING count',
+            (key, amount, now + expiry, now, now),
+        ).fetchone()
+        self._hits += 1
+        if self._hits % CLEANUP_EVERY == 0:
+            self._connection().execute('DELETE FROM rate_limit WHERE expires_at <= ?', (now,))
+        return row[0]
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT count FROM rate_limit WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            'SELECT expires_at FROM rate_limit WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            self._local.drop()
+            return False
+
+    def reset(self):
+        return self._connection().execute('DELETE FROM rate_limit').rowcount
+
+    def clear(self, key):
+        self._connection().execute('DELETE FROM rate_limit WHERE key = ?', (key,))
+
+
+class RESPError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RESPConnection:
+    """Minimal blocking RESP2 client: enough commands for rate limiting."""
+
+    def __init__(self, host, port, db=0, password=None, timeout=2.0, ssl_context=None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if ssl_context is not None:
+            self.sock = ssl_context.wrap_socket(self.sock, server_hostname=host)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    @staticmethod
+    def encode(*args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(parts)
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('RESP server closed the connection')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RESPError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self.read_reply() for _ in range(length)]
+        raise RESPError(f'Unexpected RESP reply: {line!r}')
+
+    def pipeline(self, *commands):
+        """Send every command in one write and return their replies in order."""
+        self.sock.sendall(b''.join(self.encode(*command) for command in commands))
+        return [self.read_reply() for _ in commands]
+
+    def execute(self, *args):
+        return self.pipeline(args)[0]
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RESPStorage(Storage):
+    """Fixed-window counters in a Redis-protocol server shared by every node."""
+
+    STORAGE_SCHEME = ['resp', 'resps']
+
+    def __init__(self, uri, wrap_exceptions=False, key_prefix='LIMITS', timeout=2.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        parsed = urlparse(uri)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.timeout = float(timeout)
+        self.key_prefix = key_prefix
+        self.ssl_context = None
+        if parsed.scheme == 'resps':
+            self.ssl_context = ssl.create_default_context()
+            if parse_qs(parsed.query).get('ssl_cert_reqs', [''])[0].lower() == 'none':
+                # Managed Redis with a self-signed certificate
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._local = _PerProcessLocal()
+
+    @property
+    def base_exceptions(self):
+        return (OSError, RESPError)
+
+    def _key(self, key):
+        return f'{self.key_prefix}:{key}'
+
+    def _call(self, *commands):
+        conn = self._local.get(lambda: RESPConnection(self.host, self.port, self.db, self.password, self.timeout,
+                                                      self.ssl_context))
+        try:
+            return conn.pipeline(*commands)
+        except (OSError, RESPError):
+            # Reconnect on the next call rather than reuse a socket in an unknown state
+            conn.close()
+            self._local.drop()
+            raise
+
+    def incr(self, key, expiry, amount=1, **_):
+        key = self._key(key)
+        # SET NX starts the window with its TTL; PTTL -1 repairs a key that lost it
+        _, count, ttl = self._call(('SET', key, 0, 'PX', int(expiry * 1000), 'NX'),
+                                   ('INCRBY', key, amount), ('PTTL', key))
+        if ttl == -1:
+            self._call(('PEXPIRE', key, int(expiry * 1000)))
+        return count
+
+    def get(self, key):
+        value = self._call(('GET', self._key(key)))[0]
+        return int(value) if value is not None else 0
+
+    def get_expiry(self, key):
+        ttl = self._call(('PTTL', self._key(key)))[0]
+        return time.time() + max(ttl, 0) / 1000.0
+
+    def check(self):
+        try:
+            return self._call(('PING',))[0] == 'PONG'
+        except (OSError, RESPError):
+            return False
+
+    def reset(self):
+        keys = self._call(('KEYS', f'{self.key_prefix}:*'))[0]
+        if not keys:
+            return 0
+        return self._call(('DEL', *keys))[0]
+
+    def clear(self, key):
+        self._call(('DEL', self._key(key)))
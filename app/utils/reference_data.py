@@ -0,0 +1,143 @@
+"""
+Per-worker snapshots of the small reference tables.
+
+Categories, certifications, services, gallery categories and company info
+are a few dozen rows that change a few times a month, yet the navbar, the
+homepage, the listing filters and the gallery queried them on every request.
+Each worker instead holds every row of these tables as immutable records.
+A record has the row's columns and the model's ``get_*`` helpers
+(``category.get_name('ar')``), so templates use it like the model instance,
+but it has no session and never lazy-loads.
+
+A write to one of the tables in any worker, as signalled by the version
+counters in app/utils/cache_bus.py, reloads that table only; the other
+tables keep their records.
+"""
+
+from sqlalchemy import inspect, select
+
+from app.utils.cache_bus import cache_state, get_cached, register_cache, reset_cache
+
+REFERENCE_TABLES = ('category', 'certification', 'service', 'gallery_category', 'company_info')
+
+
+def _models():
+    from app.models import Category, Certification, CompanyInfo, GalleryCategory, Service
+
+    return {
+        'category': Category,
+        'certification': Certification,
+        'service': Service,
+        'gallery_category': GalleryCategory,
+        'company_info': CompanyInfo,
+    }
+
+
+class Record:
+    """Immutable copy of one row."""
+
+    __slots__ = ('__dict__',)
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is a read-only snapshot')
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.__dict__.get("key") or self.__dict__.get("id")}>'
+
+
+_record_classes = {}
+
+
+def _record_class(model):
+    """Record subclass carrying the ``get_*`` helpers of ``model``."""
+    cls = _record_classes.get(model)
+    if cls is None:
+        helpers = {name: value for name, value in vars(model).items()
+                   if name.startswith('get_') and callable(value) and not isinstance(value, staticmethod)}
+        cls = _record_classes[model] = type(f'{model.__name__}Record', (Record,), {'__slots__': (), **helpers})
+    return cls
+
+
+def _sort_key(record):
+    label = getattr(record, 'name_en', None) or getattr(record, 'title_en', None) or ''
+    return (record.sort_order or 0, label, record.id)
+
+
+class ReferenceData:
+    """One snapshot of every reference table, sorted by ``sort_order``."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.by_key = {name: {record.key: record for record in records if getattr(record, 'key', None)}
+                       for name, records in tables.items()}
+
+    def rows(self, table, active=True):
+        return [record for record in self.tables[table] if not active or record.is_active]
+
+    def categories(self, top_level=False, homepage=False, limit=None):
+        """Active categories, optionally only top-level or homepage ones."""
+        rows = [category for category in self.rows('category')
+                if (not top_level or category.parent_id is None)
+                and (not homepage or category.show_on_homepage)]
+        return rows[:limit] if limit is not None else rows
+
+    def category(self, key):
+        """Active category with ``key``, or None."""
+        category = self.by_key['category'].get(key)
+        return category if category is not None and category.is_active else None
+
+    def certifications(self):
+        return self.rows('certification')
+
+    def services(self):
+        return self.rows('service')
+
+    def gallery_category(self, key, active=False):
+        row = self.by_key['gallery_category'].get(key)
+        return row if row is not None and (row.is_active or not active) else None
+
+    def company_info(self, key):
+        """Active company info section ``key``, or None."""
+        row = self.by_key['company_info'].get(key)
+        return row if row is not None and row.is_active else None
+
+
+def load_reference_data(previous=None, tables=REFERENCE_TABLES):
+    """A snapshot with ``tables`` loaded from the database and the rest taken from ``previous``."""
+    from app import db
+
+    loaded = dict(previous.tables) if previous is not None else {}
+    for name, model in _models().items():
+        if name in loaded and name not in tables:
+            continue
+        cls = _record_class(model)
+        names = [column.key for column in model.__table__.columns]
+        rows = db.session.execute(select(*(model.__table__.c[column] for column in names))).all()
+        loaded[name] = tuple(sorted((cls(dict(zip(names, row))) for row in rows), key=_sort_key))
+    return ReferenceData(loaded)
+
+
+# -- Per-worker state ---------------------------------------------------------
+
+def get_reference_data():
+    """The current app's snapshot, with the tables whose writes have been signalled reloaded."""
+    return get_cached('reference', load_reference_data)
+
+
+def init_reference_data(app, db):
+    """Reload a table of ``app``'s snapshot whenever any worker writes to it."""
+    register_cache('reference', REFERENCE_TABLES)
+    reset_cache(app, 'reference')
+
+
+def preload_reference_data(app, db):
+    """Load ``app``'s snapshot now, so no request pays for it; call after ``init_cache_bus``."""
+    try:
+        with app.app_context():
+            if inspect(db.engine).has_table('category'):
+                cache_state('reference', app).value = load_reference_data()
+    except Exception as e:
+        app.logger.warning(f'Reference data not preloaded: {e}')
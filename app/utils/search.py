@@ -0,0 +1,283 @@
+"""
+Bilingual full-text search over products and news.
+
+One ``search_index`` document per product / news item holds its English and
+Arabic text in three weighted fields: ``title`` (names, titles), ``codes``
+(HS codes) and ``body`` (descriptions, HS code descriptions, content, tags).
+
+* SQLite: an FTS5 virtual table ranked with ``bm25()``
+* PostgreSQL: a table with a weighted ``tsvector`` column, a GIN index and
+  ``ts_rank_cd()``
+
+Both store text through ``normalize()`` and match queries normalized the same
+way, so spelling variants meet: harakat, Latin accents and tatweel are
+stripped, alef forms fold to ``ا``, ``ى`` to ``ي``, ``ة`` to ``ه``, Arabic-Indic
+digits to ASCII, and words with the article (``البرتقال``) are also indexed without
+it. Every query word is a prefix match, and ``0805.10`` matches ``080510``.
+
+Documents are rewritten in the same transaction as the ORM flush that
+changes a Product or News row. Bulk inserts that bypass the ORM (synthetic
+data, seeds) need ``rebuild_search_index()`` / ``flask rebuild-derived search``.
+"""
+
+import re
+import html
+import unicodedata
+
+from flask import current_app
+from sqlalchemy import Float, Integer, event, false, inspect, text
+
+KINDS = {'product': 1, 'news': 2}
+MAX_QUERY_TERMS = 8
+
+_DIACRITICS = re.compile('[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')  # accents, harakat, Quranic marks, tatweel
+_TAGS = re.compile(r'<[^>]+>')
+_CODE_SEPARATORS = re.compile(r'(?<=\d)[.\-\u066b](?=\d)')
+_WORDS = re.compile(r'[^\W_]+')
+_ARTICLES = ('وال', 'بال', 'فال', 'كال', 'لل', 'ال')
+_ARTICLE_INITIALS = {article[0] for article in _ARTICLES}
+_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي',
+    'ة': 'ه',
+    **{chr(0x0660 + d): str(d) for d in range(10)},
+    **{chr(0x06f0 + d): str(d) for d in range(10)},
+})
+
+
+def normalize(value):
+    """Lower-case, tag-free, diacritic-free text with Arabic letter variants folded."""
+    if not value:
+        return ''
+    value = html.unescape(_TAGS.sub(' ', str(value)))
+    # NFKD splits accents and hamza/madda marks off their letters so they go with the harakat
+    value = _DIACRITICS.sub('', unicodedata.normalize('NFKD', value.casefold())).translate(_FOLD)
+    return _CODE_SEPARATORS.sub('', value)
+
+
+def _strip_article(word):
+    if word[:1] not in _ARTICLE_INITIALS:
+        return word
+    for article in _ARTICLES:
+        if word.startswith(article) and len(word) - len(article) >= 2:
+            return word[len(article):]
+    return word
+
+
+def terms(value):
+    """Normalized words of ``value``, with Arabic articles removed."""
+    return [_strip_article(word) for word in _WORDS.findall(normalize(value))]
+
+
+def _field(*values):
+    """Normalized text of ``values`` plus the article-free form of each word that had one."""
+    words = _WORDS.findall(normalize(' '.join(v for v in values if v)))
+    extra = {stripped for word in words if (stripped := _strip_article(word)) != word}
+    return ' '.join(words + sorted(extra))
+
+
+def _doc_id(kind, entity_id):
+    return entity_id * 16 + KINDS[kind]
+
+
+# -- Documents ----------------------------------------------------------------
+
+def product_document(product):
+    from app.utils.hs_codes import get_hs_code, normalize_hs_code
+
+    code = normalize_hs_code(product.hs_code)
+    entry = get_hs_code(code)
+    return {
+        'title': _field(product.name_en, product.name_ar),
+        'codes': _field(code, code[:4]),
+        'body': _field(product.short_description_en, product.short_description_ar,
+                       product.description_en, product.description_ar,
+                       entry.en if entry else None, entry.ar if entry else None),
+    }
+
+
+def news_document(article):
+    return {
+        'title': _field(article.title_en, article.title_ar),
+        'codes': '',
+        'body': _field(article.excerpt_en, article.excerpt_ar, article.content_en, article.content_ar,
+                       (article.tags or '').replace(',', ' ')),
+    }
+
+
+def _documents():
+    from app.models import News, Product
+    return {Product: ('product', product_document), News: ('news', news_document)}
+
+
+# -- Backend SQL --------------------------------------------------------------
+
+def _dialect(bind):
+    return bind.dialect.name
+
+
+def _create_sql(dialect):
+    if dialect == 'postgresql':
+        return [
+            'CREATE TABLE IF NOT EXISTS search_index ('
+            ' doc_id BIGINT PRIMARY KEY, kind VARCHAR(20) NOT NULL, entity_id INTEGER NOT NULL,'
+            ' title TEXT, codes TEXT, body TEXT, document TSVECTOR)',
+            'CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)',
+        ]
+    return [
+        # rowid is the doc id, so updates and deletes are rowid lookups
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        " kind UNINDEXED, entity_id UNINDEXED, title, codes, body,"
+        " tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+
+
+def _insert_sql(dialect):
+    if dialect == 'postgresql':
+        return text(
+            "INSERT INTO search_index (doc_id, kind, entity_id, title, codes, body, document) "
+            "VALUES (:doc_id, :kind, :entity_id, :title, :codes, :body, "
+            " setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :codes), 'A') "
+            " || setweight(to_tsvector('simple', :body), 'B'))"
+        )
+    return text('INSERT INTO search_index (rowid, kind, entity_id, title, codes, body) '
+                'VALUES (:doc_id, :kind, :entity_id, :title, :codes, :body)')
+
+
+def _delete_sql(dialect):
+    key = 'doc_id' if dialect == 'postgresql' else 'rowid'
+    return text(f'DELETE FROM search_index WHERE {key} = :doc_id')
+
+
+def _match_expression(dialect, words):
+    if dialect == 'postgresql':
+        return ' & '.join(f'{word}:*' for word in words)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def ranked_matches(kind, query_text, bind=None):
+    """Subquery of ``(entity_id, rank)`` matching ``query_text``; lower rank is better. None if no terms."""
+    from app import db
+
+    words = terms(query_text)[:MAX_QUERY_TERMS]
+    if not words:
+        return None
+    dialect = _dialect(bind or db.engine)
+    if dialect == 'postgresql':
+        sql = ("SELECT entity_id, -ts_rank_cd(document, to_tsquery('simple', :match)) AS rank "
+               "FROM search_index WHERE kind = :kind AND document @@ to_tsquery('simple', :match)")
+    else:
+        # bm25 weights follow the column order: kind, entity_id, title, codes, body
+        sql = ('SELECT entity_id, bm25(search_index, 0, 0, 10.0, 5.0, 1.0) AS rank '
+               'FROM search_index WHERE search_index MATCH :match AND kind = :kind')
+    statement = text(sql).bindparams(match=_match_expression(dialect, words), kind=kind)
+    return statement.columns(entity_id=Integer, rank=Float).subquery(f'{kind}_matches')
+
+
+def matching_ids(kind, query_text):
+    """Select of the ids of ``kind`` rows matching ``query_text``, for ``Model.id.in_(...)``."""
+    from sqlalchemy import select
+
+    matches = ranked_matches(kind, query_text)
+    return select(matches.c.entity_id) if matches is not None else []
+
+
+def search(model, query_text):
+    """``model.query`` restricted to ``query_text`` matches, best first (add filters and a limit)."""
+    kind = _documents()[model][0]
+    matches = ranked_matches(kind, query_text)
+    if matches is None:
+        return model.query.filter(false())
+    return model.query.join(matches, matches.c.entity_id == model.id).order_by(matches.c.rank, model.id)
+
+
+def search_site(query_text, limit=10):
+    """``(products, news)`` visible on the public site that match ``query_text``, each best first."""
+    from datetime import datetime
+    from app.models import News, Product
+
+    products = search(Product, query_text).filter(Product.status == 'active').limit(limit).all()
+    news = (search(News, query_text)
+            .filter(News.status == 'published', News.publish_at <= datetime.utcnow())
+            .limit(limit).all())
+    return products, news
+
+
+# -- Sync ---------------------------------------------------------------------
+
+def _write(connection, kind, obj, delete_only=False):
+    dialect = _dialect(connection)
+    doc_id = _doc_id(kind, obj.id)
+    connection.execute(_delete_sql(dialect), {'doc_id': doc_id})
+    if not delete_only:
+        builder = _documents()[type(obj)][1]
+        connection.execute(_insert_sql(dialect), {'doc_id': doc_id, 'kind': kind, 'entity_id': obj.id,
+                                                  **builder(obj)})
+
+
+def _sync_search_index(session, flush_context):
+    """after_flush: rewrite the documents of the products and news this flush touched."""
+    try:
+        if not current_app.extensions.get('search_index'):
+            return
+    except RuntimeError:
+        # Outside an app context (bare scripts): nothing to sync against
+        return
+    documents = _documents()
+    changed = [(obj, False) for obj in list(session.new) + list(session.dirty) if type(obj) in documents]
+    changed += [(obj, True) for obj in session.deleted if type(obj) in documents]
+    if not changed:
+        return
+    connection = session.connection()
+    for obj, deleted in changed:
+        if obj.id is not None:
+            _write(connection, documents[type(obj)][0], obj, delete_only=deleted)
+
+
+def rebuild_search_index(db):
+    """Rewrite every document from the product and news tables; return the document count."""
+    dialect = _dialect(db.engine)
+    count = 0
+    db.session.execute(text('DELETE FROM search_index'))
+    insert = _insert_sql(dialect)
+    for model, (kind, builder) in _documents().items():
+        batch = []
+        for obj in model.query.yield_per(500):
+            batch.append({'doc_id': _doc_id(kind, obj.id), 'kind': kind, 'entity_id': obj.id, **builder(obj)})
+            if len(batch) >= 500:
+                db.session.execute(insert, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(insert, batch)
+            count += len(batch)
+    if dialect == 'sqlite':
+        db.session.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+    db.session.commit()
+    return count
+
+
+def ensure_search_index(db, rebuild=False):
+    """Create ``search_index`` if missing (filling it when new, or when ``rebuild``); return True if usable."""
+    inspector = inspect(db.engine)
+    if not (inspector.has_table('product') and inspector.has_table('news')):
+        return False
+    created = not inspector.has_table('search_index')
+    with db.engine.begin() as conn:
+        for statement in _create_sql(_dialect(db.engine)):
+            conn.exec_driver_sql(statement)
+    if created or rebuild:
+        rebuild_search_index(db)
+    return True
+
+
+def init_search(app, db):
+    """Create the search index if needed and keep it in sync with ORM writes."""
+    if not event.contains(db.session, 'after_flush', _sync_search_index):
+        event.listen(db.session, 'after_flush', _sync_search_index)
+    try:
+        with app.app_context():
+            app.extensions['search_index'] = ensure_search_index(db)
+    except Exception as e:
+        app.extensions['search_index'] = False
+        app.logger.warning(f'Search index unavailable: {e}')
@@ -0,0 +1,101 @@
+"""
+``Server-Timing`` breakdown of where a request spends its time.
+
+Metrics (milliseconds, visible in the browser devtools Timing tab):
+
+  db     SQL time from the per-request query counter (app/utils/query_counter.py);
+         overlaps ctx and tpl, which issue queries of their own
+  ctx    context processors wrapped with ``timed('ctx')``, i.e. ``inject_config``
+  tpl    Jinja rendering, measured with the before_render_template/template_rendered
+         signals (context processors run before the signal, so ctx is not included)
+  total  whole handler, from before_request to after_request
+
+Query counts and DB time are shown to the same users as ``X-Query-Count``
+(signed-in back-office users, or in debug); public responses carry ctx, tpl
+and total only. The full header, db included, is stored in the WSGI environ
+under ``ENVIRON_KEY`` for every request, and the Gunicorn access log writes
+it from there (see gunicorn.conf.py).
+"""
+
+import time
+from functools import wraps
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+
+_START_KEY = '_server_timing_start'
+_TIMINGS_KEY = '_server_timings'
+_TEMPLATE_STACK_KEY = '_server_timing_templates'
+
+ENVIRON_KEY = 'emdad.server_timing'
+
+
+def add_timing(name, seconds):
+    """Accumulate ``seconds`` under metric ``name`` for the current request."""
+    if not has_request_context():
+        return
+    timings = g.get(_TIMINGS_KEY)
+    if timings is None:
+        timings = g.setdefault(_TIMINGS_KEY, {})
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+def timed(name):
+    """Decorator adding the wrapped function's wall time to metric ``name``."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                add_timing(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def _before_render(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault(_TEMPLATE_STACK_KEY, []).append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    stack = g.get(_TEMPLATE_STACK_KEY) if has_request_context() else None
+    if stack:
+        add_timing('tpl', time.perf_counter() - stack.pop())
+
+
+def server_timing_header(timings, total, query_stats=None):
+    parts = []
+    if query_stats is not None:
+        parts.append(f'db;dur={query_stats.total_time * 1000:.1f};desc="{query_stats.count} queries"')
+    for name in ('ctx', 'tpl'):
+        if name in timings:
+            parts.append(f'{name};dur={timings[name] * 1000:.1f}')
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def init_server_timing(app):
+    """Register the timing hooks and the ``Server-Timing`` response header."""
+    if not app.config.get('SERVER_TIMING_ENABLED', True):
+        return
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def _start_server_timing():
+        g.setdefault(_START_KEY, time.perf_counter())
+
+    @app.after_request
+    def _emit_server_timing(response):
+        started = g.get(_START_KEY)
+        if started is None:
+            return response
+        from app.utils.query_counter import current_query_stats, show_query_details
+        timings = g.get(_TIMINGS_KEY) or {}
+        total = time.perf_counter() - started
+        full = server_timing_header(timings, total, current_query_stats())
+        request.environ[ENVIRON_KEY] = full
+        response.headers['Server-Timing'] = full if show_query_details(app) else server_timing_header(timings, total)
+        return response
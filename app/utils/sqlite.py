@@ -0,0 +1,143 @@
+"""
+SQLite connection tuning for multi-worker production deployments.
+
+Every new DBAPI connection gets the pragmas from ``SQLITE_PRAGMAS`` (WAL,
+synchronous=NORMAL, page cache, mmap, in-memory temp store, busy timeout).
+Optionally (``SQLITE_SERIALIZE_WRITES``) ORM write transactions are funnelled
+through a cross-process file lock so concurrent Gunicorn workers queue up for
+the single SQLite writer slot instead of spinning in the busy handler.
+"""
+
+import os
+import time
+import threading
+
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+_LOCK_KEY = '_sqlite_write_lock'
+
+
+def is_sqlite_uri(uri):
+    return bool(uri) and uri.lower().startswith('sqlite')
+
+
+def sqlite_file_path(uri):
+    """Return the database file for a sqlite URI, or None for in-memory databases."""
+    if not is_sqlite_uri(uri) or ':memory:' in uri:
+        return None
+    path = uri.split(':///', 1)[-1].split('?', 1)[0]
+    return path or None
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Run ``PRAGMA key=value`` for each configured pragma on a raw connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for key, value in (pragmas or {}).items():
+            cursor.execute(f'PRAGMA {key}={value}')
+    finally:
+        cursor.close()
+
+
+class WriteLock:
+    """Cross-process, cross-thread exclusive lock backed by ``flock`` on a file.
+
+    Each acquisition opens its own file description, so threads in the same
+    worker contend with each other exactly like separate processes do.
+    """
+
+    def __init__(self, path, timeout=20.0, poll_interval=0.002):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.Lock()
+
+    def acquire(self):
+        """Return an opaque handle, or None if the lock could not be taken in time."""
+        deadline = time.monotonic() + self.timeout
+        if fcntl is None:
+            return self._thread_lock if self._thread_lock.acquire(timeout=self.timeout) else None
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    return None
+                time.sleep(self.poll_interval)
+
+    def release(self, handle):
+        if handle is None:
+            return
+        if fcntl is None:
+            handle.release()
+            return
+        try:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            os.close(handle)
+
+
+def install_write_serializer(session_target, write_lock, logger=None):
+    """Hold ``write_lock`` from the first write of a transaction until it ends.
+
+    Covers ORM flushes and bulk DML executed through the session. Reads never
+    take the lock, so WAL readers keep running concurrently with the writer.
+    """
+
+    def _acquire(session):
+        if _LOCK_KEY in session.info:
+            return
+        handle = write_lock.acquire()
+        if handle is None and logger is not None:
+            # SQLite's own busy handling still applies; just lose the fairness
+            logger.warning('SQLite write lock timed out; continuing without serialization')
+        session.info[_LOCK_KEY] = handle
+
+    @event.listens_for(session_target, 'before_flush')
+    def _before_flush(session, flush_context, instances):
+        _acquire(session)
+
+    @event.listens_for(session_target, 'do_orm_execute')
+    def _do_orm_execute(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            _acquire(orm_execute_state.session)
+
+    @event.listens_for(session_target, 'after_transaction_end')
+    def _after_transaction_end(session, transaction):
+        if transaction.parent is None and _LOCK_KEY in session.info:
+            write_lock.release(session.info.pop(_LOCK_KEY))
+
+
+def init_sqlite_tuning(app, db):
+    """Attach pragma and write-serialization hooks to the app's SQLite engine."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not is_sqlite_uri(uri):
+        return
+
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    db_file = sqlite_file_path(uri)
+    if db_file is None:
+        # WAL and mmap are meaningless for :memory: databases
+        pragmas.pop('journal_mode', None)
+        pragmas.pop('mmap_size', None)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    if db_file and app.config.get('SQLITE_SERIALIZE_WRITES'):
+        timeout = (pragmas.get('busy_timeout') or 20000) / 1000.0
+        write_lock = WriteLock(db_file + '.write.lock', timeout=timeout)
+        install_write_serializer(db.session, write_lock, logger=app.logger)
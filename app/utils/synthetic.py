@@ -0,0 +1,186 @@
+"""
+Deterministic synthetic rows for scale and load testing.
+
+Every generator draws from its own ``random.Random`` derived from the seed and
+the table name, so the rows of one table do not change when another table's
+count changes. Timestamps are spread backwards from ``end`` (pass a fixed date
+for byte-identical output across days). Rows are plain dicts keyed by column
+name, ready for ``session.execute(insert(table), rows)`` or sqlite3
+``executemany`` with named placeholders.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+
+MONTH_STATES = ['peak', 'available', 'off']
+RFQ_STATUSES = ['new', 'in_review', 'quoted', 'closed', 'cancelled']
+RFQ_STATUS_WEIGHTS = [30, 20, 25, 20, 5]
+RFQ_PRIORITIES = ['low', 'normal', 'high', 'urgent']
+AUDIT_ACTIONS = ['create', 'update', 'delete', 'login', 'logout']
+AUDIT_ENTITIES = ['products', 'category', 'news', 'gallery', 'rfq', 'user']
+GALLERY_CATEGORIES = ['farms', 'packing', 'storage', 'exports']
+COUNTRIES = ['Germany', 'Netherlands', 'Saudi Arabia', 'United Arab Emirates', 'United Kingdom', 'Russia',
+             'China', 'India', 'Italy', 'France', 'Kuwait', 'Malaysia', 'Canada', 'Ukraine', 'Oman']
+PRODUCE = [('Oranges', 'برتقال', '080510'), ('Mandarins', 'يوسفي', '080521'), ('Lemons', 'ليمون', '080550'),
+           ('Grapes', 'عنب', '080610'), ('Strawberries', 'فراولة', '081010'), ('Pomegranates', 'رمان', '081090'),
+           ('Potatoes', 'بطاطس', '070190'), ('Onions', 'بصل', '070310'), ('Garlic', 'ثوم', '070320'),
+           ('Sweet Potatoes', 'بطاطا', '071420'), ('Mangoes', 'مانجو', '080450'), ('Dates', 'تمر', '080410'),
+           ('Frozen Okra', 'بامية مجمدة', '071080'), ('Frozen Peas', 'بازلاء مجمدة', '071021'),
+           ('Dried Herbs', 'أعشاب مجففة', '121190'), ('Chili Peppers', 'فلفل حار', '070960')]
+VARIETIES = ['Valencia', 'Navel', 'Premium', 'Organic', 'Select', 'Classic', 'Golden', 'Royal', 'Early', 'Late']
+SENTENCES = [
+    'Harvested at optimal maturity and packed within hours.',
+    'Graded to export standards with full traceability.',
+    'Shipped in temperature-controlled reefer containers.',
+    'Certified under GlobalG.A.P. and BRCGS programmes.',
+    'Available in bulk cartons and retail-ready packs.',
+    'Sourced from partner farms in the Nile Delta and Upper Egypt.',
+    'Residue testing performed against EU MRL limits.',
+    'Flexible packaging and labelling for private brands.',
+]
+
+
+def batched(rows, size):
+    """Yield lists of up to ``size`` rows from any iterable."""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class SyntheticData:
+    """Row factories for Category, Product, ProductImage, News, Gallery, RFQ and AuditLog."""
+
+    def __init__(self, seed=42, prefix=None, end=None, days=365):
+        self.seed = seed
+        self.prefix = prefix or f'syn{seed}'
+        self.end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.days = days
+
+    def _rng(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def _timestamp(self, rng):
+        return self.end - timedelta(seconds=rng.randrange(0, self.days * 86400))
+
+    def _text(self, rng, sentences=3):
+        return ' '.join(rng.choice(SENTENCES) for _ in range(sentences))
+
+    def category_slugs(self, count):
+        return [f'{self.prefix}-category-{i}' for i in range(count)]
+
+    def categories(self, count):
+        rng = self._rng('category')
+        for i, slug in enumerate(self.category_slugs(count)):
+            en, ar, _ = PRODUCE[i % len(PRODUCE)]
+            created = self._timestamp(rng)
+            yield {
+                'key': slug, 'slug': slug,
+                'name_en': f'{en} Group {i}', 'name_ar': f'مجموعة {ar} {i}',
+                'description_en': self._text(rng), 'description_ar': None,
+                'parent_id': None, 'sort_order': i, 'is_active': True,
+                'show_on_homepage': i < 8, 'image_path': None,
+                'created_at': created, 'updated_at': created,
+            }
+
+    def _json_block(self, rng, keys):
+        return json.dumps({
+            'en': {k: rng.choice(SENTENCES) for k in rng.sample(keys, k=min(len(keys), rng.randrange(2, 5)))},
+            'ar': {k: 'متوفر حسب الطلب' for k in keys[:2]},
+        }, ensure_ascii=False)
+
+    def products(self, count, category_ids):
+        rng = self._rng('product')
+        for i in range(count):
+            en, ar, hs = rng.choice(PRODUCE)
+            variety = rng.choice(VARIETIES)
+            created = self._timestamp(rng)
+            yield {
+                'name_en': f'{variety} {en} {i}', 'name_ar': f'{ar} {i}',
+                'slug': f'{self.prefix}-product-{i}',
+                'category_id': rng.choice(category_ids),
+                'hs_code': hs,
+                'description_en': self._text(rng, 6), 'description_ar': self._text(rng, 2),
+                'short_description_en': self._text(rng, 1), 'short_description_ar': None,
+                'specifications': self._json_block(rng, ['Variety', 'Size', 'Brix Level', 'Color', 'Shelf Life', 'Harvest Season']),
+                'seasonality': json.dumps({'months_state': [rng.choice(MONTH_STATES) for _ in range(12)]}),
+                'packaging_options': self._json_block(rng, ['Bulk Packaging', 'Retail', 'Cold Chain', 'Labelling']),
+                'applications': self._json_block(rng, ['Fresh Market', 'Food Service', 'Processing', 'Beverages']),
+                'quality_targets': self._json_block(rng, ['Brix', 'Residues', 'Defects', 'Size Tolerance']),
+                'commercial_docs': self._json_block(rng, ['Payment', 'MOQ', 'Lead Time', 'Incoterms', 'Docs']),
+                'seo_title_en': f'{variety} {en} Exporter', 'seo_title_ar': None,
+                'seo_description_en': self._text(rng, 1), 'seo_description_ar': None,
+                'status': 'active' if rng.random() < 0.9 else rng.choice(['inactive', 'draft']),
+                'featured': rng.random() < 0.05, 'show_on_homepage': rng.random() < 0.02,
+                'sort_order': rng.randrange(0, 100), 'image_path': f'{self.prefix}-product-{i}.webp',
+                'created_at': created, 'updated_at': created + timedelta(days=rng.randrange(0, 30)),
+            }
+
+    def product_images(self, product_ids, per_product):
+        rng = self._rng('product_image')
+        for product_id in product_ids:
+            for n in range(per_product):
+                yield {
+                    'product_id': product_id, 'filename': f'{self.prefix}-product-{product_id}-{n}.webp',
+                    'alt_text_en': f'Product photo {n + 1}', 'alt_text_ar': None,
+                    'is_main': n == 0, 'sort_order': n, 'created_at': self._timestamp(rng),
+                }
+
+    def news(self, count):
+        rng = self._rng('news')
+        for i in range(count):
+            publish = self._timestamp(rng)
+            title = f'{rng.choice(VARIETIES)} {rng.choice(PRODUCE)[0]} season update {i}'
+            yield {
+                'title_en': title, 'title_ar': f'تحديث الموسم {i}', 'slug': f'{self.prefix}-news-{i}',
+                'excerpt_en': self._text(rng, 1), 'excerpt_ar': None,
+                'content_en': '<p>' + '</p><p>'.join(self._text(rng, 5) for _ in range(rng.randrange(3, 9))) + '</p>',
+                'content_ar': None, 'cover_image': None, 'tags': 'export,season,quality',
+                'seo_title_en': title[:70], 'seo_description_en': self._text(rng, 1)[:160],
+                'article_type': 'news', 'status': 'published' if rng.random() < 0.85 else 'draft',
+                'featured': rng.random() < 0.05, 'show_on_homepage': rng.random() < 0.05,
+                'publish_at': publish, 'estimated_reading_time': rng.randrange(2, 10),
+                'content_difficulty': 'beginner', 'created_at': publish, 'updated_at': publish,
+            }
+
+    def gallery(self, count):
+        rng = self._rng('gallery')
+        for i in range(count):
+            yield {
+                'title_en': f'{rng.choice(GALLERY_CATEGORIES).title()} photo {i}', 'title_ar': None,
+                'description_en': self._text(rng, 1), 'description_ar': None,
+                'image_path': f'{self.prefix}-gallery-{i}.webp', 'category': rng.choice(GALLERY_CATEGORIES),
+                'sort_order': i, 'is_active': rng.random() < 0.95, 'created_at': self._timestamp(rng),
+            }
+
+    def rfqs(self, count, category_keys, product_names):
+        rng = self._rng('rfq')
+        for i in range(count):
+            created = self._timestamp(rng)
+            yield {
+                'name': f'Buyer {i}', 'email': f'buyer{i}@example.com', 'phone': f'+1555{i:07d}',
+                'company': f'Importer {rng.randrange(0, max(1, count // 20))} Ltd', 'country': rng.choice(COUNTRIES),
+                'category_key': rng.choice(category_keys), 'product_name': rng.choice(product_names),
+                'quantity': f'{rng.randrange(1, 40)} x 40ft containers', 'packaging_preference': 'Export cartons',
+                'delivery_date': None, 'budget': None,
+                'message': self._text(rng, 2), 'attachment_path': None,
+                'status': rng.choices(RFQ_STATUSES, RFQ_STATUS_WEIGHTS)[0], 'priority': rng.choice(RFQ_PRIORITIES),
+                'assigned_user_id': None, 'internal_notes': None,
+                'created_at': created, 'updated_at': created + timedelta(hours=rng.randrange(0, 72)),
+            }
+
+    def audit_logs(self, count, user_ids):
+        rng = self._rng('audit_log')
+        for _ in range(count):
+            action = rng.choice(AUDIT_ACTIONS)
+            entity = rng.choice(AUDIT_ENTITIES)
+            yield {
+                'user_id': rng.choice(user_ids), 'action': action, 'entity_type': entity,
+                'entity_id': rng.randrange(1, 100000), 'details': json.dumps({'field': 'status'}) if action == 'update' else None,
+                'ip_address': f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+                'user_agent': 'Mozilla/5.0', 'created_at': self._timestamp(rng),
+            }
@@ -0,0 +1,128 @@
+"""
+Per-worker warmup and memory accounting for preloaded Gunicorn workers.
+
+gunicorn.conf.py loads the app once in the master (``preload_app``), freezes
+that heap with ``gc.freeze()`` so the collector never writes to the shared
+pages, and forks. Warmers run so the first real request does not pay for
+compiling templates or SQL, opening the DB connection or faulting in index
+pages:
+
+* ``before_fork=True`` warmers run once in the master just before the freeze,
+  so what they build (compiled templates) is shared by every worker
+* the others run in each worker after fork, since connections and the
+  SQLAlchemy session must not cross a fork
+
+Memory before and after is logged, split into shared and private pages,
+which shows how much of the preloaded heap stays shared copy-on-write.
+
+Register more warmers with ``@warmer('name')``; each takes the app and runs
+inside an app context.
+"""
+
+import os
+import time
+import resource
+
+WARMERS = {}
+
+
+def warmer(name, before_fork=False):
+    """Register ``fn(app)`` to run once in every worker after fork (or once in the master)."""
+    def decorator(fn):
+        WARMERS[name] = (fn, before_fork)
+        return fn
+    return decorator
+
+
+def memory_usage():
+    """``{'rss_kb', 'shared_kb', 'private_kb'}`` of this process (Linux), or peak RSS elsewhere."""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line and not line.startswith(' '))
+        kb = {key: int(value.split()[0]) for key, value in fields.items() if value.strip().endswith('kB')}
+        return {
+            'rss_kb': kb.get('Rss', 0),
+            'shared_kb': kb.get('Shared_Clean', 0) + kb.get('Shared_Dirty', 0),
+            'private_kb': kb.get('Private_Clean', 0) + kb.get('Private_Dirty', 0),
+        }
+    except OSError:
+        return {'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'shared_kb': None, 'private_kb': None}
+
+
+def _format_memory(usage):
+    text = f"RSS {usage['rss_kb'] / 1024:.1f}MB"
+    if usage['private_kb'] is not None:
+        text += f" (shared {usage['shared_kb'] / 1024:.1f}MB, private {usage['private_kb'] / 1024:.1f}MB)"
+    return text
+
+
+def run_warmup(app, before_fork=False, names=None, log=None):
+    """Run the warmers of one phase (or ``names``); log and return timings and memory before/after."""
+    from app import db
+
+    before = memory_usage()
+    timings = {}
+    with app.app_context():
+        for name, (fn, phase) in WARMERS.items():
+            if phase != before_fork or (names and name not in names):
+                continue
+            started = time.perf_counter()
+            try:
+                fn(app)
+            except Exception as e:
+                app.logger.warning(f'Warmup {name} failed: {e}')
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        db.session.remove()
+    after = memory_usage()
+
+    steps = ', '.join(f'{name} {ms}ms' for name, ms in timings.items())
+    who = 'Master' if before_fork else 'Worker'
+    (log or app.logger.info)(f'{who} {os.getpid()} warmed ({steps}); {_format_memory(before)} -> {_format_memory(after)}')
+    return {'timings_ms': timings, 'before': before, 'after': after}
+
+
+# -- Built-in warmers ---------------------------------------------------------
+
+def _run_hot_queries(prefixes, limit=None):
+    """Execute the registered hot queries under ``prefixes`` (compiles and caches their SQL)."""
+    from app import db
+    from app.utils.query_plans import HOT_QUERIES
+
+    for name, builder in HOT_QUERIES.items():
+        if name.startswith(prefixes):
+            query = builder()
+            result = db.session.execute(getattr(query, 'statement', query))
+            if limit is None:
+                result.fetchall()
+            else:
+                result.fetchmany(limit)
+
+
+@warmer('templates', before_fork=True)
+def _compile_templates(app):
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+
+@warmer('navigation')
+def _navigation(app):
+    _run_hot_queries(('inject_config.',))
+
+
+@warmer('catalog')
+def _catalog(app):
+    _run_hot_queries(('main.', 'api.'), limit=50)
+
+
+@warmer('facets', before_fork=True)
+def _facet_index(app):
+    # Loaded once in the master, like the suggestion index below
+    from app.utils.facets import get_facet_index
+    get_facet_index()
+
+
+@warmer('suggest', before_fork=True)
+def _suggest_index(app):
+    # Built once in the master so every worker shares the pages until the catalog changes
+    from app.utils.autocomplete import get_index
+    get_index()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for Emdad Global application
+Serves the same Flask app as wsgi.py under uvicorn:
+
+    uvicorn asgi:application --host 0.0.0.0 --port $PORT --workers 2
+"""
+
+import os
+import sys
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+# Threads per process that run Flask requests; the DB pool is sized from it (see config.py)
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS') or 16)
+os.environ.setdefault('GUNICORN_CONCURRENCY', str(ASGI_THREADS))
+
+try:
+    from app import create_app
+    from app.utils.asgi import ASGIAdapter
+    # Import specific models to ensure they're registered
+    import app.models  # noqa: F401
+
+    flask_env = os.environ.get('FLASK_ENV', 'production')
+    app = create_app(flask_env)
+    application = ASGIAdapter(app, threads=ASGI_THREADS,
+                              max_body_size=app.config.get('MAX_CONTENT_LENGTH'))
+
+    print(f"✅ Flask app created successfully in {flask_env} mode (ASGI, {ASGI_THREADS} threads)")
+
+except Exception as e:
+    print(f"❌ Failed to create Flask app: {e}")
+    import traceback
+    traceback.print_exc()
+    raise
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(application, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
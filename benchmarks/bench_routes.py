@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Route-level benchmark: time public, admin and API routes with the Flask test
+client against SQLite databases seeded at several dataset scales.
+
+Scale 1 is the production seed (init_db_render: 38 products, 3 news articles)
+plus RFQS_PER_SCALE RFQs and AUDIT_ROWS_PER_SCALE audit-log rows from the
+deterministic generator in app/utils/synthetic.py (``flask seed-synthetic``).
+Scale N clones the products (with their images) and news N times and generates
+N times as many RFQs and audit rows, then rebuilds the tables derived from
+products (``flask rebuild-derived``) so cards, facets, attributes and the
+search index cover the clones. Seeded databases are cached in
+benchmarks/.data; bump DATASET_VERSION when the way they are built changes.
+
+Each scale runs in its own process (config reads DATABASE_URL at import time).
+Results are written as JSON; with --baseline the medians are compared against a
+stored run and routes that got slower than --threshold are reported.
+
+Usage:
+    python benchmarks/bench_routes.py [--scales 1,10,100] [--iterations 20]
+        [--output benchmarks/results/routes.json]
+        [--baseline benchmarks/baselines/routes.json] [--save-baseline]
+        [--threshold 0.25] [--fail-on-regression] [--reseed]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.utils.synthetic import SyntheticData, batched  # noqa: E402
+
+BENCH_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+DATA_DIR = os.path.join(BENCH_DIR, '.data')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'routes.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines', 'routes.json')
+
+DATASET_VERSION = 3
+RFQS_PER_SCALE = 200
+AUDIT_ROWS_PER_SCALE = 500
+
+ADMIN_EMAIL = 'admin@emdadglobal.com'
+ADMIN_PASSWORD = 'admin123'
+
+# (name, url template, needs admin login); {placeholders} come from _fixtures()
+ROUTES = [
+    ('main.index', '/', False),
+    ('main.products', '/products', False),
+    ('main.products[cat]', '/products?cat={category_key}', False),
+    ('main.product_detail', '/product/{product_slug}', False),
+    ('main.calendar', '/calendar', False),
+    ('main.gallery', '/gallery', False),
+    ('main.news', '/news', False),
+    ('main.news_detail', '/news/{news_slug}', False),
+    ('admin.dashboard', '/admin/dashboard', True),
+    ('admin.reports_data[rfq_trend]', '/admin/reports/data?metric=rfq_trend', True),
+    ('admin.reports_data[rfq_status]', '/admin/reports/data?metric=rfq_status', True),
+    ('admin.reports_data[products_by_category]', '/admin/reports/data?metric=products_by_category', True),
+    ('api.api_categories', '/api/categories', False),
+    ('api.api_products', '/api/products', False),
+    ('api.api_products[category]', '/api/products?category={category_key}', False),
+]
+
+
+# -- Dataset preparation -------------------------------------------------------
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _clone_rows(conn, table, copy, overrides, where=''):
+    """INSERT ... SELECT a copy of every row, replacing some column expressions."""
+    cols = [c for c in _columns(conn, table) if c != 'id']
+    select = [overrides.get(c, c).format(copy=copy) for c in cols]
+    conn.execute(f'INSERT INTO "{table}" ({", ".join(cols)}) SELECT {", ".join(select)} FROM "{table}" {where}')
+
+
+def _insert_rows(conn, table, rows):
+    """executemany named-parameter INSERTs for the dict rows of app/utils/synthetic.py."""
+    for batch in batched(rows, 5000):
+        cols = list(batch[0])
+        values = [{k: (v.isoformat(' ') if isinstance(v, datetime) else v) for k, v in row.items()} for row in batch]
+        conn.executemany(f'INSERT INTO "{table}" ({", ".join(cols)}) VALUES ({", ".join(":" + c for c in cols)})',
+                         values)
+
+
+def _generate_rfqs_and_audit(conn, count, audit_count, seed):
+    data = SyntheticData(seed=seed, days=180)
+    products = [row[0] for row in conn.execute('SELECT name_en FROM product LIMIT 50')] or ['Fresh Oranges']
+    categories = [row[0] for row in conn.execute('SELECT "key" FROM category')] or ['citrus']
+    user_ids = [row[0] for row in conn.execute('SELECT id FROM user')]
+    _insert_rows(conn, 'rfq', data.rfqs(count, categories, products))
+    _insert_rows(conn, 'audit_log', data.audit_logs(audit_count, user_ids))
+
+
+def scale_database(db_path, scale, seed=42):
+    """Grow a freshly seeded database to ``scale`` times the base catalog."""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for copy in range(1, scale):
+                _clone_rows(conn, 'product', copy, {
+                    'slug': "slug || '-x{copy}'",
+                    'name_en': "name_en || ' #{copy}'",
+                    'show_on_homepage': '0',
+                }, where="WHERE slug NOT LIKE '%-x%'")
+                cols = [c for c in _columns(conn, 'product_image') if c not in ('id', 'product_id')]
+                conn.execute(
+                    f'INSERT INTO product_image (product_id, {", ".join(cols)}) '
+                    f'SELECT np.id, {", ".join("pi." + c for c in cols)} FROM product_image pi '
+                    f'JOIN product op ON op.id = pi.product_id '
+                    f"JOIN product np ON np.slug = op.slug || '-x{copy}'"
+                )
+                _clone_rows(conn, 'news', copy, {
+                    'slug': "slug || '-x{copy}'",
+                    'title_en': "title_en || ' #{copy}'",
+                    'featured': '0',
+                    'show_on_homepage': '0',
+                }, where="WHERE slug NOT LIKE '%-x%'")
+            _generate_rfqs_and_audit(conn, RFQS_PER_SCALE * scale, AUDIT_ROWS_PER_SCALE * scale, seed)
+    finally:
+        conn.close()
+    rebuild_derived_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+
+def rebuild_derived_tables(db_path):
+    """Refill the product-derived tables, which the raw INSERT ... SELECT clones bypass."""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', FLASK_ENV='production')
+    result = subprocess.run([sys.executable, '-m', 'flask', '--app', 'wsgi.py', 'rebuild-derived'],
+                            cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL)
+    if result.returncode != 0:
+        raise RuntimeError(f'Rebuilding the derived tables of {db_path} failed')
+
+
+def _row_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0]
+                for t in ('product', 'product_image', 'product_card', 'news', 'rfq', 'audit_log')}
+    finally:
+        conn.close()
+
+
+def prepare_dataset(scale, reseed=False):
+    """Return the path of a database seeded at ``scale``, building it if needed."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    base_path = os.path.join(DATA_DIR, 'base.db')
+    path = os.path.join(DATA_DIR, f'routes-v{DATASET_VERSION}-x{scale}.db')
+    if os.path.exists(path) and not reseed:
+        return path
+
+    if reseed or not os.path.exists(base_path):
+        for p in (base_path, base_path + '-wal', base_path + '-shm'):
+            if os.path.exists(p):
+                os.remove(p)
+        print(f"🌱 Seeding base database ({base_path})...")
+        result = subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'scripts', 'db_snapshot.py'), 'seed', base_path],
+                                cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+        if result.returncode != 0:
+            raise RuntimeError('Seeding the base benchmark database failed')
+        conn = sqlite3.connect(base_path)
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.close()
+
+    print(f"📈 Building {scale}x dataset...")
+    shutil.copyfile(base_path, path)
+    scale_database(path, scale)
+    return path
+
+
+# -- Measurement (runs in a child process per dataset) -------------------------
+
+def _fixtures(app):
+    from app.models import Category, News, Product
+    with app.app_context():
+        product = Product.query.filter_by(status='active').order_by(Product.id).first()
+        news = News.query.filter_by(status='published').order_by(News.id).first()
+        category = Category.query.filter_by(is_active=True).order_by(Category.sort_order).first()
+        return {
+            'product_slug': product.slug if product else 'missing',
+            'news_slug': news.slug if news else 'missing',
+            'category_key': category.key if category else 'citrus',
+        }
+
+
+def _percentile(sorted_values, pct):
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure_routes(db_path, iterations, warmup):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    import logging
+    from app import create_app
+
+    from app.utils.query_counter import current_query_stats
+
+    app = create_app('production')
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.logger.setLevel(logging.ERROR)
+    fixtures = _fixtures(app)
+
+    # Server-Timing only carries db to signed-in users; read the counter directly instead
+    last_stats = {}
+
+    @app.after_request
+    def _record_query_stats(response):
+        stats = current_query_stats()
+        if stats is not None:
+            last_stats.update(db_ms=round(stats.total_time * 1000, 1), queries=stats.count)
+        return response
+
+    public = app.test_client()
+    admin = app.test_client()
+    admin.post('/admin/login', data={'email': ADMIN_EMAIL, 'password': ADMIN_PASSWORD})
+
+    results = {}
+    for name, template, needs_admin in ROUTES:
+        client = admin if needs_admin else public
+        url = template.format(**fixtures)
+        for _ in range(warmup):
+            client.get(url)
+        timings = []
+        status = db_ms = queries = None
+        for _ in range(iterations):
+            last_stats.clear()
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            status = response.status_code
+            db_ms, queries = last_stats.get('db_ms'), last_stats.get('queries')
+        timings.sort()
+        results[name] = {
+            'url': url,
+            'status': status,
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(_percentile(timings, 95), 3),
+            'min_ms': round(timings[0], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'db_ms': db_ms,
+            'queries': queries,
+        }
+    return results
+
+
+# -- Reporting -----------------------------------------------------------------
+
+def compare(current, baseline, threshold):
+    """Return rows of (scale, route, baseline_ms, current_ms, change) for regressions."""
+    regressions = []
+    for scale, data in current['scales'].items():
+        base_routes = baseline.get('scales', {}).get(scale, {}).get('routes', {})
+        for name, result in data['routes'].items():
+            before = base_routes.get(name)
+            if not before:
+                continue
+            change = (result['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0.0
+            # Ignore sub-millisecond noise on very fast routes
+            if change > threshold and result['median_ms'] - before['median_ms'] > 1.0:
+                regressions.append((scale, name, before['median_ms'], result['median_ms'], change))
+    return regressions
+
+
+def print_report(current, baseline=None):
+    for scale, data in current['scales'].items():
+        base_routes = (baseline or {}).get('scales', {}).get(scale, {}).get('routes', {})
+        print(f"\n📊 Scale {scale}x  {data['rows']}")
+        print(f"{'route':<44}{'status':>7}{'median':>10}{'p95':>10}{'queries':>9}{'baseline':>10}{'change':>9}")
+        for name, r in data['routes'].items():
+            before = base_routes.get(name)
+            base_col = f"{before['median_ms']:.1f}" if before else '-'
+            change_col = f"{(r['median_ms'] / before['median_ms'] - 1) * 100:+.0f}%" if before and before['median_ms'] else '-'
+            print(f"{name:<44}{r['status']:>7}{r['median_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                  f"{(r['queries'] if r['queries'] is not None else '-'):>9}{base_col:>10}{change_col:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='1,10,100')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='also write the results to --baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed median slowdown (0.25 = 25%%)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--reseed', action='store_true', help='rebuild the cached datasets')
+    parser.add_argument('--measure', metavar='DB_PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        # Child process: print the measurements for one database as JSON
+        print(json.dumps(measure_routes(args.measure, args.iterations, args.warmup)))
+        return 0
+
+    current = {
+        'generated_at': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'iterations': args.iterations,
+        'scales': {},
+    }
+    for scale in [int(s) for s in args.scales.split(',') if s.strip()]:
+        db_path = prepare_dataset(scale, reseed=args.reseed)
+        print(f"⏱️ Measuring {scale}x...")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--measure', db_path,
+             '--iterations', str(args.iterations), '--warmup', str(args.warmup)],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(proc.stderr)
+            print(f"❌ Measuring scale {scale}x failed")
+            return 1
+        current['scales'][str(scale)] = {
+            'rows': _row_counts(db_path),
+            'routes': json.loads(proc.stdout.strip().splitlines()[-1]),
+        }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_report(current, baseline)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        shutil.copyfile(args.output, args.baseline)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("ℹ️ No baseline found; run with --save-baseline to store one")
+        return 0
+
+    regressions = compare(current, baseline, args.threshold)
+    if not regressions:
+        print(f"✅ No route slowed down by more than {args.threshold:.0%}")
+        return 0
+    print(f"⚠️ {len(regressions)} route(s) slowed down by more than {args.threshold:.0%}:")
+    for scale, name, before, after, change in regressions:
+        print(f"   {scale}x {name}: {before:.1f}ms -> {after:.1f}ms ({change:+.0%})")
+    return 1 if args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write throughput benchmark for the production SQLite setup.
+
+Simulates several Gunicorn workers (one process each) hitting the same SQLite
+file with a mix of catalog reads and RFQ/audit-log style inserts, and compares:
+
+  baseline    rollback journal, only the connect timeout (the old defaults)
+  tuned       SQLITE_PRAGMAS from config.py (WAL, synchronous=NORMAL, ...)
+  serialized  tuned + SQLITE_SERIALIZE_WRITES single-writer lock
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py [--workers 4] [--seconds 5] [--write-ratio 0.2]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.sqlite import apply_pragmas, WriteLock  # noqa: E402
+
+TUNED_PRAGMAS = {
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16384,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+MODES = {
+    'baseline': {'pragmas': {}, 'serialize': False},
+    'tuned': {'pragmas': TUNED_PRAGMAS, 'serialize': False},
+    'serialized': {'pragmas': TUNED_PRAGMAS, 'serialize': True},
+}
+
+
+def _prepare(db_path, products=500):
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE product (id INTEGER PRIMARY KEY, name_en TEXT, status TEXT, sort_order INTEGER, description_en TEXT);
+        CREATE INDEX ix_product_status_sort ON product (status, sort_order, name_en);
+        CREATE TABLE rfq (id INTEGER PRIMARY KEY, name TEXT, email TEXT, message TEXT, created_at TEXT);
+        CREATE TABLE audit_log (id INTEGER PRIMARY KEY, action TEXT, details TEXT, created_at TEXT);
+    ''')
+    conn.executemany(
+        'INSERT INTO product (name_en, status, sort_order, description_en) VALUES (?, ?, ?, ?)',
+        [(f'Product {i}', 'active', i % 50, 'x' * 400) for i in range(products)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _worker(db_path, mode, seconds, write_ratio, seed, results):
+    cfg = MODES[mode]
+    conn = sqlite3.connect(db_path, timeout=20)
+    apply_pragmas(conn, cfg['pragmas'])
+    lock = WriteLock(db_path + '.write.lock') if cfg['serialize'] else None
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                handle = lock.acquire() if lock else None
+                try:
+                    conn.execute('INSERT INTO rfq (name, email, message, created_at) VALUES (?, ?, ?, datetime("now"))',
+                                 ('Buyer', 'buyer@example.com', 'Need a quote'))
+                    conn.execute('INSERT INTO audit_log (action, details, created_at) VALUES (?, ?, datetime("now"))',
+                                 ('create', '{}'))
+                    conn.commit()
+                finally:
+                    if lock:
+                        lock.release(handle)
+                writes += 1
+            else:
+                conn.execute('SELECT id, name_en FROM product WHERE status = ? ORDER BY sort_order, name_en LIMIT 16 OFFSET ?',
+                             ('active', rng.randrange(0, 400))).fetchall()
+                conn.execute('SELECT COUNT(*) FROM rfq').fetchone()
+                reads += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            conn.rollback()
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    latencies.sort()
+    results.put({
+        'reads': reads, 'writes': writes, 'errors': errors,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    })
+
+
+def run_mode(mode, workers, seconds, write_ratio):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _prepare(db_path)
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_worker, args=(db_path, mode, seconds, write_ratio, i, results))
+                 for i in range(workers)]
+        for p in procs:
+            p.start()
+        rows = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+    return {
+        'mode': mode,
+        'reads_per_s': round(sum(r['reads'] for r in rows) / seconds, 1),
+        'writes_per_s': round(sum(r['writes'] for r in rows) / seconds, 1),
+        'errors': sum(r['errors'] for r in rows),
+        'worst_p99_ms': round(max(r['p99_ms'] for r in rows), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = parser.parse_args()
+
+    rows = [run_mode(m, args.workers, args.seconds, args.write_ratio) for m in args.modes.split(',')]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'mode':<12}{'reads/s':>12}{'writes/s':>12}{'errors':>9}{'p99 ms':>10}")
+    for r in rows:
+        print(f"{r['mode']:<12}{r['reads_per_s']:>12}{r['writes_per_s']:>12}{r['errors']:>9}{r['worst_p99_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
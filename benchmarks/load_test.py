@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test against a local Gunicorn.
+
+For each server configuration (profile x workers [x threads]) this boots
+``gunicorn -c gunicorn.conf.py wsgi:app`` on a private copy of a benchmark
+database, drives it with concurrent virtual users for a fixed duration and
+reports throughput and p50/p95/p99 latency per action.
+
+Virtual users follow a weighted mix of scenarios:
+
+  browse          home, product listing (all / one category), news, gallery, calendar
+  product_detail  a random product page
+  language        switch to Arabic (or back) and load the home page
+  rfq             fetch the contact form, submit an RFQ with a file attachment
+  admin_reports   (logged-in users) dashboard, reports page and the chart data APIs
+
+Everything runs locally; the database comes from the route benchmark cache
+(benchmarks/bench_routes.py datasets, built on first use).
+
+Configurations are ``profile:workers`` or ``gthread:workersxthreads`` and are
+passed to gunicorn.conf.py through GUNICORN_PROFILE / GUNICORN_WORKERS /
+GUNICORN_THREADS, so the benchmark exercises the same settings as production.
+``asgi:workersxthreads`` runs ``uvicorn asgi:application`` with ASGI_THREADS
+instead.
+
+``--smtp-delay-ms`` starts a local SMTP sink that answers every command after
+the given delay, so each RFQ pays a realistic mail round trip (the app sends
+two messages per RFQ). ``--mix io`` shifts the scenario weights towards RFQ
+submissions to compare worker profiles on I/O-bound traffic:
+
+    python benchmarks/load_test.py --configs sync:2,gthread:2x4 --mix io --smtp-delay-ms 200
+
+Usage:
+    python benchmarks/load_test.py [--configs sync:1,sync:2,gthread:2x4] [--threads 4]
+        [--users 16] [--client-processes 4] [--duration 20] [--scale 10]
+        [--mix default|io] [--smtp-delay-ms 0]
+        [--output benchmarks/results/load.json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import signal
+import argparse
+import platform
+import tempfile
+import subprocess
+import threading
+import http.client
+import socketserver
+import multiprocessing
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+ADMIN_EMAIL = 'admin@emdadglobal.com'
+ADMIN_PASSWORD = 'admin123'
+
+SCENARIO_MIXES = {
+    'default': {'browse': 50, 'product_detail': 25, 'language': 8, 'rfq': 7, 'admin_reports': 10},
+    # I/O-bound: every third action is an RFQ upload followed by two SMTP sends
+    'io': {'browse': 35, 'product_detail': 20, 'language': 5, 'rfq': 35, 'admin_reports': 5},
+}
+BROWSE_PATHS = ['/', '/products', '/products?cat={category}', '/news', '/gallery', '/calendar']
+REPORT_METRICS = ['rfq_trend', 'rfq_status', 'products_by_category']
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+ATTACHMENT = b'%PDF-1.4\n' + b'0' * 48 * 1024 + b'\n%%EOF\n'
+
+
+class VirtualUser:
+    """One keep-alive HTTP connection with its own cookie jar."""
+
+    def __init__(self, port, rng):
+        self.port = port
+        self.rng = rng
+        self.cookies = {}
+        self.conn = None
+        self.logged_in = False
+        self.samples = []  # (action, seconds, ok)
+
+    def _connect(self):
+        self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+
+    def request(self, action, method, path, body=None, headers=None, record=True):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        started = time.perf_counter()
+        try:
+            if self.conn is None:
+                self._connect()
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            for header, value in response.getheaders():
+                if header.lower() == 'set-cookie':
+                    name, _, rest = value.partition('=')
+                    self.cookies[name.strip()] = rest.split(';', 1)[0]
+            ok = response.status < 400
+            if response.getheader('Connection', '').lower() == 'close':
+                self.conn.close()
+                self.conn = None
+        except (OSError, http.client.HTTPException):
+            data, ok = b'', False
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+        if record:
+            self.samples.append((action, time.perf_counter() - started, ok))
+        return data
+
+    def csrf_token(self, action, path):
+        match = CSRF_RE.search(self.request(action, 'GET', path).decode('utf-8', 'replace'))
+        return match.group(1) if match else ''
+
+    def login(self):
+        token = self.csrf_token('admin_login', '/admin/login')
+        body = f'csrf_token={token}&email={ADMIN_EMAIL}&password={ADMIN_PASSWORD}'
+        self.request('admin_login', 'POST', '/admin/login', body.encode(),
+                     {'Content-Type': 'application/x-www-form-urlencoded'})
+        self.logged_in = True
+
+
+def _multipart(fields, file_field, filename, payload):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                 f'Content-Type: application/pdf\r\n\r\n'.encode() + payload + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def run_scenario(user, name, fixtures):
+    rng = user.rng
+    if name == 'browse':
+        path = rng.choice(BROWSE_PATHS).format(category=rng.choice(fixtures['categories']))
+        user.request(f'GET {path.split("?")[0]}{"?cat" if "?" in path else ""}', 'GET', path)
+    elif name == 'product_detail':
+        user.request('GET /product/<slug>', 'GET', f"/product/{rng.choice(fixtures['products'])}")
+    elif name == 'language':
+        language = 'ar' if rng.random() < 0.5 else 'en'
+        user.request('GET /set-language/<lang>', 'GET', f'/set-language/{language}')
+        user.request('GET /', 'GET', '/')
+    elif name == 'rfq':
+        token = user.csrf_token('GET /contact', '/contact')
+        body, content_type = _multipart({
+            'csrf_token': token, 'name': 'Load Test Buyer', 'email': 'buyer@emdad-loadtest.com',
+            'country': 'Germany', 'category_key': rng.choice(fixtures['categories']),
+            'quantity': '2 containers', 'message': 'Please quote CIF Hamburg for the coming season.',
+        }, 'attachment', 'specs.pdf', ATTACHMENT)
+        user.request('POST /contact (rfq+attachment)', 'POST', '/contact', body, {'Content-Type': content_type})
+    elif name == 'admin_reports':
+        if not user.logged_in:
+            user.login()
+        path = rng.choice(['/admin/dashboard', '/admin/reports'] +
+                          [f'/admin/reports/data?metric={m}' for m in REPORT_METRICS])
+        label = 'GET /admin/reports/data' if 'data' in path else f'GET {path}'
+        user.request(label, 'GET', path)
+
+
+def _client_process(port, users, duration, seed, fixtures, mix, results):
+    deadline = time.monotonic() + duration
+    scenario_names = list(SCENARIO_MIXES[mix])
+    weights = [SCENARIO_MIXES[mix][n] for n in scenario_names]
+    virtual_users = [VirtualUser(port, random.Random(seed * 1000 + i)) for i in range(users)]
+
+    def drive(user):
+        while time.monotonic() < deadline:
+            run_scenario(user, user.rng.choices(scenario_names, weights)[0], fixtures)
+
+    threads = [threading.Thread(target=drive, args=(u,)) for u in virtual_users]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put([sample for u in virtual_users for sample in u.samples])
+
+
+def _fixtures(port):
+    user = VirtualUser(port, random.Random(0))
+    products = json.loads(user.request('setup', 'GET', '/api/products', record=False) or b'[]')
+    categories = json.loads(user.request('setup', 'GET', '/api/categories', record=False) or b'[]')
+    return {
+        'products': [p['slug'] for p in products][:500] or ['fresh-oranges'],
+        'categories': [c['key'] for c in categories] or ['citrus'],
+    }
+
+
+def _wait_ready(port, proc, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/categories')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.25)
+    return False
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    by_action = {}
+    for action, seconds, ok in samples:
+        by_action.setdefault(action, []).append((seconds, ok))
+    routes = {}
+    for action, rows in sorted(by_action.items()):
+        latencies = sorted(s * 1000 for s, _ in rows)
+        routes[action] = {
+            'requests': len(rows),
+            'errors': sum(1 for _, ok in rows if not ok),
+            'rps': round(len(rows) / duration, 1),
+            'p50_ms': round(_percentile(latencies, 50), 1),
+            'p95_ms': round(_percentile(latencies, 95), 1),
+            'p99_ms': round(_percentile(latencies, 99), 1),
+        }
+    latencies = sorted(s * 1000 for _, s, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'rps': round(len(samples) / duration, 1),
+        'p50_ms': round(_percentile(latencies, 50), 1),
+        'p95_ms': round(_percentile(latencies, 95), 1),
+        'p99_ms': round(_percentile(latencies, 99), 1),
+        'routes': routes,
+    }
+
+
+class _SlowSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue that accepts and discards mail, replying after ``server.delay`` seconds."""
+
+    def _reply(self, line):
+        time.sleep(self.server.delay)
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self._reply('220 load-test SMTP sink')
+        in_data = False
+        for raw in self.rfile:
+            line = raw.rstrip(b'\r\n')
+            if in_data:
+                if line == b'.':
+                    in_data = False
+                    self._reply('250 OK queued')
+                continue
+            command = line[:4].upper()
+            if command == b'DATA':
+                in_data = True
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('250 OK')
+
+
+class SlowSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, delay_ms):
+        super().__init__(('127.0.0.1', 0), _SlowSMTPHandler)
+        # Spread over the greeting, EHLO, MAIL, RCPT, DATA, end-of-data and QUIT replies
+        self.delay = delay_ms / 1000.0 / 7
+        self.port = self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True).start()
+        return self
+
+
+def parse_spec(spec, default_threads):
+    """``sync:2`` / ``gthread:2x4`` / ``gevent:1`` / ``asgi:2x16`` -> (profile, workers, threads)."""
+    profile, _, size = spec.strip().partition(':')
+    workers, _, threads = (size or '1').partition('x')
+    threads = int(threads or default_threads) if profile in ('gthread', 'asgi') else 1
+    return profile, int(workers), threads
+
+
+def run_config(profile, workers, threads, args, db_source, port, smtp_port=None):
+    """Boot Gunicorn (or uvicorn) with one configuration, drive it and return the summary."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'load.db')
+        shutil.copyfile(db_source, db_path)
+        env = dict(os.environ)
+        env.update({
+            'DATABASE_URL': f'sqlite:///{db_path}',
+            'FLASK_ENV': 'production',
+            'PROMETHEUS_MULTIPROC_DIR': os.path.join(tmp, 'metrics'),
+            # Absolute, so RFQ attachments land in the temp dir instead of instance/uploads
+            'UPLOAD_FOLDER': os.path.join(tmp, 'uploads'),
+            # Every virtual user shares 127.0.0.1, so per-IP limits would turn the RFQ mix into 429s
+            'RATELIMIT_ENABLED': 'false',
+            'PORT': str(port),
+            'GUNICORN_PROFILE': profile,
+            'GUNICORN_WORKERS': str(workers),
+            'GUNICORN_THREADS': str(threads),
+        })
+        if smtp_port:
+            env.update({'MAIL_SERVER': '127.0.0.1', 'MAIL_PORT': str(smtp_port), 'MAIL_USE_TLS': 'false'})
+        if profile == 'asgi':
+            os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+            env['ASGI_THREADS'] = str(threads)
+            cmd = [sys.executable, '-m', 'uvicorn', 'asgi:application', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(workers), '--no-access-log']
+        else:
+            cmd = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT_DIR, 'gunicorn.conf.py'),
+                   '--bind', f'127.0.0.1:{port}', '--access-logfile', os.devnull, 'wsgi:app']
+        log_path = os.path.join(tmp, 'gunicorn.log')
+        with open(log_path, 'w') as log:
+            proc = subprocess.Popen(cmd, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                    start_new_session=True)
+        try:
+            if not _wait_ready(port, proc):
+                with open(log_path) as log:
+                    print(log.read()[-2000:])
+                raise RuntimeError(f'Server ({profile} x{workers}) did not start')
+
+            fixtures = _fixtures(port)
+            # Warm every worker (template compilation, first connections)
+            warm = VirtualUser(port, random.Random(1))
+            for _ in range(workers * 4):
+                warm.request('warmup', 'GET', '/', record=False)
+
+            results = multiprocessing.Queue()
+            users_per_process = max(1, args.users // args.client_processes)
+            procs = [multiprocessing.Process(target=_client_process,
+                                             args=(port, users_per_process, args.duration, i + 1, fixtures, args.mix, results))
+                     for i in range(args.client_processes)]
+            for p in procs:
+                p.start()
+            samples = [sample for _ in procs for sample in results.get()]
+            for p in procs:
+                p.join()
+        finally:
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+    summary = summarize(samples, args.duration)
+    summary.update({'worker_class': profile, 'workers': workers, 'threads': threads})
+    return summary
+
+
+def print_summary(summary):
+    threads = f"x{summary['threads']} threads" if summary['threads'] > 1 else ''
+    print(f"\n🚦 {summary['worker_class']} x{summary['workers']} workers {threads}: "
+          f"{summary['rps']} req/s, {summary['errors']} errors, "
+          f"p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  p99 {summary['p99_ms']}ms")
+    print(f"{'action':<36}{'reqs':>8}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for action, r in summary['routes'].items():
+        print(f"{action:<36}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', default='sync:1,sync:2,gthread:2x4',
+                        help='comma-separated profile:workers[xthreads] specs')
+    parser.add_argument('--threads', type=int, default=4, help='default threads per worker for gthread specs')
+    parser.add_argument('--mix', choices=sorted(SCENARIO_MIXES), default='default', help='scenario weights')
+    parser.add_argument('--smtp-delay-ms', type=int, default=0,
+                        help='route mail to a local SMTP sink that takes this long per message (0: no sink)')
+    parser.add_argument('--users', type=int, default=16, help='concurrent virtual users')
+    parser.add_argument('--client-processes', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per configuration')
+    parser.add_argument('--scale', type=int, default=10, help='dataset scale (see bench_routes.py)')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--output', default=os.path.join(ROOT_DIR, 'benchmarks', 'results', 'load.json'))
+    args = parser.parse_args()
+
+    from benchmarks.bench_routes import prepare_dataset
+    db_source = prepare_dataset(args.scale)
+
+    smtp = SlowSMTPServer(args.smtp_delay_ms).start() if args.smtp_delay_ms else None
+    if smtp:
+        print(f"📮 SMTP sink on port {smtp.port}, {args.smtp_delay_ms}ms per message")
+
+    runs = []
+    for spec in args.configs.split(','):
+        profile, workers, threads = parse_spec(spec, args.threads)
+        print(f"⏳ {profile} x{workers}{f'x{threads}' if threads > 1 else ''}: "
+              f"running {args.users} users for {args.duration:.0f}s...")
+        summary = run_config(profile, workers, threads, args, db_source, args.port, smtp.port if smtp else None)
+        print_summary(summary)
+        runs.append(summary)
+    if smtp:
+        smtp.shutdown()
+
+    report = {
+        'generated_at': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'users': args.users,
+        'duration': args.duration,
+        'scale': args.scale,
+        'mix': args.mix,
+        'smtp_delay_ms': args.smtp_delay_ms,
+        'runs': runs,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'config':<24}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for r in runs:
+        label = f"{r['worker_class']} x{r['workers']}" + (f"x{r['threads']}t" if r['threads'] > 1 else '')
+        print(f"{label:<24}{r['rps']:>10}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}")
+    print(f"\n💾 Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -62,6 +62,25 @@ else
     exit 1
 fi
 
+# Guard against hot queries regressing to full table scans
+echo "🔍 Checking hot query plans..."
+if python3.11 scripts/check_query_plans.py || python3 scripts/check_query_plans.py; then
+    echo "✅ Hot query plans use indexes"
+else
+    echo "❌ Hot query plan check failed - a composite index is missing!"
+    exit 1
+fi
+
+# Build a seeded, VACUUMed and ANALYZEd database snapshot for instant cold starts
+echo "📦 Building database snapshot..."
+if python3.11 scripts/db_snapshot.py build; then
+    echo "✅ Database snapshot built with python3.11"
+elif python3 scripts/db_snapshot.py build; then
+    echo "✅ Database snapshot built with python3"
+else
+    echo "⚠️ Database snapshot build failed - instances will seed on startup instead"
+fi
+
 # Final verification
 echo "🔍 Final verification of production setup..."
 if python3.11 scripts/verify_production_ready.py; then
@@ -1,9 +1,27 @@
 import os
+import warnings
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+RATELIMIT_SQLITE_URI = 'sqlite:////tmp/emdad_ratelimit.db'
+# REDIS_URL schemes the built-in RESP client speaks (app/utils/ratelimit.py)
+REDIS_TO_RESP = {'redis://': 'resp://', 'rediss://': 'resps://'}
+
+
+def redis_ratelimit_uri(redis_url):
+    """Rate-limit storage URI for ``REDIS_URL``: the RESP client, else the local SQLite file."""
+    if not redis_url:
+        return RATELIMIT_SQLITE_URI
+    for prefix, replacement in REDIS_TO_RESP.items():
+        if redis_url.startswith(prefix):
+            return replacement + redis_url[len(prefix):]
+    # limits would pick its own Redis storage, which needs the (uninstalled) redis package
+    warnings.warn(f'REDIS_URL scheme not supported for rate limits ({redis_url.split(":", 1)[0]}); '
+                  f'using {RATELIMIT_SQLITE_URI}')
+    return RATELIMIT_SQLITE_URI
+
 class Config:
     """Base configuration class."""
     
@@ -18,20 +36,42 @@ class Config:
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool per worker process: one connection per concurrently running request
+    # (gunicorn.conf.py exports GUNICORN_CONCURRENCY = threads, or greenlets under gevent).
+    # Server-wide the app can open workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    GUNICORN_CONCURRENCY = int(os.environ.get('GUNICORN_CONCURRENCY') or 1)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or max(5, min(GUNICORN_CONCURRENCY, 20)))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+
     # Engine options based on database type
     if 'sqlite' in DATABASE_URL.lower():
         SQLALCHEMY_ENGINE_OPTIONS = {
             'pool_pre_ping': True,
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
             'connect_args': {
                 'check_same_thread': False,
                 'timeout': 20
             }
         }
+        # Applied to every new SQLite connection (see app/utils/sqlite.py)
+        SQLITE_PRAGMAS = {
+            'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 20000),
+            'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL',
+            'synchronous': os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL',
+            'cache_size': -int(os.environ.get('SQLITE_CACHE_KB') or 16384),  # negative = KiB
+            'mmap_size': int(os.environ.get('SQLITE_MMAP_BYTES') or 128 * 1024 * 1024),
+            'temp_store': 'MEMORY',
+        }
+        # Queue ORM writes from all workers through one cross-process lock
+        SQLITE_SERIALIZE_WRITES = os.environ.get('SQLITE_SERIALIZE_WRITES', 'false').lower() in ['true', 'on', '1']
     else:
         # PostgreSQL/MySQL options
         SQLALCHEMY_ENGINE_OPTIONS = {
             'pool_pre_ping': True,
             'pool_recycle': 300,
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
             'connect_args': {
                 'connect_timeout': 10,
             }
@@ -78,9 +118,51 @@ class Config:
     POSTS_PER_PAGE = 12
     PRODUCTS_PER_PAGE = 16
     
-    # Rate Limiting
-    RATELIMIT_STORAGE_URL = "memory://"
-    RATELIMIT_STORAGE_URI = "memory://"
+    # Query instrumentation (see app/utils/query_counter.py)
+    QUERY_COUNTER_ENABLED = os.environ.get('QUERY_COUNTER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    QUERY_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_N_PLUS_ONE_THRESHOLD') or 5)
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE') or 'warn'  # 'warn' or 'raise'
+    QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT') or 30)
+    # Raise on lazy relationship loads and deferred columns the list queries do not load (app/utils/loading.py)
+    STRICT_LOADING = os.environ.get('STRICT_LOADING', 'false').lower() in ['true', 'on', '1']
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() in ['true', 'on', '1']
+    # Per-endpoint budgets; keep close to the measured count so regressions surface
+    QUERY_BUDGETS = {
+        'main.index': 30,
+        'main.products': 25,
+        'main.product_detail': 12,
+        'main.calendar': 30,
+        'main.gallery': 8,
+        'main.news': 6,
+        'main.news_detail': 8,
+        'main.services': 4,
+        'main.certifications': 4,
+        'main.contact': 6,
+        'api.api_products': 10,
+        'api.api_categories': 2,
+    }
+
+    # Prometheus metrics (see app/utils/metrics.py); set METRICS_TOKEN to require a bearer token
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # When set, /metrics answers 404 unless METRICS_TOKEN is configured
+    METRICS_REQUIRE_TOKEN = False
+
+    # Sampling profiler (see app/utils/profiler.py); output goes to instance/profiles
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    PROFILER_INTERVAL_MS = int(os.environ.get('PROFILER_INTERVAL_MS') or 5)
+    PROFILER_TOKEN_MAX_AGE = int(os.environ.get('PROFILER_TOKEN_MAX_AGE') or 3600)
+    PROFILER_MAX_WINDOW = 120
+    PROFILER_MAX_FILES = 50
+
+    # Rate Limiting (shared storages in app/utils/ratelimit.py)
+    # memory:// counts per worker process; use sqlite:///path (one host) or resp://host:port (all nodes)
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI') or "memory://"
+    RATELIMIT_CONTACT = os.environ.get('RATELIMIT_CONTACT') or '5 per minute;30 per hour'
+    RATELIMIT_LOGIN = os.environ.get('RATELIMIT_LOGIN') or '10 per minute;50 per hour'
+    # Hops of reverse proxies whose X-Forwarded-For to trust (rate limits key on the client IP)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR') or 0)
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -92,14 +174,25 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     
-    # Use Redis for rate limiting in production
-    RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL') or "memory://"
+    # Shared rate-limit counters: REDIS_URL if set (via the built-in RESP client), else a local SQLite file
+    RATELIMIT_STORAGE_URI = (os.environ.get('RATELIMIT_STORAGE_URI')
+                             or redis_ratelimit_uri(os.environ.get('REDIS_URL')))
+    # A storage outage must not take the contact and login pages down with it
+    RATELIMIT_SWALLOW_ERRORS = True
+    # Per-endpoint traffic and latency are not public: /metrics needs METRICS_TOKEN
+    METRICS_REQUIRE_TOKEN = True
+    # Render terminates TLS at one proxy in front of the app
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR') or 1)
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # :memory: uses a single static connection; pool sizing options do not apply
+    SQLALCHEMY_ENGINE_OPTIONS = {}
     WTF_CSRF_ENABLED = False
+    QUERY_BUDGET_MODE = 'raise'
+    STRICT_LOADING = True
 
 # Configuration dictionary
 config = {
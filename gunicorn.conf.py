@@ -1,17 +1,43 @@
+import gc
 import os
+import glob
 import multiprocessing
 
+# Prometheus multiprocess mode: workers write samples here and /metrics merges them.
+# Must be set before the app (and prometheus_client) is imported; on_starting removes
+# stale files from a previous run so counters start from zero.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/emdad_metrics')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
 backlog = 2048
 
 # Worker processes
-workers = min(multiprocessing.cpu_count() * 2 + 1, 4)  # Max 4 workers for free tier
-worker_class = "sync"
+# Concurrency profiles (GUNICORN_PROFILE):
+#   sync     one request at a time per worker process (default)
+#   gthread  GUNICORN_THREADS threads per worker; a slow SMTP send or upload only blocks its thread
+#   gevent   cooperative greenlets, GUNICORN_WORKER_CONNECTIONS per worker (requires `pip install gevent`)
+profile = os.environ.get('GUNICORN_PROFILE', 'sync').lower()
+if profile not in ('sync', 'gthread', 'gevent'):
+    raise RuntimeError(f"GUNICORN_PROFILE must be sync, gthread or gevent, not {profile!r}")
+workers = int(os.environ.get('GUNICORN_WORKERS') or min(multiprocessing.cpu_count() * 2 + 1, 4))  # Max 4 workers for free tier
 worker_connections = 1000
+threads = 1
+if profile == 'gthread':
+    worker_class = "gthread"
+    threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+elif profile == 'gevent':
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 100)
+else:
+    worker_class = "sync"
 timeout = 120
 keepalive = 2
 
+# Requests one worker may run at once; config.py sizes the per-worker DB pool from it
+os.environ['GUNICORN_CONCURRENCY'] = str(worker_connections if worker_class == "gevent" else threads)
+
 # Restart workers after this many requests, to help prevent memory leaks
 max_requests = 1000
 max_requests_jitter = 100
@@ -20,7 +46,9 @@ max_requests_jitter = 100
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
-access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+# Trailing field is the app's full Server-Timing (db/ctx/tpl/total ms, see app/utils/server_timing.py),
+# taken from the environ: public responses leave db out of the header itself
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s "%({emdad.server_timing}e)s"'
 
 # Process naming
 proc_name = "emdad_global"
@@ -29,7 +57,8 @@ proc_name = "emdad_global"
 wsgi_module = "wsgi:app"
 
 # Server mechanics
-preload_app = True
+# gevent must monkey-patch before the app (and its locks/sockets) is imported, so no preload
+preload_app = worker_class != "gevent"
 daemon = False
 pidfile = None
 user = None
@@ -39,3 +68,77 @@ tmp_upload_dir = None
 # SSL (if needed in future)
 keyfile = None
 certfile = None
+
+# Fork handling for the preloaded app (see app/utils/warmup.py)
+gc_freeze = os.environ.get('GUNICORN_GC_FREEZE', 'true').lower() in ['true', 'on', '1']
+warmup = os.environ.get('GUNICORN_WARMUP', 'true').lower() in ['true', 'on', '1']
+
+
+def _flask_app(server_or_worker):
+    """The loaded Flask app (wsgi:app), or None if this process has not loaded it."""
+    wsgi_app = getattr(server_or_worker.app, 'callable', None)
+    return wsgi_app if hasattr(wsgi_app, 'app_context') else None
+
+
+def on_starting(server):
+    """Master, before forking: clear the previous run's metric files.
+
+    With preload_app the app is already imported here and the master may own
+    files of its own (``*_<pid>.db``); those are kept.
+    """
+    own = f'_{os.getpid()}.db'
+    for stale in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+        if not stale.endswith(own):
+            os.remove(stale)
+
+
+def when_ready(server):
+    """Master, after preload and before the first fork: shared warmup, drop connections, freeze the heap."""
+    flask_app = _flask_app(server)
+    if flask_app is None:
+        return
+    from app import db
+    if warmup:
+        from app.utils.warmup import run_warmup
+        run_warmup(flask_app, before_fork=True, log=server.log.info)
+    with flask_app.app_context():
+        # create_app inspected the schema and seeded gallery categories on these connections
+        db.engine.dispose()
+    if gc_freeze:
+        # Move every preloaded object to the permanent generation: the collector no longer
+        # touches (and so no longer copies) their pages in the workers
+        gc.collect()
+        gc.freeze()
+        server.log.info(f"gc.freeze(): {gc.get_freeze_count()} objects shared with workers")
+
+
+def post_fork(server, worker):
+    """Worker: start with an empty connection pool, then warm caches before serving."""
+    flask_app = _flask_app(worker)
+    if flask_app is None:
+        return
+    from app import db
+    with flask_app.app_context():
+        # close=False: leave any parent-owned sockets alone, just forget them in this process
+        db.engine.dispose(close=False)
+    if warmup:
+        from app.utils.warmup import run_warmup
+        run_warmup(flask_app, log=worker.log.info)
+
+
+def post_worker_init(worker):
+    """Without preload (gevent) the app only exists once the worker has loaded it."""
+    if not worker.cfg.preload_app and warmup:
+        flask_app = _flask_app(worker)
+        if flask_app is not None:
+            from app.utils.warmup import run_warmup
+            run_warmup(flask_app, log=worker.log.info)
+
+
+def child_exit(server, worker):
+    """Drop the exited worker's live gauges from the metrics directory."""
+    try:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+    except ImportError:
+        pass
@@ -1311,8 +1311,11 @@ def seed_official_products(db):
         print(f"⚠️ Error copying sample images: {e}")
         # Continue anyway - not critical
 
-def init_database():
-    """Initialize database for production with complete sample data"""
+def init_database(db_path=None):
+    """Initialize database for production with complete sample data.
+    If db_path is given (e.g. when building the deploy snapshot) it is used as-is
+    instead of probing the default locations.
+    """
     try:
         import os
         import sys
@@ -1321,25 +1324,25 @@ def init_database():
         os.makedirs('/tmp', exist_ok=True)
 
         # Test write permissions and set appropriate database URL
-        db_paths = [
+        db_paths = [db_path] if db_path else [
             '/tmp/emdad_global.db',
             './emdad_global.db',
             'emdad_global.db'
         ]
 
         database_url = None
-        for db_path in db_paths:
+        for candidate in db_paths:
             try:
                 # Test if we can create a file in this location
-                test_path = db_path.replace('.db', '_test.db')
+                test_path = candidate.replace('.db', '_test.db')
                 with open(test_path, 'w') as f:
                     f.write('test')
                 os.remove(test_path)
-                database_url = f'sqlite:///{db_path}'
-                print(f"✅ Using database path: {db_path}")
+                database_url = f'sqlite:///{candidate}'
+                print(f"✅ Using database path: {candidate}")
                 break
             except Exception as e:
-                print(f"⚠️ Cannot write to {db_path}: {e}")
+                print(f"⚠️ Cannot write to {candidate}: {e}")
                 continue
 
         if database_url:
@@ -1363,6 +1366,13 @@ def init_database():
             db.create_all()
             print("✅ Database tables created successfully!")
 
+            # Add composite indexes missing from pre-existing tables (idempotent)
+            try:
+                from migrations.add_hot_query_indexes import ensure_hot_query_indexes
+                ensure_hot_query_indexes(db)
+            except Exception as e:
+                print(f"⚠️ Could not ensure hot query indexes: {e}")
+
             # Create all sample data
             try:
                 print("Creating sample data...")
@@ -1534,6 +1544,14 @@ def init_database():
                 traceback.print_exc()
                 # Continue anyway - basic tables are created
 
+            # Some seeds above write without the ORM: rebuild every product-derived table
+            # (search index, facets, attributes, cards) through the same path as `flask rebuild-derived`
+            try:
+                from app.cli import rebuild_derived
+                rebuild_derived()
+            except Exception as e:
+                print(f"⚠️ Could not rebuild the derived tables: {e}")
+
             print("✅ Database initialization completed!")
             return True
 
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration script to add composite indexes for the hot query shapes.
+The indexes are declared in app/models.py (__table_args__); new databases get them
+from db.create_all(). This script creates any that are missing on existing databases
+and is automatically executed during production deployment.
+"""
+
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HOT_QUERY_TABLES = ['user', 'category', 'product', 'product_image', 'news', 'gallery', 'rfq', 'audit_log',
+                    'product_facet', 'product_attribute', 'product_card']
+
+
+def ensure_hot_query_indexes(db):
+    """Create every model-declared index on the hot tables if it does not exist yet."""
+    from sqlalchemy import inspect
+    import app.models  # noqa: F401  (register all tables on db.metadata)
+
+    engine = db.engine
+    inspector = inspect(engine)
+    created = 0
+
+    print("🔄 Ensuring hot query indexes...")
+    for table_name in HOT_QUERY_TABLES:
+        table = db.metadata.tables.get(table_name)
+        if table is None or not inspector.has_table(table_name):
+            print(f"⚠️ Table not found: {table_name}")
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table_name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in existing:
+                continue
+            index.create(bind=engine)
+            created += 1
+            print(f"✅ Created index {index.name} on {table_name}")
+
+    if created:
+        print(f"\n✅ Created {created} indexes")
+    else:
+        print("✅ All hot query indexes already present")
+    return True
+
+
+if __name__ == "__main__":
+    from app import create_app, db
+    app = create_app()
+    with app.app_context():
+        success = ensure_hot_query_indexes(db)
+    sys.exit(0 if success else 1)
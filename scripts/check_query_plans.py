@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Fail when a hot query falls back to a full table scan.
+
+Creates the schema (including the composite indexes declared in app/models.py)
+in a throwaway SQLite database, runs EXPLAIN QUERY PLAN on every query registered
+in app/utils/query_plans.py and exits non-zero if any of them scans a table.
+
+Usage:
+    python scripts/check_query_plans.py [--verbose] [--database-url sqlite:////path/to.db]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='check an existing SQLite database instead of a fresh schema')
+    parser.add_argument('--verbose', action='store_true', help='print the full plan for every query')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir.name, 'plans.db')}"
+
+    from app import create_app, db
+    from app.utils.query_plans import check_hot_query_plans
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("ℹ️ Query plan check only runs against SQLite; skipped")
+            return 0
+        if tmp_dir is not None:
+            db.create_all()
+            # The search index is created by create_app() only once its source tables exist
+            from app.utils.search import ensure_search_index
+            ensure_search_index(db)
+
+        print("🔍 CHECKING HOT QUERY PLANS...")
+        print("=" * 50)
+        report = check_hot_query_plans()
+        failed = 0
+        for name, result in report.items():
+            if result['full_scans']:
+                failed += 1
+                print(f"❌ {name}: {'; '.join(result['full_scans'])}")
+            else:
+                print(f"✅ {name}")
+            if args.verbose or result['full_scans']:
+                for line in result['plan']:
+                    marker = '⚠️ ' if 'TEMP B-TREE' in line else '   '
+                    print(f"   {marker}{line}")
+        db.session.remove()
+
+    print("=" * 50)
+    if failed:
+        print(f"❌ {failed} of {len(report)} hot queries do full table scans")
+        return 1
+    print(f"✅ All {len(report)} hot queries use indexes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Check that a rate-limit storage holds a limit across processes and threads.
+
+For each storage URI, several processes with several threads each hammer one
+rate-limit key through limits' fixed-window strategy (what Flask-Limiter uses).
+Exactly ``--limit`` hits must be allowed in total; ``memory://`` is included
+as the counter-example, allowing up to ``--limit`` per process. The per-hit
+latency shows what a limit costs a request.
+
+By default this checks ``memory://``, a temporary ``sqlite://`` file and a
+``resp://`` stand-in (scripts/resp_standin.py) started in-process.
+
+Usage:
+    python scripts/check_rate_limits.py [--storage resp://127.0.0.1:6379 ...]
+        [--processes 4] [--threads 4] [--hits 200] [--limit 50]
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _hammer(uri, limit, threads, hits, results):
+    from limits import parse
+    from limits.storage import storage_from_string
+    from limits.strategies import FixedWindowRateLimiter
+    import app.utils.ratelimit  # noqa: F401  (registers sqlite:// and resp://)
+
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    item = parse(f'{limit} per minute')
+    allowed = []
+    latencies = []
+
+    def run():
+        count = 0
+        for _ in range(hits):
+            started = time.perf_counter()
+            if limiter.hit(item, 'check', 'shared-key'):
+                count += 1
+            latencies.append(time.perf_counter() - started)
+        allowed.append(count)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    results.put((sum(allowed), latencies))
+
+
+def _start_standin():
+    from scripts.resp_standin import serve
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(serve('127.0.0.1', port, ready)), daemon=True).start()
+    ready.wait(5)
+    return f'resp://127.0.0.1:{port}'
+
+
+def check(uri, args):
+    from limits.storage import storage_from_string
+    import app.utils.ratelimit  # noqa: F401
+
+    storage = storage_from_string(uri)
+    storage.reset()
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_hammer, args=(uri, args.limit, args.threads, args.hits, results))
+             for _ in range(args.processes)]
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    outcomes = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    allowed = sum(count for count, _ in outcomes)
+    latencies = sorted(l for _, lats in outcomes for l in lats)
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    ok = allowed == args.limit
+    status = '✅' if ok else '❌'
+    print(f"{status} {uri:<48} allowed {allowed:>5} of {len(latencies)} (limit {args.limit}); "
+          f"hit p50 {p50:.0f}us p99 {p99:.0f}us; {len(latencies) / elapsed:,.0f} hits/s")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--storage', action='append', help='storage URI to check (repeatable)')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--hits', type=int, default=200, help='hits per thread')
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    uris = args.storage
+    if not uris:
+        tmp_dir = tempfile.TemporaryDirectory()
+        uris = ['memory://', f"sqlite:///{os.path.join(tmp_dir.name, 'ratelimit.db')}", _start_standin()]
+
+    failures = 0
+    for uri in uris:
+        ok = check(uri, args)
+        # memory:// is expected to fail: it is only here as the per-process baseline
+        if not ok and not uri.startswith('memory://'):
+            failures += 1
+    if failures:
+        print(f"\n❌ {failures} shared storage(s) let more than {args.limit} hits through")
+        return 1
+    print("\n🎉 Shared storages hold the limit across processes and threads")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Build and restore a prebuilt SQLite database snapshot.
+
+`build` runs at deploy time: it seeds a fresh database through init_db_render,
+compacts it with VACUUM/ANALYZE and writes an image manifest next to it.
+`restore` runs at container start: when no live database exists it copies the
+snapshot into place atomically so Gunicorn can serve immediately instead of
+re-seeding the whole catalog on every cold start.
+
+Usage:
+    python scripts/db_snapshot.py build
+    python scripts/db_snapshot.py restore
+
+Exit codes for `restore`: 0 = snapshot restored, 1 = nothing restored
+(live DB already present, no snapshot, or non-SQLite database).
+"""
+
+import os
+import sys
+import json
+import shutil
+import subprocess
+import sqlite3
+import hashlib
+from datetime import datetime
+
+# Add the parent directory to the path so we can import the app
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+SNAPSHOT_DIR = os.environ.get('DB_SNAPSHOT_DIR') or os.path.join(ROOT_DIR, 'instance', 'db_snapshot')
+SNAPSHOT_NAME = 'emdad_global.db'
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_DATABASE_URL = 'sqlite:////tmp/emdad_global.db'
+
+# (table, column, upload subdirectory) for every image referenced by the catalog
+IMAGE_COLUMNS = [
+    ('product', 'image_path', 'products'),
+    ('product_image', 'filename', 'products'),
+    ('category', 'image_path', 'categories'),
+    ('news', 'cover_image', 'news'),
+    ('gallery', 'image_path', 'gallery'),
+]
+
+
+def sqlite_path_from_url(url):
+    """Return the filesystem path of a sqlite:/// URL, or None for other databases."""
+    if not url or not url.startswith('sqlite:///'):
+        return None
+    path = url[len('sqlite:///'):]
+    if not path or path == ':memory:':
+        return None
+    return path
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compact(db_path):
+    """Fold any WAL back into the main file, then VACUUM and ANALYZE."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.execute('ANALYZE')
+        conn.execute('VACUUM')
+        ok = conn.execute('PRAGMA integrity_check').fetchone()[0]
+    finally:
+        conn.close()
+    return ok == 'ok'
+
+
+def _build_manifest(db_path):
+    """List every image the snapshot references and whether it exists on disk."""
+    upload_root = os.path.join(ROOT_DIR, 'instance', 'uploads')
+    images = {}
+    missing = []
+    conn = sqlite3.connect(db_path)
+    try:
+        for table, column, subdir in IMAGE_COLUMNS:
+            try:
+                rows = conn.execute(f'SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL').fetchall()
+            except sqlite3.OperationalError:
+                continue
+            for (filename,) in rows:
+                rel = f'{subdir}/{filename}'
+                if rel in images or rel in missing:
+                    continue
+                full = os.path.join(upload_root, subdir, filename)
+                if os.path.isfile(full):
+                    images[rel] = os.path.getsize(full)
+                else:
+                    missing.append(rel)
+    finally:
+        conn.close()
+
+    return {
+        'generated_at': datetime.utcnow().isoformat() + 'Z',
+        'database': {
+            'file': SNAPSHOT_NAME,
+            'bytes': os.path.getsize(db_path),
+            'sha256': _sha256(db_path),
+        },
+        'images': [{'path': rel, 'bytes': size} for rel, size in sorted(images.items())],
+        'missing_images': sorted(missing),
+    }
+
+
+def build_snapshot():
+    """Seed a fresh database and publish it as the build artifact."""
+    print("📦 BUILDING DATABASE SNAPSHOT...")
+    print("=" * 50)
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    work_path = os.path.join(SNAPSHOT_DIR, f'.build-{os.getpid()}.db')
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(work_path + suffix):
+            os.remove(work_path + suffix)
+
+    # Seed in a child process so every pooled (WAL-mode) connection is closed
+    # before we switch the journal mode and VACUUM
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), 'seed', work_path], cwd=ROOT_DIR)
+    if result.returncode != 0:
+        print("❌ Seeding the snapshot database failed")
+        return False
+
+    print("🧹 Running VACUUM and ANALYZE...")
+    if not _compact(work_path):
+        print("❌ Snapshot failed integrity check")
+        return False
+
+    manifest = _build_manifest(work_path)
+    target = os.path.join(SNAPSHOT_DIR, SNAPSHOT_NAME)
+    os.replace(work_path, target)
+    with open(os.path.join(SNAPSHOT_DIR, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✅ Snapshot written: {target} ({manifest['database']['bytes']} bytes)")
+    print(f"✅ Image manifest: {len(manifest['images'])} images")
+    if manifest['missing_images']:
+        print(f"⚠️ {len(manifest['missing_images'])} referenced images are missing:")
+        for rel in manifest['missing_images'][:10]:
+            print(f"   - {rel}")
+    return True
+
+
+def restore_snapshot():
+    """Copy the snapshot into place if the live database does not exist yet."""
+    db_path = sqlite_path_from_url(os.environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL)
+    if not db_path:
+        print("ℹ️ DATABASE_URL is not a SQLite file; snapshot restore skipped")
+        return False
+
+    if os.path.isfile(db_path) and os.path.getsize(db_path) > 0:
+        print(f"✅ Live database already present at {db_path}")
+        return False
+
+    snapshot = os.path.join(SNAPSHOT_DIR, SNAPSHOT_NAME)
+    if not os.path.isfile(snapshot):
+        print(f"⚠️ No database snapshot found at {snapshot}")
+        return False
+
+    # Copy next to the target, then rename: readers never see a half-written file
+    target_dir = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(target_dir, exist_ok=True)
+    tmp_path = os.path.join(target_dir, f'.{os.path.basename(db_path)}.restore-{os.getpid()}')
+    shutil.copyfile(snapshot, tmp_path)
+    os.replace(tmp_path, db_path)
+    print(f"✅ Restored database snapshot to {db_path}")
+
+    manifest_path = os.path.join(SNAPSHOT_DIR, MANIFEST_NAME)
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        upload_root = os.path.join(ROOT_DIR, 'instance', 'uploads')
+        absent = [img['path'] for img in manifest.get('images', [])
+                  if not os.path.isfile(os.path.join(upload_root, img['path']))]
+        if absent:
+            print(f"⚠️ {len(absent)} manifest images are missing from instance/uploads")
+        else:
+            print(f"✅ All {len(manifest.get('images', []))} manifest images present")
+    return True
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    if command == 'build':
+        sys.exit(0 if build_snapshot() else 1)
+    elif command == 'restore':
+        sys.exit(0 if restore_snapshot() else 1)
+    elif command == 'seed' and len(sys.argv) > 2:
+        # Internal: used by `build` to seed the work database in a separate process
+        from init_db_render import init_database
+        sys.exit(0 if init_database(db_path=sys.argv[2]) else 1)
+    else:
+        print(f"Unknown command: {command} (expected 'build' or 'restore')")
+        sys.exit(2)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Local Redis-protocol stand-in for testing the ``resp://`` rate-limit storage.
+
+A single-threaded asyncio server speaking RESP2 with an in-memory keyspace and
+per-key expiry. It implements only what app/utils/ratelimit.py and simple
+manual poking need: PING, AUTH, SELECT, GET, SET [EX|PX] [NX|XX], INCR,
+INCRBY, EXPIRE, PEXPIRE, TTL, PTTL, DEL, KEYS, DBSIZE, FLUSHDB, FLUSHALL, QUIT.
+Commands run one at a time on the event loop, so INCRBY is atomic like Redis.
+
+Usage:
+    python scripts/resp_standin.py [--host 127.0.0.1] [--port 6390]
+    RATELIMIT_STORAGE_URI=resp://127.0.0.1:6390 gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import fnmatch
+
+
+class Keyspace:
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def ttl_ms(self, key):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else max(0, int((deadline - time.monotonic()) * 1000))
+
+    def execute(self, name, args):
+        handler = getattr(self, f'cmd_{name.lower()}', None)
+        if handler is None:
+            return RESPErrorReply(f"ERR unknown command '{name}'")
+        try:
+            return handler(*args)
+        except (TypeError, ValueError):
+            return RESPErrorReply(f"ERR wrong number or type of arguments for '{name}'")
+
+    def cmd_ping(self, *args):
+        return args[0] if args else SimpleString('PONG')
+
+    def cmd_auth(self, *args):
+        return SimpleString('OK')
+
+    def cmd_select(self, db):
+        return SimpleString('OK')
+
+    def cmd_get(self, key):
+        return self.values[key] if self._alive(key) else None
+
+    def cmd_set(self, key, value, *options):
+        options = [o.upper() for o in options]
+        ttl = None
+        if b'EX' in options:
+            ttl = int(options[options.index(b'EX') + 1])
+        if b'PX' in options:
+            ttl = int(options[options.index(b'PX') + 1]) / 1000.0
+        exists = self._alive(key)
+        if (b'NX' in options and exists) or (b'XX' in options and not exists):
+            return None
+        self.values[key] = value
+        self.expires.pop(key, None)
+        if ttl is not None:
+            self.expires[key] = time.monotonic() + ttl
+        return SimpleString('OK')
+
+    def cmd_incrby(self, key, amount):
+        current = int(self.values[key]) if self._alive(key) else 0
+        current += int(amount)
+        self.values[key] = str(current).encode()
+        return current
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, 1)
+
+    def cmd_pexpire(self, key, ms):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.monotonic() + int(ms) / 1000.0
+        return 1
+
+    def cmd_expire(self, key, seconds):
+        return self.cmd_pexpire(key, int(seconds) * 1000)
+
+    def cmd_pttl(self, key):
+        return self.ttl_ms(key)
+
+    def cmd_ttl(self, key):
+        ttl = self.ttl_ms(key)
+        return ttl if ttl < 0 else ttl // 1000
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def cmd_keys(self, pattern):
+        pattern = pattern.decode()
+        return [k for k in list(self.values) if self._alive(k) and fnmatch.fnmatchcase(k.decode(), pattern)]
+
+    def cmd_dbsize(self):
+        return sum(1 for k in list(self.values) if self._alive(k))
+
+    def cmd_flushdb(self):
+        self.values.clear()
+        self.expires.clear()
+        return SimpleString('OK')
+
+    cmd_flushall = cmd_flushdb
+
+
+class SimpleString(str):
+    pass
+
+
+class RESPErrorReply(str):
+    pass
+
+
+def encode(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, RESPErrorReply):
+        return b'-' + reply.encode() + b'\r\n'
+    if isinstance(reply, SimpleString):
+        return b'+' + reply.encode() + b'\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, list):
+        return b'*%d\r\n' % len(reply) + b''.join(encode(item) for item in reply)
+    data = reply if isinstance(reply, bytes) else str(reply).encode()
+    return b'$%d\r\n%s\r\n' % (len(data), data)
+
+
+async def read_command(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        # Inline command (e.g. typed into telnet/nc)
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+async def serve(host='127.0.0.1', port=6390, ready=None):
+    keyspace = Keyspace()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                command = await read_command(reader)
+                if not command:
+                    break
+                name = command[0].decode()
+                if name.upper() == 'QUIT':
+                    writer.write(encode(SimpleString('OK')))
+                    break
+                writer.write(encode(keyspace.execute(name, command[1:])))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+    print(f"📡 RESP stand-in listening on {args.host}:{args.port} (resp://{args.host}:{args.port})")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,9 +14,12 @@ echo "🌐 Using PORT: $PORT"
 export PYTHONPATH="${PYTHONPATH}:$(pwd)"
 echo "🐍 Python path: $PYTHONPATH"
 
-# Ensure database is ready
+# Ensure database is ready: restore the build-time snapshot when no live DB
+# exists, otherwise fall back to seeding from scratch
 echo "🗄️ Ensuring database is ready..."
-if python3.11 init_db_render.py; then
+if python3.11 scripts/db_snapshot.py restore; then
+    echo "✅ Database restored from build snapshot"
+elif python3.11 init_db_render.py; then
     echo "✅ Database is ready"
 else
     echo "❌ Database initialization failed"
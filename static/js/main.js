@@ -12,6 +12,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initCounters();
     initParallax();
     initSmoothScrolling();
+    initSiteSearch();
 
     // Initialize advanced features
     initGSAPAnimations();
@@ -862,6 +863,49 @@ function initScrollEffects() {
     });
 }
 
+// Header search suggestions (in-memory prefix index behind /api/suggest)
+function initSiteSearch() {
+    const input = document.querySelector('.site-search input[data-suggest-url]');
+    if (!input) return;
+
+    const list = document.getElementById(input.getAttribute('list'));
+    let urls = {};
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener('input', function() {
+        // Picking a suggestion fills in its label: go straight to its page
+        if (urls[input.value]) {
+            window.location.href = urls[input.value];
+            return;
+        }
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (!query) {
+            list.innerHTML = '';
+            return;
+        }
+        timer = setTimeout(function() {
+            if (controller) controller.abort();
+            controller = new AbortController();
+            const url = input.dataset.suggestUrl + '&q=' + encodeURIComponent(query);
+            fetch(url, { signal: controller.signal })
+                .then(response => response.ok ? response.json() : [])
+                .then(suggestions => {
+                    urls = {};
+                    list.innerHTML = '';
+                    suggestions.forEach(suggestion => {
+                        urls[suggestion.label] = suggestion.url;
+                        const option = document.createElement('option');
+                        option.value = suggestion.label;
+                        list.appendChild(option);
+                    });
+                })
+                .catch(() => {});
+        }, 120);
+    });
+}
+
 // Export functions for use in other scripts
 window.EmdadGlobal = {
     showNotification,
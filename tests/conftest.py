@@ -0,0 +1,90 @@
+"""
+Shared fixtures: a fresh TestingConfig app per test (in-memory SQLite).
+
+TestingConfig creates the tables after ``create_app``, so the hooks that keep
+the derived tables (search index, facets, attributes, cards) and the cache
+counters in sync start switched off. ``app`` re-runs their ``init_*`` once the
+schema exists, as production startup does against a migrated database.
+
+Hold ``ctx`` only in tests that do not use the test client: a request made
+inside an outer app context shares its ``g``, so the query counter would
+add every request to one budget.
+"""
+
+import pytest
+
+from app import create_app, db as _db
+from app.utils.attributes import init_attributes
+from app.utils.cache_bus import init_cache_bus
+from app.utils.facets import init_facets
+from app.utils.product_cards import init_product_cards
+from app.utils.search import init_search
+
+
+@pytest.fixture
+def make_app():
+    """``make_app()``: another TestingConfig app with its tables and sync hooks, disposed after the test."""
+    apps = []
+
+    def make():
+        app = create_app('testing')
+        with app.app_context():
+            _db.create_all()
+        for init in (init_search, init_facets, init_attributes, init_product_cards, init_cache_bus):
+            init(app, _db)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            _db.session.remove()
+            _db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def db(ctx):
+    return _db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def category(db):
+    from app.models import Category
+
+    category = Category(key='citrus', slug='citrus', name_en='Citrus', name_ar='حمضيات', is_active=True)
+    db.session.add(category)
+    db.session.commit()
+    return category
+
+
+@pytest.fixture
+def make_product(db, category):
+    """``make_product(name_en, **columns)``: an active product in ``category``, committed."""
+    from app.models import Product
+
+    def make(name_en, **columns):
+        columns.setdefault('slug', name_en.lower().replace(' ', '-'))
+        columns.setdefault('status', 'active')
+        columns.setdefault('category_id', category.id)
+        product = Product(name_en=name_en, **columns)
+        db.session.add(product)
+        db.session.commit()
+        return product
+
+    return make
@@ -0,0 +1,103 @@
+"""Structured product attributes and the /api/products attribute filter (app/utils/attributes.py)."""
+
+import json
+
+import pytest
+
+from app.models import Product
+from app.utils.attributes import parse_option, products_matching, products_with_attribute
+
+
+def specs(**values):
+    return json.dumps({'en': values})
+
+
+def names(select):
+    return sorted(product.name_en for product in Product.query.filter(Product.id.in_(select)))
+
+
+@pytest.fixture
+def catalog(make_product):
+    make_product('Oranges', specifications=specs(**{'Brix Level': '11-14%', 'Shelf Life': '3 weeks'}),
+                 packaging_options=json.dumps({'en': {'Export': '15kg export cartons • 10x1kg net bags'}}))
+    make_product('Mandarins', specifications=specs(**{'Brix Level': '9-10.5%', 'Shelf Life': '2 weeks'}))
+    make_product('Grapefruit', specifications=specs(**{'Brix': '14%'}))
+
+
+def test_parse_option():
+    assert parse_option('11-14%') == {'number_min': 11.0, 'number_max': 14.0, 'unit': '%', 'term': None,
+                                      'value_norm': '1114'}
+    option = parse_option('15kg export cartons')
+    assert (option['number_min'], option['unit'], option['term']) == (15.0, 'kg', 'carton')
+    assert parse_option('10x1kg net bags')['number_min'] == 1.0
+    assert parse_option('٦٠-٨٨ مم')['number_max'] == 88.0
+    assert parse_option('GlobalG.A.P.')['number_min'] is None
+
+
+@pytest.mark.parametrize('value, expected', [
+    (11, ['Oranges']),           # lower end of 11-14
+    (12.5, ['Oranges']),         # inside the range
+    (14, ['Grapefruit', 'Oranges']),  # upper end, and a single value
+    (10, ['Mandarins']),
+    (10.75, []),                 # between two ranges
+    (20, []),
+])
+def test_value_falls_inside_the_range(catalog, value, expected):
+    assert names(products_with_attribute(key='brix', value=value)) == expected
+
+
+def test_at_least_and_at_most(catalog):
+    assert names(products_with_attribute(key='brix', at_least=12)) == ['Grapefruit', 'Oranges']
+    assert names(products_with_attribute(key='brix', at_most=10)) == ['Mandarins']
+    assert names(products_with_attribute(key='brix', at_least=10, at_most=11)) == ['Mandarins', 'Oranges']
+
+
+def test_text_matches_the_whole_option(catalog):
+    assert names(products_with_attribute(key='shelf_life', text='3 weeks')) == ['Oranges']
+    assert names(products_with_attribute(key='shelf_life', text='3 Weeks ')) == ['Oranges']
+    assert names(products_with_attribute(key='shelf_life', text='weeks')) == []
+
+
+def test_packaging_lookup(catalog):
+    assert names(products_matching('15 kg carton')) == ['Oranges']
+    assert names(products_matching('1kg net bag')) == ['Oranges']
+    assert names(products_matching('25kg sack')) == []
+
+
+def test_rows_follow_product_updates(db, catalog):
+    mandarins = Product.query.filter_by(name_en='Mandarins').one()
+    mandarins.specifications = specs(**{'Brix Level': '12-13%'})
+    db.session.commit()
+
+    assert names(products_with_attribute(key='brix', value=12.5)) == ['Mandarins', 'Oranges']
+    assert names(products_with_attribute(key='shelf_life', text='2 weeks')) == []
+
+
+def test_api_numeric_and_text_values(client, app):
+    with app.app_context():
+        from app import db
+        from app.models import Category
+
+        citrus = Category(key='citrus', slug='citrus', name_en='Citrus')
+        db.session.add(citrus)
+        db.session.flush()
+        db.session.add_all([
+            Product(slug='oranges', name_en='Oranges', category_id=citrus.id, status='active',
+                    specifications=specs(**{'Brix Level': '11-14%', 'Shelf Life': '3 weeks'})),
+            Product(slug='mandarins', name_en='Mandarins', category_id=citrus.id, status='active',
+                    specifications=specs(**{'Brix Level': '9-10%', 'Shelf Life': '2 weeks'})),
+        ])
+        db.session.commit()
+
+    def slugs(query):
+        return [item['slug'] for item in client.get('/api/products?' + query).get_json()]
+
+    # A value that parses as a number is a range match
+    assert slugs('attr=brix&value=11') == ['oranges']
+    assert slugs('attr=brix&value=12.5') == ['oranges']
+    assert slugs('attr=brix&value=15') == []
+    # Anything else matches the whole option text
+    assert slugs('attr=shelf_life&value=3%20weeks') == ['oranges']
+    assert slugs('attr=brix&value=11-14%25') == ['oranges']
+    assert slugs('attr=brix&value=nan') == []
+    assert slugs('attr=brix&min=10&max=10') == ['mandarins']
@@ -0,0 +1,104 @@
+"""In-memory prefix index for search-as-you-type (app/utils/autocomplete.py)."""
+
+from app.utils.autocomplete import PrefixIndex, Suggestion, suggest
+
+
+def product(label_en, label_ar=None, sort_order=0, keys=()):
+    return Suggestion('product', label_en, label_ar, 'main.product_detail', {'slug': label_en.lower()},
+                      sort_order, keys=keys)
+
+
+def category(label_en, label_ar=None, sort_order=0):
+    return Suggestion('category', label_en, label_ar, 'main.products', {'cat': label_en.lower()}, sort_order)
+
+
+def labels(index, text, limit=8):
+    return [suggestion.label_en for suggestion in index.lookup(text, limit)]
+
+
+def test_prefix_of_the_label_or_of_a_later_word():
+    index = PrefixIndex([product('Fresh Oranges'), product('Lemons')])
+
+    assert labels(index, 'fre') == ['Fresh Oranges']
+    assert labels(index, 'oran') == ['Fresh Oranges']
+    assert labels(index, 'fresh or') == ['Fresh Oranges']
+    assert labels(index, 'resh') == []
+    assert labels(index, 'xyz') == []
+
+
+def test_arabic_prefix_with_or_without_the_article():
+    index = PrefixIndex([product('Fresh Oranges', 'البرتقال الطازج')])
+
+    assert labels(index, 'برتق') == ['Fresh Oranges']
+    assert labels(index, 'البرتقال') == ['Fresh Oranges']
+    assert labels(index, 'طاز') == ['Fresh Oranges']
+
+
+def test_extra_keys_match_with_a_lower_rank():
+    index = PrefixIndex([product('Navel Oranges', keys=('080510',)), product('Fresh Oranges')])
+
+    assert labels(index, '0805') == ['Navel Oranges']
+    assert labels(index, '0805.1') == ['Navel Oranges']
+
+
+def test_ranking():
+    index = PrefixIndex([
+        product('Orange Juice Concentrate', sort_order=1),
+        product('Oranges', sort_order=1),
+        product('Blood Oranges', sort_order=0),
+        category('Oranges Category', sort_order=9),
+        product('Orange Peel', sort_order=0),
+    ])
+
+    # Whole-label matches first; then categories before products, sort_order, shorter labels
+    assert labels(index, 'orange') == [
+        'Oranges Category', 'Orange Peel', 'Oranges', 'Orange Juice Concentrate', 'Blood Oranges',
+    ]
+
+
+def test_limit_and_each_suggestion_once():
+    index = PrefixIndex([product(f'Orange {n}', keys=(f'orange-{n}',)) for n in range(20)])
+
+    result = labels(index, 'orange', limit=5)
+    assert len(result) == 5
+    assert len(set(result)) == 5
+
+
+def test_blank_text_suggests_nothing():
+    index = PrefixIndex([product('Fresh Oranges')])
+
+    assert index.lookup('') == []
+    assert index.lookup('  -- ') == []
+
+
+def test_index_is_built_from_active_rows_and_rebuilt_after_writes(db, make_product, category):
+    make_product('Fresh Oranges', slug='fresh-oranges')
+    make_product('Old Oranges', slug='old-oranges', status='inactive')
+
+    found = {(s.kind, s.label_en) for s in suggest('oran')}
+    assert ('product', 'Fresh Oranges') in found
+    assert ('product', 'Old Oranges') not in found
+    assert ('category', 'Citrus') in {(s.kind, s.label_en) for s in suggest('citr')}
+
+    make_product('Orange Blossom Honey', slug='honey')
+    assert 'Orange Blossom Honey' in [s.label_en for s in suggest('orange b')]
+
+
+def test_suggest_api(client, app):
+    with app.app_context():
+        from app import db
+        from app.models import Category, Product
+
+        citrus = Category(key='citrus', slug='citrus', name_en='Citrus')
+        db.session.add(citrus)
+        db.session.flush()
+        db.session.add(Product(slug='fresh-oranges', name_en='Fresh Oranges', category_id=citrus.id,
+                               status='active'))
+        db.session.commit()
+
+    response = client.get('/api/suggest?q=fresh+or')
+    assert response.status_code == 200
+    # The product first, then HS codes whose descriptions match
+    assert response.get_json()[0] == {'type': 'product', 'label': 'Fresh Oranges', 'url': '/product/fresh-oranges'}
+    assert {'type': 'hs_code', 'label': '080510 — Fresh oranges', 'url': '/search?q=080510'} in response.get_json()
+    assert client.get('/api/suggest?q=fresh+or', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
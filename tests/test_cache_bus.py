@@ -0,0 +1,112 @@
+"""Cross-worker cache invalidation through the version counters (app/utils/cache_bus.py)."""
+
+import pytest
+
+from app import config, db as _db
+from app.models import Certification, Product, Service, User
+from app.utils import cache_bus
+from app.utils.autocomplete import suggest
+from app.utils.cache_bus import cache_state, poll_versions, read_versions
+from app.utils.facets import FacetSelection, facet_counts
+from app.utils.pagination import _counts, cached_count
+from app.utils.reference_data import get_reference_data
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch, make_app):
+    """Two apps on one database file, standing in for two Gunicorn workers, polling on every read."""
+    monkeypatch.setattr(config['testing'], 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'shared.db'}")
+    monkeypatch.setattr(cache_bus, 'CHECK_INTERVAL', 0)
+    return make_app(), make_app()
+
+
+def write(app, *rows):
+    with app.app_context():
+        _db.session.add_all(rows)
+        _db.session.commit()
+
+
+def counted_tables():
+    counts, _ = _counts()
+    return {table for _, _, tables in counts.values() for table in tables}
+
+
+def test_rolled_back_write_leaves_the_counter(db):
+    before = read_versions()
+    get_reference_data()
+
+    db.session.add(Service(title_en='Sorting'))
+    db.session.flush()
+    assert read_versions()['service'] == str(int(before['service']) + 1)
+    db.session.rollback()
+
+    assert read_versions() == before
+    assert 'cache_versions' not in db.session.info
+    assert not cache_state('reference').stale
+
+    # The next transaction bumps again instead of taking the kind as already bumped
+    db.session.add(Service(title_en='Packing'))
+    db.session.commit()
+    assert read_versions()['service'] == str(int(before['service']) + 1)
+    assert [service.title_en for service in get_reference_data().services()] == ['Packing']
+
+
+def test_commit_in_another_worker_is_seen_after_polling(workers):
+    first, second = workers
+    with first.app_context():
+        assert get_reference_data().services() == []
+
+    write(second, Service(title_en='Sorting'))
+
+    with first.app_context():
+        assert [service.title_en for service in get_reference_data().services()] == ['Sorting']
+
+
+def test_only_the_caches_of_the_moved_kinds_are_dropped(workers):
+    first, second = workers
+    with first.app_context():
+        get_reference_data()
+        suggest('oran')
+        facet_counts(FacetSelection({}))
+        cached_count(Product.query)
+        cached_count(User.query)
+        autocomplete = cache_state('autocomplete').value
+        facets = cache_state('facets').value
+
+    write(second, Service(title_en='Sorting'))
+    with first.app_context():
+        poll_versions()
+        assert cache_state('reference').stale == {'service'}
+        assert not cache_state('autocomplete').stale
+        assert not cache_state('facets').stale
+        assert counted_tables() == {'product', 'user'}
+        get_reference_data()
+
+    write(second, Certification(name_en='Organic'))
+    with first.app_context():
+        poll_versions()
+        assert cache_state('reference').stale == {'certification'}
+        assert cache_state('autocomplete').value is autocomplete
+        assert cache_state('facets').value is facets
+        assert counted_tables() == {'product', 'user'}
+
+    write(second, User(name='Buyer', email='buyer@example.com', password_hash='x'))
+    with first.app_context():
+        poll_versions()
+        assert counted_tables() == {'product'}
+
+
+def test_reference_data_reloads_only_the_moved_table(workers):
+    first, second = workers
+    with first.app_context():
+        before = get_reference_data()
+
+    write(second, Service(title_en='Sorting'))
+
+    with first.app_context():
+        after = get_reference_data()
+        assert after is not before
+        assert [service.title_en for service in after.services()] == ['Sorting']
+        for table, rows in before.tables.items():
+            if table != 'service':
+                assert after.tables[table] is rows, table
@@ -0,0 +1,134 @@
+"""Precomputed product facets and their per-worker counts (app/utils/facets.py)."""
+
+import json
+
+from app.models import Certification, Product, ProductFacet
+from app.utils.facets import FacetSelection, facet_counts, rebuild_product_facets
+
+
+def rows(db, product):
+    return {(row.facet, row.value) for row in
+            db.session.query(ProductFacet).filter_by(product_id=product.id)}
+
+
+def counts(**selected):
+    return facet_counts(FacetSelection({facet: str(value) for facet, value in selected.items()}))
+
+
+def season(*months):
+    return json.dumps({'months_state': ['peak' if month in months else 'off' for month in range(1, 13)]})
+
+
+def test_create_writes_the_rows(db, category, make_product):
+    product = make_product('Oranges', hs_code='080510', featured=True, seasonality=season(1, 2))
+
+    assert rows(db, product) == {
+        ('category', str(category.id)), ('hs_chapter', '08'), ('featured', '1'), ('month', '1'), ('month', '2'),
+    }
+    assert counts()['hs_chapter'] == {'08': 1}
+    assert counts()['month'] == {'1': 1, '2': 1}
+
+
+def test_update_rewrites_the_rows_and_the_counts(db, make_product):
+    product = make_product('Oranges', hs_code='080510', featured=True)
+    make_product('Lemons', hs_code='080550')
+    assert counts()['featured'] == {'1': 1}
+    assert counts()['hs_chapter'] == {'08': 2}
+
+    product.featured = False
+    product.hs_code = '070190'
+    db.session.commit()
+
+    assert ('featured', '1') not in rows(db, product)
+    assert 'featured' not in counts()
+    assert counts()['hs_chapter'] == {'07': 1, '08': 1}
+
+
+def test_inactive_and_deleted_products_leave_the_counts(db, category, make_product):
+    oranges = make_product('Oranges', hs_code='080510')
+    lemons = make_product('Lemons', hs_code='080550')
+    assert counts()['category'] == {str(category.id): 2}
+
+    oranges.status = 'inactive'
+    db.session.commit()
+    assert rows(db, oranges) == set()
+    assert counts()['category'] == {str(category.id): 1}
+
+    db.session.delete(lemons)
+    db.session.commit()
+    assert db.session.query(ProductFacet).count() == 0
+    assert counts() == {}
+
+
+def test_certification_changes(db, make_product):
+    organic = Certification(name_en='Organic')
+    gap = Certification(name_en='GlobalG.A.P.')
+    db.session.add_all([organic, gap])
+    db.session.commit()
+    oranges = make_product('Oranges')
+    lemons = make_product('Lemons')
+
+    oranges.certifications.append(organic)
+    lemons.certifications.extend([organic, gap])
+    db.session.commit()
+    assert counts()['certification'] == {str(organic.id): 2, str(gap.id): 1}
+
+    lemons.certifications.remove(organic)
+    db.session.commit()
+    assert counts()['certification'] == {str(organic.id): 1, str(gap.id): 1}
+    assert ('certification', str(organic.id)) not in rows(db, lemons)
+
+    db.session.delete(gap)
+    db.session.commit()
+    assert counts()['certification'] == {str(organic.id): 1}
+    assert ('certification', str(gap.id)) not in rows(db, lemons)
+
+
+def test_counts_use_the_other_selected_facets(db, category, make_product):
+    make_product('Oranges', hs_code='080510', featured=True, seasonality=season(1))
+    make_product('Lemons', hs_code='080550', seasonality=season(1, 2))
+    make_product('Onions', hs_code='070310', seasonality=season(2))
+
+    selected = counts(hs_chapter='08')
+    # The selected facet keeps the counts of its other values
+    assert selected['hs_chapter'] == {'07': 1, '08': 2}
+    # The others are narrowed to chapter 08
+    assert selected['month'] == {'1': 2, '2': 1}
+    assert selected['featured'] == {'1': 1}
+
+    assert counts(hs_chapter='08', month=2)['featured'] == {'1': 0}
+
+
+def test_selection_filters_the_listing(db, make_product):
+    make_product('Oranges', hs_code='080510', seasonality=season(1))
+    make_product('Onions', hs_code='070310', seasonality=season(1))
+
+    selection = FacetSelection({'hs_chapter': '08', 'month': '1'})
+    assert [product.name_en for product in selection.apply(Product.query)] == ['Oranges']
+
+
+def test_rebuild_matches_the_orm_hooks(db, make_product):
+    product = make_product('Oranges', hs_code='080510', featured=True, seasonality=season(3))
+    written = rows(db, product)
+
+    assert rebuild_product_facets(db) == len(written)
+    assert rows(db, product) == written
+
+
+def test_listing_page_filters(client, app):
+    with app.app_context():
+        from app import db
+        from app.models import Category
+
+        citrus = Category(key='citrus', slug='citrus', name_en='Citrus')
+        db.session.add(citrus)
+        db.session.flush()
+        db.session.add_all([
+            Product(slug='oranges', name_en='Oranges', category_id=citrus.id, status='active', hs_code='080510'),
+            Product(slug='onions', name_en='Onions', category_id=citrus.id, status='active', hs_code='070310'),
+        ])
+        db.session.commit()
+
+    page = client.get('/products?hs=08').get_data(as_text=True)
+    assert '/product/oranges' in page
+    assert '/product/onions' not in page
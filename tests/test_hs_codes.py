@@ -0,0 +1,103 @@
+"""HS code index, picker lookup and product annotation (app/utils/hs_codes.py)."""
+
+from types import SimpleNamespace
+
+from app.utils.hs_codes import annotate_products, find_hs_codes, get_hs_code, lookup_hs_codes
+
+
+def codes(entries):
+    return [entry.code for entry in entries]
+
+
+def test_get_hs_code_ignores_separators_and_prefixes():
+    assert get_hs_code('080510').en == 'Fresh oranges'
+    assert get_hs_code('0805.10') == get_hs_code('HS:080510') == get_hs_code('080510')
+    assert get_hs_code('0805') is None
+    assert get_hs_code('999999') is None
+    assert get_hs_code(None) is None
+
+
+def test_find_by_valid_code_prefix():
+    assert codes(find_hs_codes('080510')) == ['080510']
+    assert codes(find_hs_codes('0805.1')) == ['080510']
+    assert codes(find_hs_codes('0805')) == ['080510', '080520']
+
+
+def test_find_by_short_prefix_is_chapter_order_and_limited():
+    chapter = codes(find_hs_codes('08'))
+    assert chapter == sorted(chapter)
+    assert all(code.startswith('08') for code in chapter)
+    assert chapter == codes(lookup_hs_codes('08'))
+    assert codes(find_hs_codes('0', limit=3)) == codes(lookup_hs_codes('0'))[:3]
+
+
+def test_find_unknown_code_or_text():
+    assert find_hs_codes('99') == []
+    assert find_hs_codes('0805999') == []
+    assert find_hs_codes('no such product') == []
+
+
+def test_find_by_description_in_either_language():
+    assert '080510' in codes(find_hs_codes('orange'))
+    assert '080510' in codes(find_hs_codes('ORANGES'))
+    assert '080510' in codes(find_hs_codes('برتقال'))
+
+
+def test_blank_query_lists_the_first_codes():
+    assert len(find_hs_codes('', limit=5)) == 5
+    assert codes(find_hs_codes('  ', limit=5)) == codes(find_hs_codes(None, limit=5))
+
+
+def test_annotate_products():
+    products = [
+        SimpleNamespace(id=1, hs_code='0805.10'),
+        SimpleNamespace(id=2, hs_code='08'),
+        SimpleNamespace(id=3, hs_code='abc'),
+        SimpleNamespace(id=4, hs_code=None),
+        SimpleNamespace(id=5, hs_code=''),
+    ]
+
+    annotations = annotate_products(products)
+    assert set(annotations) == {1, 2, 3}
+
+    # Known code, written with a separator
+    assert annotations[1] == {
+        'code': '0805.10',
+        'description': 'Fresh oranges',
+        'display': '0805.10 — Fresh oranges',
+        'chapter': 'Fruits and nuts',
+    }
+    # Chapter only: no description, the chapter name stands in
+    assert annotations[2]['description'] is None
+    assert annotations[2]['display'] == '08 — Fruits and nuts'
+    # Not a code at all
+    assert annotations[3]['description'] is None
+    assert annotations[3]['chapter'] == 'Other agricultural products'
+
+
+def test_annotate_products_in_arabic():
+    annotation = annotate_products([SimpleNamespace(id=1, hs_code='080510')], 'ar')[1]
+
+    assert annotation['description'] == 'برتقال طازج'
+    assert annotation['chapter'] == 'فواكه ومكسرات'
+
+
+def test_api_products_hs_code_fields(client, app):
+    with app.app_context():
+        from app import db
+        from app.models import Category, Product
+
+        citrus = Category(key='citrus', slug='citrus', name_en='Citrus')
+        db.session.add(citrus)
+        db.session.flush()
+        db.session.add_all([
+            Product(slug='oranges', name_en='Oranges', category_id=citrus.id, status='active', hs_code='080510'),
+            Product(slug='mixed', name_en='Mixed', category_id=citrus.id, status='active'),
+        ])
+        db.session.commit()
+
+    items = {item['slug']: item for item in client.get('/api/products').get_json()}
+    assert items['oranges']['hs_code'] == '080510'
+    assert items['oranges']['hs_code_info']['description'] == 'Fresh oranges'
+    assert items['mixed']['hs_code'] is None
+    assert items['mixed']['hs_code_info'] is None
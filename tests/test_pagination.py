@@ -0,0 +1,89 @@
+"""Keyset pagination and the cached admin totals (app/utils/pagination.py)."""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models import Product
+from app.utils.pagination import cached_count, decode_cursor, encode_cursor, keyset_paginate
+
+SAME_TIME = datetime(2026, 1, 15, 9, 30)
+
+
+def page(cursor=None, per_page=2):
+    return keyset_paginate(Product.query, Product.updated_at, Product.id, cursor=cursor, per_page=per_page)
+
+
+def slugs(result):
+    return [product.slug for product in result]
+
+
+@pytest.fixture
+def tied(db, make_product):
+    """Five products with one ``updated_at``: only the id orders them."""
+    products = [make_product(f'Product {n}') for n in range(1, 6)]
+    for product in products:
+        product.updated_at = SAME_TIME
+    db.session.commit()
+    return products
+
+
+def test_next_and_prev_across_ties(tied):
+    first = page()
+    assert slugs(first) == ['product-5', 'product-4']
+    assert (first.page, first.has_prev, first.has_next, first.total) == (1, False, True, 5)
+
+    second = page(first.next_cursor)
+    assert slugs(second) == ['product-3', 'product-2']
+    assert (second.page, second.has_prev, second.has_next) == (2, True, True)
+
+    third = page(second.next_cursor)
+    assert slugs(third) == ['product-1']
+    assert (third.page, third.has_prev, third.has_next, third.next_cursor) == (3, True, False, None)
+
+    back = page(third.prev_cursor)
+    assert slugs(back) == ['product-3', 'product-2']
+    assert (back.page, back.has_prev, back.has_next) == (2, True, True)
+
+    start = page(back.prev_cursor)
+    assert slugs(start) == ['product-5', 'product-4']
+    assert (start.page, start.has_prev, start.prev_cursor) == (1, False, None)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(SAME_TIME, 7, 3, 'prev')) == (SAME_TIME, 7, 3, 'prev')
+    assert decode_cursor(encode_cursor('Zebra', 7, 2, 'next')) == ('Zebra', 7, 2, 'next')
+
+
+def raw(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    None, '', 'garbage', '!!!!', raw('not json'), raw('[1, 2, 3]'), raw('{"a": 1}'),
+    raw('["2026-01-15", 7, 2, "sideways"]'), raw('["2026-01-15", 7, 0, "next"]'),
+    raw('["2026-01-15", 7, "2", "next"]'), raw('["2026-01-15", "seven", 2, "next"]'),
+    raw('[{"dt": "not a date"}, 7, 2, "next"]'),
+])
+def test_malformed_cursor_is_ignored(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_tampered_cursor_starts_from_the_first_page(tied):
+    assert slugs(page('garbage')) == ['product-5', 'product-4']
+    assert page(raw('["x", 1, 2, "sideways"]')).page == 1
+
+
+def test_count_cache_is_dropped_by_a_write(db, make_product):
+    make_product('Oranges')
+    assert cached_count(Product.query) == 1
+    db.session.execute(Product.__table__.insert().values(slug='bulk', name_en='Bulk', category_id=1))
+    # A write that bypasses the ORM is not seen until the cache expires or something drops it
+    assert cached_count(Product.query) == 1
+    db.session.rollback()
+
+    make_product('Lemons')
+    assert cached_count(Product.query) == 2
+    assert page().total == 2
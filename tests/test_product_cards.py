@@ -0,0 +1,116 @@
+"""Denormalized listing cards kept in step with ORM writes (app/utils/product_cards.py)."""
+
+import json
+
+from app.models import Category, ProductCard, ProductImage
+from app.utils.product_cards import rebuild_product_cards
+
+
+def card(db, product_id):
+    db.session.expire_all()
+    return db.session.get(ProductCard, product_id)
+
+
+def test_product_create_writes_the_card(db, category, make_product):
+    product = make_product('Oranges', name_ar='برتقال', hs_code='080510', featured=True,
+                           specifications=json.dumps({'en': {'brix': '11-14%'}}),
+                           seasonality=json.dumps({'months_state': ['peak'] * 3 + ['off'] * 9}))
+
+    row = card(db, product.id)
+    assert (row.slug, row.name_ar, row.hs_code, row.featured) == ('oranges', 'برتقال', '080510', True)
+    assert (row.category_key, row.category_name_en, row.category_name_ar) == ('citrus', 'Citrus', 'حمضيات')
+    assert row.main_image is None
+    assert row.months_en == ProductCard.MONTH_CODES['peak'] * 3 + ProductCard.MONTH_CODES['off'] * 9
+    assert json.loads(row.badges)['en'] == {'brix': '11-14%', 'sizes': False}
+
+
+def test_product_update_and_delete(db, make_product):
+    product = make_product('Oranges')
+    product.name_en = 'Blood Oranges'
+    product.status = 'inactive'
+    db.session.commit()
+
+    row = card(db, product.id)
+    assert (row.name_en, row.status) == ('Blood Oranges', 'inactive')
+
+    product_id = product.id
+    db.session.delete(product)
+    db.session.commit()
+    assert card(db, product_id) is None
+
+
+def test_product_moved_to_another_category(db, make_product):
+    product = make_product('Oranges')
+    vegetables = Category(key='vegetables', slug='vegetables', name_en='Vegetables')
+    db.session.add(vegetables)
+    db.session.commit()
+
+    # Only the foreign key changes; the relationship is not reloaded
+    product.category_id = vegetables.id
+    db.session.commit()
+    assert card(db, product.id).category_name_en == 'Vegetables'
+
+
+def test_image_writes_patch_the_main_image(db, make_product):
+    product = make_product('Oranges')
+    other = make_product('Lemons')
+
+    first = ProductImage(product_id=product.id, filename='first.jpg')
+    db.session.add(first)
+    db.session.commit()
+    assert card(db, product.id).main_image == 'first.jpg'
+
+    main = ProductImage(product_id=product.id, filename='main.jpg', is_main=True)
+    db.session.add(main)
+    db.session.commit()
+    assert card(db, product.id).main_image == 'main.jpg'
+
+    db.session.delete(main)
+    db.session.commit()
+    assert card(db, product.id).main_image == 'first.jpg'
+
+    db.session.delete(first)
+    db.session.commit()
+    assert card(db, product.id).main_image is None
+    # The other product's card is left alone
+    assert card(db, other.id).main_image is None
+
+
+def test_category_writes_patch_the_names(db, category, make_product):
+    oranges = make_product('Oranges')
+    lemons = make_product('Lemons')
+
+    category.name_en = 'Citrus Fruits'
+    category.key = 'citrus-fruits'
+    db.session.commit()
+    assert {card(db, oranges.id).category_name_en, card(db, lemons.id).category_name_en} == {'Citrus Fruits'}
+    assert card(db, lemons.id).category_key == 'citrus-fruits'
+
+
+def test_category_delete_only_clears_its_own_cards(db, make_product):
+    oranges = make_product('Oranges')
+    empty = Category(key='empty', slug='empty', name_en='Empty')
+    db.session.add(empty)
+    db.session.commit()
+    # A card left pointing at the category by a write that bypassed the ORM
+    db.session.execute(ProductCard.__table__.update().where(ProductCard.id == oranges.id)
+                       .values(category_id=empty.id))
+    db.session.commit()
+    lemons = make_product('Lemons')
+
+    db.session.delete(empty)
+    db.session.commit()
+    row = card(db, oranges.id)
+    assert (row.category_key, row.category_name_en, row.category_name_ar) == (None, None, None)
+    assert card(db, lemons.id).category_name_en == 'Citrus'
+
+
+def test_rebuild_matches_the_orm_hooks(db, make_product):
+    product = make_product('Oranges', hs_code='080510')
+    db.session.add(ProductImage(product_id=product.id, filename='main.jpg', is_main=True))
+    db.session.commit()
+    columns = [column.name for column in ProductCard.__table__.columns]
+    written = [getattr(card(db, product.id), name) for name in columns]
+
+    assert rebuild_product_cards(db) == 1
+    assert [getattr(card(db, product.id), name) for name in columns] == written
@@ -0,0 +1,74 @@
+"""
+Every route with a query budget stays within it on its very first request.
+
+Each test builds a fresh app (TestingConfig: in-memory SQLite, budgets in
+'raise' mode, strict loading), so the per-worker caches start cold, as in a
+newly forked worker. Requests are made outside any app context: a shared
+``g`` would add the queries of every request to one count.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models import Category, Certification, News, Product, Service
+
+URLS = {
+    'main.index': '/',
+    'main.products': '/products',
+    'main.product_detail': '/product/fresh-oranges',
+    'main.calendar': '/calendar',
+    'main.gallery': '/gallery',
+    'main.news': '/news',
+    'main.news_detail': '/news/citrus-season',
+    'main.services': '/services',
+    'main.certifications': '/certifications',
+    'main.contact': '/contact',
+    'api.api_products': '/api/products',
+    'api.api_categories': '/api/categories',
+}
+
+
+def make_app(seed=True):
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        if seed:
+            category = Category(key='citrus', slug='citrus', name_en='Citrus', name_ar='حمضيات')
+            db.session.add(category)
+            db.session.flush()
+            db.session.add_all([
+                Product(slug='fresh-oranges', name_en='Fresh Oranges', name_ar='برتقال طازج',
+                        short_description_en='Valencia oranges', description_en='Valencia oranges.',
+                        category_id=category.id, status='active'),
+                News(slug='citrus-season', title_en='Citrus season', excerpt_en='The season opens.',
+                     content_en='The season opens.', status='published',
+                     publish_at=datetime.utcnow() - timedelta(days=1)),
+                Service(title_en='Budget Test Service', description_en='Seeded by the test.'),
+                Certification(name_en='Budget Test Certificate', description_en='Seeded by the test.'),
+            ])
+            db.session.commit()
+    return app
+
+
+def test_every_budgeted_route_is_listed():
+    assert set(URLS) == set(make_app(seed=False).config['QUERY_BUDGETS'])
+
+
+@pytest.mark.parametrize('endpoint', sorted(URLS))
+def test_first_request_within_budget(endpoint):
+    client = make_app().test_client()
+    # TestingConfig raises QueryBudgetExceeded over budget
+    response = client.get(URLS[endpoint])
+    assert response.status_code == 200, URLS[endpoint]
+
+
+def test_apps_do_not_share_cached_rows():
+    first = make_app().test_client()
+    assert b'Budget Test Service' in first.get('/services').data
+    assert b'Budget Test Certificate' in first.get('/certifications').data
+
+    second = make_app(seed=False).test_client()
+    assert b'Budget Test Service' not in second.get('/services').data
+    assert b'Budget Test Certificate' not in second.get('/certifications').data
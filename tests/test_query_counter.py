@@ -0,0 +1,35 @@
+"""Per-request query counting and timing (app/utils/query_counter.py)."""
+
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.utils.query_counter import _START_KEY, current_query_stats, not_counted
+
+PAUSE = 0.05
+
+
+def test_failed_statement_does_not_skew_the_next_one(app):
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        stats = current_query_stats()
+
+        with pytest.raises(OperationalError):
+            db.session.execute(text('SELECT * FROM no_such_table'))
+        db.session.rollback()
+        assert stats.count == 1
+        assert not db.session.connection().info.get(_START_KEY)
+
+        time.sleep(PAUSE)
+        # Not timed: must not pick up the failed statement's start
+        with not_counted():
+            db.session.execute(text('SELECT 1'))
+        assert stats.count == 1
+
+        db.session.execute(text('SELECT 2'))
+        assert stats.count == 2
+        assert stats.shape_time['SELECT 2'] < PAUSE
+        assert stats.total_time < PAUSE
@@ -0,0 +1,35 @@
+"""Hot queries keep using indexes (app/utils/query_plans.py, migrations/add_hot_query_indexes.py)."""
+
+import pytest
+
+from migrations.add_hot_query_indexes import ensure_hot_query_indexes
+from app.utils.query_plans import HOT_QUERIES, QueryPlanRegression, assert_no_full_scans
+
+
+def test_hot_queries_use_indexes(db):
+    ensure_hot_query_indexes(db)
+
+    report = assert_no_full_scans()
+    assert set(report) == set(HOT_QUERIES)
+
+
+def test_dropped_index_is_reported_and_recreated(db):
+    db.session.execute(db.text('DROP INDEX ix_product_image_product_main'))
+    db.session.commit()
+
+    with pytest.raises(QueryPlanRegression, match='product_image'):
+        assert_no_full_scans()
+
+    ensure_hot_query_indexes(db)
+    assert_no_full_scans()
+
+
+def test_audit_entity_type_query_matches_what_the_views_write(db):
+    from app.admin.routes import AUDIT_ENTITY_TYPES
+    from app.utils.query_plans import _admin_audit_logs_by_entity_type
+    from app.utils.synthetic import AUDIT_ENTITIES
+
+    compiled = _admin_audit_logs_by_entity_type().statement.compile()
+    entity_type = next(value for key, value in compiled.params.items() if key.startswith('entity_type'))
+    assert entity_type in AUDIT_ENTITY_TYPES
+    assert set(AUDIT_ENTITY_TYPES) <= set(AUDIT_ENTITIES)
@@ -0,0 +1,128 @@
+"""Shared rate-limit storages (app/utils/ratelimit.py) and their REDIS_URL mapping (config.py)."""
+
+import asyncio
+import socket
+import ssl
+import threading
+import time
+
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+import config
+from app.utils.ratelimit import RESPStorage, SQLiteStorage
+
+LIMIT = parse('3 per minute')
+
+
+@pytest.fixture(scope='module')
+def standin():
+    """A scripts/resp_standin.py server on a free port, for the whole module."""
+    from scripts.resp_standin import serve
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(serve('127.0.0.1', port, ready)), daemon=True).start()
+    assert ready.wait(5)
+    return f'resp://127.0.0.1:{port}'
+
+
+@pytest.fixture(params=['sqlite', 'resp'])
+def storage_uri(request, tmp_path):
+    if request.param == 'sqlite':
+        uri = f"sqlite:///{tmp_path / 'ratelimit.db'}"
+    else:
+        uri = request.getfixturevalue('standin')
+    storage_from_string(uri).reset()
+    return uri
+
+
+def test_uri_picks_the_storage(storage_uri):
+    storage = storage_from_string(storage_uri)
+    assert isinstance(storage, SQLiteStorage if storage_uri.startswith('sqlite') else RESPStorage)
+    assert storage.check()
+
+
+def test_fixed_window(storage_uri):
+    limiter = FixedWindowRateLimiter(storage_from_string(storage_uri))
+
+    assert [limiter.hit(LIMIT, 'login', '10.0.0.1') for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit(LIMIT, 'login', '10.0.0.2')
+    reset_at, remaining = limiter.get_window_stats(LIMIT, 'login', '10.0.0.1')
+    assert remaining == 0
+    assert 0 < reset_at - time.time() <= 60
+
+    limiter.clear(LIMIT, 'login', '10.0.0.1')
+    assert limiter.hit(LIMIT, 'login', '10.0.0.1')
+
+
+def test_workers_share_the_counters(storage_uri):
+    # Two storages from one URI stand in for two workers
+    first = FixedWindowRateLimiter(storage_from_string(storage_uri))
+    second = FixedWindowRateLimiter(storage_from_string(storage_uri))
+
+    assert first.hit(LIMIT, 'contact', 'ip')
+    assert second.hit(LIMIT, 'contact', 'ip')
+    assert first.hit(LIMIT, 'contact', 'ip')
+    assert not second.hit(LIMIT, 'contact', 'ip')
+
+
+def test_concurrent_hits_never_exceed_the_limit(storage_uri):
+    storage = storage_from_string(storage_uri)
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse('25 per minute')
+    allowed = []
+
+    def run():
+        allowed.append(sum(limiter.hit(item, 'burst', 'ip') for _ in range(20)))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 25
+
+
+def test_login_route_is_limited(storage_uri, monkeypatch, make_app):
+    monkeypatch.setattr(config.config['testing'], 'RATELIMIT_STORAGE_URI', storage_uri)
+    monkeypatch.setattr(config.config['testing'], 'RATELIMIT_LOGIN', '2 per minute')
+    client = make_app().test_client()
+
+    form = {'email': 'nobody@example.com', 'password': 'wrong'}
+    statuses = [client.post('/admin/login', data=form).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    # A second app on the same storage (another worker) is limited too
+    assert make_app().test_client().post('/admin/login', data=form).status_code == 429
+
+
+@pytest.mark.parametrize('redis_url, expected', [
+    (None, config.RATELIMIT_SQLITE_URI),
+    ('', config.RATELIMIT_SQLITE_URI),
+    ('redis://cache.internal:6379/0', 'resp://cache.internal:6379/0'),
+    ('rediss://:secret@cache.internal:6380/1', 'resps://:secret@cache.internal:6380/1'),
+    ('rediss://cache.internal:6380?ssl_cert_reqs=none', 'resps://cache.internal:6380?ssl_cert_reqs=none'),
+])
+def test_redis_url_mapping(redis_url, expected):
+    assert config.redis_ratelimit_uri(redis_url) == expected
+
+
+def test_unsupported_redis_url_falls_back_to_sqlite():
+    with pytest.warns(UserWarning, match='unix'):
+        assert config.redis_ratelimit_uri('unix:///run/redis.sock') == config.RATELIMIT_SQLITE_URI
+
+
+def test_resps_uri_uses_tls():
+    verified = storage_from_string(config.redis_ratelimit_uri('rediss://:secret@cache.internal:6380/2'))
+    assert (verified.host, verified.port, verified.db, verified.password) == ('cache.internal', 6380, 2, 'secret')
+    assert verified.ssl_context.verify_mode == ssl.CERT_REQUIRED
+    assert verified.ssl_context.check_hostname
+
+    self_signed = storage_from_string(config.redis_ratelimit_uri('rediss://cache.internal:6380?ssl_cert_reqs=none'))
+    assert self_signed.ssl_context.verify_mode == ssl.CERT_NONE
+
+    assert storage_from_string(config.redis_ratelimit_uri('redis://cache.internal')).ssl_context is None
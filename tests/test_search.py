@@ -0,0 +1,105 @@
+"""Bilingual full-text search (app/utils/search.py)."""
+
+import pytest
+
+from app.models import News, Product
+from app.utils.search import normalize, search, search_site, terms
+
+
+def slugs(query):
+    return [product.slug for product in query.all()]
+
+
+def test_normalize_folds_arabic_variants():
+    assert normalize('أَحْمَد') == 'احمد'
+    assert normalize('إبراهيم آمنة') == 'ابراهيم امنه'
+    assert normalize('مصطفى') == 'مصطفي'
+    assert normalize('برتـــقال') == 'برتقال'
+    assert normalize('٠٨٠٥') == '0805'
+    assert normalize('Café <b>Crème</b>').split() == ['cafe', 'creme']
+    assert normalize('0805.10') == '080510'
+
+
+def test_terms_strip_the_article():
+    assert terms('البرتقال والليمون') == ['برتقال', 'ليمون']
+    # Too short once stripped: kept as written
+    assert terms('الي') == ['الي']
+
+
+def test_arabic_query_matches_any_spelling(make_product):
+    make_product('Fresh Oranges', slug='oranges', name_ar='البرتقال الطازج')
+    make_product('Lemons', slug='lemons', name_ar='ليمون')
+
+    for query in ('برتقال', 'البرتقال', 'بُرتُقال', 'برتق'):
+        assert slugs(search(Product, query)) == ['oranges'], query
+
+
+def test_title_match_ranks_above_body_match(make_product):
+    make_product('Navel Oranges', slug='title-hit', short_description_en='Sweet citrus')
+    make_product('Mixed Crate', slug='body-hit', short_description_en='Apples, pears and oranges')
+
+    assert slugs(search(Product, 'oranges')) == ['title-hit', 'body-hit']
+
+
+def test_hs_code_with_or_without_separator(make_product):
+    make_product('Fresh Oranges', slug='oranges', hs_code='080510')
+
+    assert slugs(search(Product, '0805.10')) == ['oranges']
+    assert slugs(search(Product, '0805')) == ['oranges']
+
+
+def test_index_follows_orm_writes(db, make_product):
+    product = make_product('Fresh Oranges', slug='oranges')
+    product.name_en = 'Blood Oranges'
+    db.session.commit()
+    assert slugs(search(Product, 'blood')) == ['oranges']
+
+    db.session.delete(product)
+    db.session.commit()
+    assert slugs(search(Product, 'oranges')) == []
+
+
+@pytest.mark.parametrize('query', [
+    'oranges"', '"oranges', 'oranges*', '(oranges', 'oranges:*', '^oranges', '+oranges', '{oranges}',
+])
+def test_fts_punctuation_in_the_query_is_ignored(make_product, query):
+    make_product('Fresh Oranges', slug='oranges')
+
+    assert slugs(search(Product, query)) == ['oranges']
+
+
+def test_fts_operators_in_the_query_are_plain_words(db, make_product):
+    make_product('Fresh Oranges', slug='oranges')
+    make_product('Oranges and Lemons', slug='oranges-and-lemons')
+
+    # As FTS5 syntax these would widen or narrow the match; as words they must all appear
+    assert slugs(search(Product, 'oranges OR pears')) == []
+    assert slugs(search(Product, 'NEAR(oranges lemons)')) == []
+    assert slugs(search(Product, 'oranges AND lemons')) == ['oranges-and-lemons']
+    assert slugs(search(Product, 'title:lemons')) == []
+    assert slugs(search(Product, "oranges'; DROP TABLE product; --")) == []
+    assert db.session.query(Product).count() == 2
+
+
+@pytest.mark.parametrize('query', ['', '   ', '"*()', '--', '-'])
+def test_query_without_words_matches_nothing(make_product, query):
+    make_product('Fresh Oranges', slug='oranges')
+
+    assert slugs(search(Product, query)) == []
+
+
+def test_search_site_hides_inactive_and_unpublished(db, make_product):
+    from datetime import datetime, timedelta
+
+    make_product('Fresh Oranges', slug='oranges')
+    make_product('Old Oranges', slug='old-oranges', status='inactive')
+    db.session.add_all([
+        News(slug='season', title_en='Oranges season', status='published',
+             publish_at=datetime.utcnow() - timedelta(days=1)),
+        News(slug='draft', title_en='Oranges draft', status='draft'),
+    ])
+    db.session.commit()
+
+    products, news = search_site('oranges')
+    assert [product.slug for product in products] == ['oranges']
+    assert [article.slug for article in news] == ['season']